@@ -5,6 +5,10 @@ from pinecone import Pinecone
 from pinecone_plugins.assistant.models.chat import Message
 import re
 from recommendation import get_recommendation
+from response_chunks import chunk_response
+from scheme_catalog import get_scheme_index
+from translation_cache import translation_cache
+from llm_gateway import LLMGateway
 import google.generativeai as genai
 import os
 
@@ -17,7 +21,7 @@ assistant = pc.assistant.Assistant(assistant_name="rag1")
 genai.configure(api_key='')
 
 # Get Gemini model for translation
-model = genai.GenerativeModel('Gemini 2.0 Flash Thinking Experimental 01-21')
+model = LLMGateway(genai.GenerativeModel('Gemini 2.0 Flash Thinking Experimental 01-21'))
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -38,21 +42,22 @@ language_names = {
     'gu': 'Gujarati'
 }
 
+def gemini_translate(text, source_lang, target_lang):
+    """Translate text using Gemini; raises if the model call fails."""
+    prompt = f"Translate the following text from {language_names.get(source_lang, source_lang)} to {language_names.get(target_lang, target_lang)}. Maintain the same tone and meaning. Here's the text: {text}"
+    
+    response = model.generate_content(prompt)
+    
+    # Clean up any markdown formatting that might be in the response
+    return response.text.replace('```', '').strip()
+
 def translate_text(text, source_lang, target_lang):
-    """Translate text using Gemini."""
+    """Translate text using Gemini, reusing cached translations."""
     if source_lang == target_lang:
         return text
     
     try:
-        prompt = f"Translate the following text from {language_names.get(source_lang, source_lang)} to {language_names.get(target_lang, target_lang)}. Maintain the same tone and meaning. Here's the text: {text}"
-        
-        response = model.generate_content(prompt)
-        translated_text = response.text
-        
-        # Clean up any markdown formatting that might be in the response
-        translated_text = translated_text.replace('```', '').strip()
-        
-        return translated_text
+        return translation_cache.translate(text, source_lang, target_lang, gemini_translate)
     
     except Exception as e:
         print(f"Translation error: {e}")
@@ -106,7 +111,16 @@ def handle_recommendation_logic(query: str, lang: str) -> str:
         if risk_match:
             risk = int(risk_match.group())
             recommendation_state['risk'] = risk
-            # Generate recommendation
+            # Generate recommendation, using the pre-translated corpus when it has this language
+            translated = None
+            if lang != 'en':
+                translated = get_recommendation(
+                    recommendation_state['age'],
+                    recommendation_state['income'],
+                    risk,
+                    lang,
+                    fallback=False
+                )
             response_in_english = get_recommendation(
                 recommendation_state['age'],
                 recommendation_state['income'],
@@ -114,6 +128,8 @@ def handle_recommendation_logic(query: str, lang: str) -> str:
             )
             # Clear the state and recommendation mode after giving the recommendation
             recommendation_state = {}
+            if translated is not None:
+                return translated
         else:
             response_in_english = "Please specify your risk tolerance (1-5):"
     
@@ -126,23 +142,6 @@ def handle_recommendation_logic(query: str, lang: str) -> str:
     else:
         return response_in_english
 
-def chunk_response(text, chunk_size=300):
-    """Split a long response into chunks of max `chunk_size` characters."""
-    words = text.split()
-    chunks = []
-    chunk = []
-
-    for word in words:
-        if sum(len(w) for w in chunk) + len(word) + len(chunk) > chunk_size:
-            chunks.append(" ".join(chunk))
-            chunk = []
-        chunk.append(word)
-    
-    if chunk:
-        chunks.append(" ".join(chunk))
-
-    return chunks
-
 @app.route("/chat", methods=["POST"])
 def chat():
     global user_sessions, in_recommendation_mode
@@ -171,12 +170,7 @@ def chat():
 
         # Check if user has pending message chunks
         if user_id in user_sessions and user_sessions[user_id]:
-            remaining_chunks = user_sessions[user_id].pop(0)  # Get next chunk
-            
-            # Translate remaining chunk if needed
-            if language != 'en':
-                remaining_chunks = translate_text(remaining_chunks, 'en', language)
-                
+            remaining_chunks = user_sessions[user_id].pop(0)  # Get next chunk (already translated)
             return jsonify({"response": remaining_chunks})
 
         # Translate user message to English if not in English
@@ -217,15 +211,9 @@ def chat():
 @app.route('/<fundname>', methods=['GET'])
 def get_details(fundname):
     """Fetch past and present details for a specific mutual fund."""
-    api_url = "https://api.mfapi.in/mf"
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-
         # Find the code for the given fund name
-        maps = {scheme.get("schemeName"): scheme.get("schemeCode") for scheme in data}
-        code = maps.get(fundname)
+        code = get_scheme_index().code_for(fundname)
 
         if not code:
             return jsonify({"error": f"Fund name '{fundname}' not found."}), 404
@@ -254,18 +242,39 @@ def get_details(fundname):
 
 @app.route('/schemes', methods=['GET'])
 def get_names():
-    """Fetch all mutual fund schemes and return schemeName-to-schemeCode mappings."""
-    api_url = "https://api.mfapi.in/mf"
+    """Return every mutual fund scheme name as a plain list; /v2/schemes serves them a page at a time."""
+    try:
+        return jsonify(get_scheme_index().names)
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch mutual fund codes: {str(e)}"}), 500
+
+@app.route('/v2/schemes', methods=['GET'])
+def get_names_page():
+    """
+    Return mutual fund scheme names for the @ autocomplete, one page at a time,
+    as {"schemes": [...], "next_cursor": ...}.
+
+    Query parameters:
+    - q: text the names must contain (or start with, with match=prefix)
+    - limit: page size (default 20, at most 200)
+    - cursor: value of next_cursor from the previous page
+    """
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
+        index = get_scheme_index()
 
-        # Build a list of scheme names
-        scheme_names = [scheme.get("schemeName") for scheme in data if scheme.get("schemeName")]
+        try:
+            limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+            cursor = max(int(request.args.get("cursor", 0)), 0)
+        except ValueError:
+            return jsonify({"error": "'limit' and 'cursor' must be integers"}), 400
 
-        
-        return jsonify(scheme_names)  
+        query = request.args.get("q", "").strip()
+        match = request.args.get("match", "contains")
+        if match not in ("contains", "prefix"):
+            return jsonify({"error": "'match' must be 'contains' or 'prefix'"}), 400
+        scheme_names, next_cursor = index.page(query, limit, cursor, match)
+
+        return jsonify({"schemes": scheme_names, "next_cursor": next_cursor})
     except requests.exceptions.RequestException as e:
         return jsonify({"error": f"Failed to fetch mutual fund codes: {str(e)}"}), 500
     
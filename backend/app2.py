@@ -1,14 +1,29 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g, has_request_context, stream_with_context
 from flask_cors import CORS
 import requests
 from pinecone import Pinecone
 from pinecone_plugins.assistant.models.chat import Message
 import re
-from recommendation import get_recommendation
+from recommendation import RECOMMENDATIONS, get_recommendation
+from response_chunks import chunk_response
+from scheme_catalog import get_scheme_index, get_fund_matcher
+from nav_store import nav_store
+from rolling_returns import ROLLING_PERIODS, get_rolling_returns, trailing_returns
+from portfolio import parse_cash_flows, value_portfolio
+from chat_streaming import assistant_text, chat_stream_latency, segment_batches, sentence_segments, sse_event
+from generation_cache import generation_cache
+from llm_gateway import LLMGateway, StubModel
+from session_store import create_session_store
+from sip_parser import sip_parser_stats
+from translation_cache import translation_cache
+from translation_batch import pack_segments, split_segments, translation_round_trips
+from sip_simulation import DEFAULT_SIMULATION_PATHS, MAX_SIMULATION_PATHS, MAX_SIMULATION_YEARS, MIN_MONTHLY_RETURNS, monthly_returns, simulate_sip
 import google.generativeai as genai
 import os
-import json
-from calculations import is_calculation_query, handle_calculation_query, update_sip_parameters, setup_gemini, analyze_fund_data
+import threading
+import time
+import numpy as np
+from calculations import is_calculation_query, handle_calculation_query, update_sip_parameters, setup_gemini, analyze_fund_data, calculate_sip_batch, solve_sip_goal, sip_schedule
 
 # Initialize Pinecone and Assistant
 pc = Pinecone(api_key='')
@@ -18,24 +33,18 @@ assistant = pc.assistant.Assistant(assistant_name="rag1")
 GEMINI_API_KEY = ''
 genai.configure(api_key=GEMINI_API_KEY)
 
-# Get Gemini model for translation and calculations
-model = genai.GenerativeModel('gemini-2.0-flash')
+# Get Gemini model for translation and calculations, behind the gateway that bounds
+# concurrency and applies deadlines and retries. LLM_STUB=1 runs offline with a stub model.
+model = LLMGateway(StubModel() if os.environ.get("LLM_STUB") else genai.GenerativeModel('gemini-2.0-flash'))
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 
-# Global session tracking for user conversations
-user_sessions = {}
-
-# Global flag to track if recommendation flow is in progress
-in_recommendation_mode = False
-recommendation_state = {}
-
-# Global flag to track if calculation flow is in progress
-in_calculation_mode = False
-calculation_state = {}
+# Per-user conversation state (dialogue flows in progress, unread answer chunks),
+# bounded in size and age; SESSION_STORE selects a backend shared across workers
+sessions = create_session_store()
 
 # Dictionary for mapping language codes to their names
 language_names = {
@@ -44,25 +53,142 @@ language_names = {
     'gu': 'Gujarati'
 }
 
-def translate_text(text, source_lang, target_lang):
-    """Translate text using Gemini."""
+# Fixed prompts of the recommendation dialogue
+RECOMMENDATION_PROMPTS = {
+    "ask_age": "Please tell me your age (between 18-100):",
+    "ask_income": "What is your annual income (in dollars)?",
+    "retry_income": "Please specify your annual income (e.g., 50000 or 50k):",
+    "ask_risk": "On a scale of 1-5, what's your risk tolerance? (1 being very conservative, 5 being very aggressive)",
+    "retry_risk": "Please specify your risk tolerance (1-5):",
+    "restart": "I apologize, but something went wrong. Let's start over. What's your age?"
+}
+
+def count_translation(segments=0, model_calls=0):
+    """Add to the current request's translation counters, reported by report_translation_round_trips."""
+    if has_request_context():
+        g.translation_segments = g.get("translation_segments", 0) + segments
+        g.translation_calls = g.get("translation_calls", 0) + model_calls
+
+def translation_prompt(text, source_lang, target_lang):
+    return f"Translate the following text from {language_names.get(source_lang, source_lang)} to {language_names.get(target_lang, target_lang)}. Maintain the same tone and meaning. Here's the text: {text}"
+
+def gemini_translate(text, source_lang, target_lang):
+    """Translate text using Gemini; raises if the model call fails."""
+    prompt = translation_prompt(text, source_lang, target_lang)
+    
+    count_translation(model_calls=1)
+    response = model.generate_content(prompt)
+    
+    # Clean up any markdown formatting that might be in the response
+    return response.text.replace('```', '').strip()
+
+def gemini_translate_many(texts, source_lang, target_lang):
+    """
+    Translate several texts in one Gemini call; raises if the model call fails.
+    
+    The segments are sent between numbered marker lines. If the reply cannot be
+    split back into exactly the same segments, each text is translated on its own.
+    """
+    if len(texts) == 1:
+        return [gemini_translate(texts[0], source_lang, target_lang)]
+    
+    prompt = f"""Translate each segment below from {language_names.get(source_lang, source_lang)} to {language_names.get(target_lang, target_lang)}. Maintain the same tone and meaning.
+Every segment starts with a marker line such as <<<0>>>. Copy each marker line unchanged and put the translation of its segment after it. Do not add anything else.
+
+{pack_segments(texts)}"""
+    
+    count_translation(model_calls=1)
+    response = model.generate_content(prompt)
+    translations = split_segments(response.text.replace('```', ''), len(texts))
+    if translations is None:
+        print(f"Could not split batched translation of {len(texts)} segments; translating them one by one")
+        translations = [gemini_translate(text, source_lang, target_lang) for text in texts]
+    return translations
+
+def translate_many(texts, source_lang, target_lang):
+    """Translate several texts, with at most one Gemini call for all of those not cached yet."""
+    texts = list(texts)
     if source_lang == target_lang:
-        return text
+        return texts
     
+    # Blank segments need no translation
+    pending = [text for text in texts if text.strip()]
+    count_translation(segments=len(pending))
     try:
-        prompt = f"Translate the following text from {language_names.get(source_lang, source_lang)} to {language_names.get(target_lang, target_lang)}. Maintain the same tone and meaning. Here's the text: {text}"
-        
-        response = model.generate_content(prompt)
-        translated_text = response.text
-        
-        # Clean up any markdown formatting that might be in the response
-        translated_text = translated_text.replace('```', '').strip()
-        
-        return translated_text
+        translated = iter(translation_cache.translate_many(pending, source_lang, target_lang, gemini_translate_many))
+        return [next(translated) if text.strip() else text for text in texts]
     
     except Exception as e:
         print(f"Translation error: {e}")
-        return text  # Return original text if translation fails
+        return texts  # Return original texts if translation fails
+
+def translate_text(text, source_lang, target_lang):
+    """Translate text using Gemini, reusing cached translations."""
+    return translate_many([text], source_lang, target_lang)[0]
+
+def translate_stream(text, source_lang, target_lang):
+    """
+    Yield the translation of one text piece by piece as Gemini streams it; a
+    cached translation comes in one piece. If the call fails before anything
+    was sent, the original text is yielded instead.
+    """
+    count_translation(segments=1)
+    cached = translation_cache.get(text, source_lang, target_lang)
+    if cached is not None:
+        yield cached
+        return
+    
+    count_translation(model_calls=1)
+    pieces = []
+    try:
+        for piece in model.stream_content(translation_prompt(text, source_lang, target_lang)):
+            piece = piece.replace('```', '')
+            pieces.append(piece)
+            yield piece
+    except Exception as e:
+        if pieces:
+            raise
+        print(f"Translation error: {e}")
+        yield text
+        return
+    translation_cache.set(text, source_lang, target_lang, "".join(pieces).strip())
+
+def record_translation_round_trips():
+    """Add the current request's translation counters to translation_round_trips, reset them and return the model calls."""
+    segments = g.pop("translation_segments", 0)
+    model_calls = g.pop("translation_calls", 0)
+    if segments:
+        translation_round_trips.record(segments, model_calls)
+    return model_calls
+
+@app.after_request
+def report_translation_round_trips(response):
+    """
+    Record how many translation round trips this request needed versus one per segment.
+
+    A streamed response only translates once its generator runs, after this
+    hook; chat_stream records those counts itself with record_translation_round_trips.
+    """
+    segments = g.get("translation_segments", 0)
+    if segments:
+        model_calls = record_translation_round_trips()
+        response.headers["X-Translation-Segments"] = str(segments)
+        response.headers["X-Translation-Model-Calls"] = str(model_calls)
+    return response
+
+def static_translation_texts():
+    """Every canned English text shown to users: dialogue prompts and all recommendations."""
+    return list(RECOMMENDATION_PROMPTS.values()) + list(RECOMMENDATIONS.values())
+
+def precompute_static_translations():
+    """Translate all static texts into every supported language, skipping ones already cached."""
+    pairs = [('en', lang) for lang in language_names if lang != 'en']
+    added = translation_cache.precompute(static_translation_texts(), pairs, gemini_translate)
+    print(f"Precomputed {added} static translations")
+
+# Set TRANSLATION_PRECOMPUTE=1 to warm the translation cache in the background at startup
+if os.environ.get("TRANSLATION_PRECOMPUTE", "").lower() in ("1", "true", "yes"):
+    threading.Thread(target=precompute_static_translations, daemon=True).start()
 
 def is_recommendation_request(query: str) -> bool:
     """Check if the query is asking for investment recommendations."""
@@ -73,9 +199,9 @@ def is_recommendation_request(query: str) -> bool:
     ]
     return any(keyword in query.lower() for keyword in recommendation_keywords)
 
-def handle_recommendation_logic(query: str, lang: str) -> str:
-    """Handle the recommendation dialogue flow with translation support."""
-    global recommendation_state, in_recommendation_mode
+def handle_recommendation_logic(query: str, lang: str, session: dict) -> str:
+    """Handle the recommendation dialogue flow with translation support, keeping its state in `session`."""
+    recommendation_state = session["recommendation_state"]
 
     # First translate the query to English for processing
     if lang != 'en':
@@ -91,9 +217,9 @@ def handle_recommendation_logic(query: str, lang: str) -> str:
             age = int(age_match.group(1))
             if 18 <= age <= 100:
                 recommendation_state['age'] = age
-                response_in_english = "What is your annual income (in dollars)?"
+                response_in_english = RECOMMENDATION_PROMPTS["ask_income"]
         else:
-            response_in_english = "Please tell me your age (between 18-100):"
+            response_in_english = RECOMMENDATION_PROMPTS["ask_age"]
 
     elif 'income' not in recommendation_state:
         income_match = re.search(r'\b(\d+)(?:k)?\b', query_in_english.lower())
@@ -103,29 +229,40 @@ def handle_recommendation_logic(query: str, lang: str) -> str:
             if 'k' in query_in_english.lower():
                 income *= 1000
             recommendation_state['income'] = income
-            response_in_english = "On a scale of 1-5, what's your risk tolerance? (1 being very conservative, 5 being very aggressive)"
+            response_in_english = RECOMMENDATION_PROMPTS["ask_risk"]
         else:
-            response_in_english = "Please specify your annual income (e.g., 50000 or 50k):"
+            response_in_english = RECOMMENDATION_PROMPTS["retry_income"]
 
     elif 'risk' not in recommendation_state:
         risk_match = re.search(r'[1-5]', query_in_english)
         if risk_match:
             risk = int(risk_match.group())
             recommendation_state['risk'] = risk
-            # Generate recommendation
+            # Generate recommendation, using the pre-translated corpus when it has this language
+            translated = None
+            if lang != 'en':
+                translated = get_recommendation(
+                    recommendation_state['age'],
+                    recommendation_state['income'],
+                    risk,
+                    lang,
+                    fallback=False
+                )
             response_in_english = get_recommendation(
                 recommendation_state['age'],
                 recommendation_state['income'],
                 risk
             )
             # Clear the state and recommendation mode after giving the recommendation
-            recommendation_state = {}
-            in_recommendation_mode = False
+            session["recommendation_state"] = {}
+            session["recommendation_mode"] = False
+            if translated is not None:
+                return translated
         else:
-            response_in_english = "Please specify your risk tolerance (1-5):"
+            response_in_english = RECOMMENDATION_PROMPTS["retry_risk"]
     
     else:
-        response_in_english = "I apologize, but something went wrong. Let's start over. What's your age?"
+        response_in_english = RECOMMENDATION_PROMPTS["restart"]
 
     # Translate response back to target language if needed
     if lang != 'en':
@@ -140,27 +277,32 @@ def extract_fund_name(query):
         return match.group(1).strip()
     return None
 
-def chunk_response(text, chunk_size=300):
-    """Split a long response into chunks of max `chunk_size` characters."""
-    words = text.split()
-    chunks = []
-    chunk = []
-
-    for word in words:
-        if sum(len(w) for w in chunk) + len(word) + len(chunk) > chunk_size:
-            chunks.append(" ".join(chunk))
-            chunk = []
-        chunk.append(word)
+def next_answer_chunk(session, language):
+    """
+    Return the next unread chunk of the user's last assistant answer in `language`,
+    or None when there is none.
     
-    if chunk:
-        chunks.append(" ".join(chunk))
-
-    return chunks
+    The session keeps the answer's chunks per language. Each chunk is translated
+    at most once per language: if the reader switches language mid-answer, the
+    unread English chunks are translated in one batch and kept for later requests.
+    """
+    answer = session.get("answer")
+    if not answer:
+        return None
+    
+    chunks = answer["chunks"]
+    position = answer["next"]
+    if language not in chunks:
+        # Chunks already read are not translated; JSON keeps the None placeholders
+        chunks[language] = [None] * position + translate_many(chunks['en'][position:], 'en', language)
+    
+    answer["next"] = position + 1
+    if answer["next"] >= len(chunks['en']):
+        session["answer"] = None
+    return chunks[language][position]
 
 @app.route("/chat", methods=["POST"])
 def chat():
-    global user_sessions, in_recommendation_mode, in_calculation_mode, calculation_state
-
     try:
         data = request.get_json()
         user_id = data.get("user_id", "default_user")  # Track user sessions
@@ -174,160 +316,235 @@ def chat():
         if not user_message:
             return jsonify({"error": "'query' field is missing"}), 400
 
-        # Check if user has pending message chunks
-        if user_id in user_sessions and user_sessions[user_id]:
-            remaining_chunks = user_sessions[user_id].pop(0)  # Get next chunk
-            
-            # Translate remaining chunk if needed
-            if language != 'en':
-                remaining_chunks = translate_text(remaining_chunks, 'en', language)
-                
-            return jsonify({"response": remaining_chunks})
-
-        # Check if it's a fund query containing @
-        fund_name = extract_fund_name(user_message)
-        if fund_name:
-            # Translate user message to English if needed
-            if language != 'en':
-                query_for_processing = translate_text(user_message, language, 'en')
-            else:
-                query_for_processing = user_message
-                
-            # Get fund data
-            try:
-                fund_response = requests.get(f"https://api.mfapi.in/mf")
-                fund_response.raise_for_status()
-                funds_data = fund_response.json()
+        with sessions.session(user_id) as session:
+            # Check if user has pending message chunks
+            remaining_chunk = next_answer_chunk(session, language)
+        if remaining_chunk is not None:
+            return jsonify({"response": remaining_chunk})
+
+        # The rest may call Pinecone and Gemini, so the user's lock is not held meanwhile
+        with sessions.detached_session(user_id) as session:
+            # Check if it's a fund query containing @
+            fund_name = extract_fund_name(user_message)
+            if fund_name:
+                # Translate user message to English if needed
+                if language != 'en':
+                    query_for_processing = translate_text(user_message, language, 'en')
+                else:
+                    query_for_processing = user_message
                 
-                # Find the code for the given fund name
-                fund_code = None
-                for fund in funds_data:
-                    if fund.get("schemeName") and fund_name.lower() in fund.get("schemeName").lower():
-                        fund_code = fund.get("schemeCode")
-                        break
+                # Get fund data
+                try:
+                    # Find the code of the closest matching fund (typos allowed)
+                    fund_code = get_fund_matcher().best_code(fund_name)
                 
-                if not fund_code:
-                    return jsonify({"response": f"Could not find fund matching '{fund_name}'. Please check the fund name."})
+                    if not fund_code:
+                        return jsonify({"response": f"Could not find fund matching '{fund_name}'. Please check the fund name."})
                 
-                # Fetch fund historical data
-                fund_details = requests.get(f"https://api.mfapi.in/mf/{fund_code}")
-                fund_details.raise_for_status()
-                nav_data = fund_details.json().get("data", [])
+                    # Fund historical data as (days, navs) arrays, from the local NAV store
+                    nav_data = nav_store.get(fund_code)
                 
-                if not nav_data:
-                    return jsonify({"response": f"No historical data found for '{fund_name}'."})
+                    if not len(nav_data[0]):
+                        return jsonify({"response": f"No historical data found for '{fund_name}'."})
                 
-                # Analyze fund data with user's question
-                analysis = analyze_fund_data(nav_data, query_for_processing, fund_name, model)
+                    # Analyze fund data with user's question
+                    analysis = analyze_fund_data(nav_data, query_for_processing, fund_name, model, scheme_code=fund_code)
                 
-                # Translate analysis back to user's language if needed
-                if language != 'en':
-                    analysis = translate_text(analysis, 'en', language)
-                
-                return jsonify({"response": analysis})
+                    # Translate analysis back to user's language if needed
+                    if language != 'en':
+                        analysis = translate_text(analysis, 'en', language)
                 
-            except Exception as e:
-                print(f"Error processing fund query: {e}")
-                error_msg = f"Error processing fund data for '{fund_name}': {str(e)}"
-                if language != 'en':
-                    error_msg = translate_text(error_msg, 'en', language)
-                return jsonify({"response": error_msg})
-
-        # Check if we're in calculation mode
-        if in_calculation_mode:
-            if calculation_state.get("complete", True):
-                # Start a new calculation
-                calculation_result = handle_calculation_query(user_message, model, translate_text, language, language)
-                calculation_state = calculation_result
-                in_calculation_mode = not calculation_result.get("complete", True)
-                return jsonify({"response": calculation_result["response"]})
-            else:
-                # Continue with the current calculation
-                updated_state = update_sip_parameters(calculation_state, user_message, model)
-                calculation_state = updated_state
+                    return jsonify({"response": analysis})
                 
-                if not updated_state.get("missing"):
-                    # All parameters are collected, perform the calculation
-                    calculation_result = handle_calculation_query("", model, translate_text, language, language)
-                    calculation_state = calculation_result
-                    in_calculation_mode = False
+                except Exception as e:
+                    print(f"Error processing fund query: {e}")
+                    error_msg = f"Error processing fund data for '{fund_name}': {str(e)}"
+                    if language != 'en':
+                        error_msg = translate_text(error_msg, 'en', language)
+                    return jsonify({"response": error_msg})
+
+            # Check if we're in calculation mode
+            if session["calculation_mode"]:
+                if session["calculation_state"].get("complete", True):
+                    # Start a new calculation
+                    calculation_result = handle_calculation_query(user_message, model, translate_text, language, language)
+                    session["calculation_state"] = calculation_result
+                    session["calculation_mode"] = not calculation_result.get("complete", True)
                     return jsonify({"response": calculation_result["response"]})
                 else:
-                    # Still missing parameters
-                    missing_param_names = {
-                        "monthly_investment": "monthly investment amount",
-                        "interest_rate": "annual interest rate (as a percentage)",
-                        "time_period": "investment duration in years"
-                    }
+                    # Continue with the current calculation
+                    updated_state = update_sip_parameters(session["calculation_state"], user_message, model)
+                    session["calculation_state"] = updated_state
+                
+                    if not updated_state.get("missing"):
+                        # All parameters are collected, perform the calculation
+                        calculation_result = handle_calculation_query("", model, translate_text, language, language)
+                        session["calculation_state"] = calculation_result
+                        session["calculation_mode"] = False
+                        return jsonify({"response": calculation_result["response"]})
+                    else:
+                        # Still missing parameters
+                        missing_param_names = {
+                            "monthly_investment": "monthly investment amount",
+                            "interest_rate": "annual interest rate (as a percentage)",
+                            "time_period": "investment duration in years"
+                        }
                     
-                    next_param = updated_state["missing"][0]
-                    response = f"Please provide the {missing_param_names[next_param]}:"
+                        next_param = updated_state["missing"][0]
+                        response = f"Please provide the {missing_param_names[next_param]}:"
                     
-                    # Translate the response
-                    if language != 'en':
-                        response = translate_text(response, 'en', language)
+                        # Translate the response
+                        if language != 'en':
+                            response = translate_text(response, 'en', language)
                     
-                    return jsonify({"response": response})
+                        return jsonify({"response": response})
+
+            # Check if we're in recommendation mode
+            if is_recommendation_request(user_message) or session["recommendation_mode"]:
+                session["recommendation_mode"] = True
+                response = handle_recommendation_logic(user_message, language, session)
+                return jsonify({"response": response})
+        
+            # Check if it's a calculation query
+            if not session["calculation_mode"]:
+                # Translate user message to English if needed
+                if language != 'en':
+                    query_for_processing = translate_text(user_message, language, 'en')
+                else:
+                    query_for_processing = user_message
+            
+                calc_type = is_calculation_query(query_for_processing)
+                if calc_type:
+                    session["calculation_mode"] = True
+                    calculation_result = handle_calculation_query(user_message, model, translate_text, language, language)
+                    session["calculation_state"] = calculation_result
+                    session["calculation_mode"] = not calculation_result.get("complete", True)
+                    return jsonify({"response": calculation_result["response"]})
 
-        # Check if we're in recommendation mode
-        if is_recommendation_request(user_message) or in_recommendation_mode:
-            in_recommendation_mode = True
-            response = handle_recommendation_logic(user_message, language)
-            return jsonify({"response": response})
+            # If not in any special mode, process with the assistant
         
-        # Check if it's a calculation query
-        if not in_calculation_mode:
-            # Translate user message to English if needed
+            # Translate user message to English if not in English
             if language != 'en':
                 query_for_processing = translate_text(user_message, language, 'en')
             else:
                 query_for_processing = user_message
-            
-            calc_type = is_calculation_query(query_for_processing)
-            if calc_type:
-                in_calculation_mode = True
-                calculation_result = handle_calculation_query(user_message, model, translate_text, language, language)
-                calculation_state = calculation_result
-                in_calculation_mode = not calculation_result.get("complete", True)
-                return jsonify({"response": calculation_result["response"]})
-
-        # If not in any special mode, process with the assistant
-        
-        # Translate user message to English if not in English
-        if language != 'en':
-            query_for_processing = translate_text(user_message, language, 'en')
-        else:
-            query_for_processing = user_message
 
-        # Create message for Pinecone Assistant
-        msg = Message(content=query_for_processing)
-        response = assistant.chat(messages=[msg], stream=False)
+            # Create message for Pinecone Assistant
+            msg = Message(content=query_for_processing)
+            response = assistant.chat(messages=[msg], stream=False)
 
-        if 'message' not in response:
-            return jsonify({"error": "Invalid response from assistant"}), 500
+            if 'message' not in response:
+                return jsonify({"error": "Invalid response from assistant"}), 500
 
-        # Get the full response in English
-        full_response_english = response["message"]["content"]
+            # Get the full response in English
+            full_response_english = response["message"]["content"]
         
-        # Translate back to user's language if needed
-        if language != 'en':
-            full_response = translate_text(full_response_english, 'en', language)
-        else:
-            full_response = full_response_english
-
-        # Split response into multiple messages
-        response_chunks = chunk_response(full_response)
+            # Split response into multiple messages
+            english_chunks = chunk_response(full_response_english)
+            chunks = {'en': english_chunks}
+        
+            # Translate all messages to the user's language in one go if needed
+            if language != 'en':
+                chunks[language] = translate_many(english_chunks, 'en', language)
 
-        # Store remaining chunks in session
-        if len(response_chunks) > 1:
-            user_sessions[user_id] = response_chunks[1:]
+            # Keep every chunk, tagged by language, for the "continue" requests that follow
+            if len(english_chunks) > 1:
+                session["answer"] = {"chunks": chunks, "next": 1}
 
-        return jsonify({"response": response_chunks[0]})
+            return jsonify({"response": chunks[language][0]})
 
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Stream the assistant's answer as Server-Sent Events.
+    
+    Takes the same body as /chat. Each event carries {"token": ...} with the
+    next piece of the answer; for Hindi and Gujarati complete English sentences
+    are translated in batches of growing size (see segment_batches), one
+    Gemini call per batch. The first sentence is a batch of its own and its
+    translation is streamed token by token, so the answer starts at once. A final
+    "done" event reports ttfb_ms (time to the first token) and total_ms; an
+    "error" event is sent instead if the stream fails. Messages handled by the
+    fund, calculation or recommendation flows are answered by /chat and sent
+    as a single token.
+    """
+    started = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    user_id = data.get("user_id", "default_user")
+    user_message = data.get("query")
+    language = data.get("language", "en")
+    
+    if language not in language_names:
+        return jsonify({"error": "Invalid language selected. Please choose English, Hindi, or Gujarati."}), 400
+    if not user_message:
+        return jsonify({"error": "'query' field is missing"}), 400
+    
+    # A streamed answer supersedes any unread chunks of an earlier /chat answer
+    with sessions.session(user_id) as session:
+        session["answer"] = None
+        in_dialogue = session["calculation_mode"] or session["recommendation_mode"]
+    
+    query_for_processing = translate_text(user_message, language, 'en') if language != 'en' else user_message
+    handled_by_chat = bool(
+        extract_fund_name(user_message) or in_dialogue
+        or is_recommendation_request(user_message) or is_calculation_query(query_for_processing)
+    )
+    
+    def tokens():
+        if handled_by_chat:
+            result = chat()
+            body = (result[0] if isinstance(result, tuple) else result).get_json()
+            yield body.get("response") or body.get("error", "")
+            return
+        
+        msg = Message(content=query_for_processing)
+        english = (assistant_text(chunk) for chunk in assistant.chat(messages=[msg], stream=True))
+        if language == 'en':
+            yield from english
+            return
+        
+        # Sentences are translated a batch at a time, one model call per batch; a
+        # batch of one (always the first) is streamed so the answer starts at once
+        for batch in segment_batches(sentence_segments(english)):
+            sentences = [segment.rstrip() for segment in batch]
+            if len(batch) == 1:
+                translations = [translate_stream(sentences[0], 'en', language) if sentences[0] else [""]]
+            else:
+                translations = [[translated] for translated in translate_many(sentences, 'en', language)]
+            for segment, sentence, translated in zip(batch, sentences, translations):
+                yield from translated
+                yield segment[len(sentence):]
+    
+    def events():
+        first_token = None
+        try:
+            for token in tokens():
+                if not token:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                yield sse_event({"token": token})
+        except Exception as e:
+            print(f"Error streaming chat response: {e}")
+            yield sse_event({"error": "Error getting response"}, event="error")
+            return
+        finally:
+            # The after_request hook ran before this generator, so streamed translations are counted here
+            record_translation_round_trips()
+        
+        finished = time.perf_counter()
+        ttfb_ms = ((first_token or finished) - started) * 1000
+        total_ms = (finished - started) * 1000
+        chat_stream_latency.record(ttfb_ms, total_ms)
+        yield sse_event({"ttfb_ms": round(ttfb_ms, 1), "total_ms": round(total_ms, 1)}, event="done")
+    
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.route('/analyze-fund', methods=['POST'])
 def analyze_fund_endpoint():
     """Analyze fund data and respond to specific questions using Gemini."""
@@ -356,18 +573,261 @@ def analyze_fund_endpoint():
         print(f"Error in fund analysis: {e}")
         return jsonify({"error": f"Failed to analyze fund data: {str(e)}"}), 500
 
+# Largest number of scenarios accepted by /calculate/sip/batch in one request
+MAX_SIP_BATCH_SIZE = 100000
+
+@app.route('/calculate/sip/batch', methods=['POST'])
+def calculate_sip_batch_endpoint():
+    """
+    Price many SIP scenarios in one request.
+
+    The body holds equal-length lists (or single numbers, applied to every
+    scenario) for monthly_investment, interest_rate, time_period and the
+    optional lump_sum. The response holds lists of total_investment,
+    total_returns and total_future_value in the same order.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON object with monthly_investment, interest_rate and time_period"}), 400
+    try:
+        fields = ["monthly_investment", "interest_rate", "time_period", "lump_sum"]
+        missing = [field for field in fields[:3] if data.get(field) is None]
+        if missing:
+            return jsonify({"error": f"Missing required field(s): {', '.join(missing)}"}), 400
+
+        try:
+            # A null anywhere (including lump_sum) becomes NaN here and is rejected below
+            inputs = [np.asarray(data.get(field, 0), dtype=np.float64) for field in fields]
+            size = np.broadcast_shapes(*(value.shape for value in inputs))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Inputs must be numbers or equal-length lists of numbers"}), 400
+        if not all(np.isfinite(value).all() for value in inputs):
+            return jsonify({"error": "Inputs must be numbers or equal-length lists of numbers"}), 400
+
+        if len(size) > 1 or (size and size[0] > MAX_SIP_BATCH_SIZE):
+            return jsonify({"error": f"Send a flat list of at most {MAX_SIP_BATCH_SIZE} scenarios"}), 400
+
+        results = calculate_sip_batch(*inputs)
+        if not all(np.isfinite(values).all() for values in results.values()):
+            return jsonify({"error": "Some scenarios are too large to calculate"}), 400
+        return jsonify({name: np.atleast_1d(values).tolist() for name, values in results.items()})
+
+    except Exception as e:
+        print(f"Error in batch SIP calculation: {e}")
+        return jsonify({"error": f"Failed to calculate SIP batch: {str(e)}"}), 500
+
+@app.route('/calculate/sip/goal', methods=['POST'])
+def solve_sip_goal_endpoint():
+    """
+    Work out the SIP input needed to reach a target corpus.
+
+    The body gives target_amount, exactly two of monthly_investment,
+    interest_rate and time_period, and optionally lump_sum. The response is the
+    full SIP calculation for the solved inputs, with "solved_for" naming the
+    input that was computed.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON object with target_amount and two of monthly_investment, interest_rate and time_period"}), 400
+    result = solve_sip_goal(
+        data.get("target_amount"),
+        monthly_investment=data.get("monthly_investment"),
+        interest_rate=data.get("interest_rate"),
+        time_period=data.get("time_period"),
+        lump_sum=data.get("lump_sum", 0)
+    )
+    if "error" in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+# Largest downsampled schedule returned by /calculate/sip/schedule
+MAX_SCHEDULE_POINTS = 1200
+
+@app.route('/calculate/sip/schedule', methods=['POST'])
+def sip_schedule_endpoint():
+    """
+    Project a SIP month by month with step-up, inflation, pauses and withdrawals.
+
+    The body gives monthly_investment, interest_rate and time_period, and
+    optionally lump_sum, step_up (% a year), inflation (% a year), pauses
+    ([[first_month, last_month], ...]), withdrawals ([[month, amount], ...])
+    and schedule_points to include a downsampled schedule for charting.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON object with monthly_investment, interest_rate and time_period"}), 400
+    try:
+        schedule_points = data.get("schedule_points")
+        schedule_points = min(int(schedule_points), MAX_SCHEDULE_POINTS) if schedule_points else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "'schedule_points' must be an integer"}), 400
+
+    result = sip_schedule(
+        data.get("monthly_investment"),
+        data.get("interest_rate"),
+        data.get("time_period"),
+        data.get("lump_sum", 0),
+        step_up=data.get("step_up", 0),
+        inflation=data.get("inflation", 0),
+        pauses=data.get("pauses"),
+        withdrawals=data.get("withdrawals"),
+        schedule_points=schedule_points
+    )
+    if "error" in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/calculate/sip/simulate', methods=['POST'])
+def simulate_sip_endpoint():
+    """
+    Simulate SIP outcomes by bootstrapping a fund's historical monthly returns.
+
+    The body names the fund by scheme_code or fund_name and gives
+    monthly_investment, time_period (years) and optionally lump_sum,
+    paths (default 10,000) and seed. time_period is at most MAX_SIMULATION_YEARS.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Send a JSON object with monthly_investment, time_period and a scheme_code or fund_name"}), 400
+    try:
+        missing = [field for field in ("monthly_investment", "time_period") if data.get(field) is None]
+        if missing:
+            return jsonify({"error": f"Missing required field(s): {', '.join(missing)}"}), 400
+
+        try:
+            monthly_investment = float(data["monthly_investment"])
+            time_period = float(data["time_period"])
+            lump_sum = float(data.get("lump_sum") or 0)
+        except (TypeError, ValueError):
+            return jsonify({"error": "'monthly_investment', 'time_period' and 'lump_sum' must be numbers"}), 400
+        if not (np.isfinite([monthly_investment, lump_sum]).all() and monthly_investment >= 0 and lump_sum >= 0):
+            return jsonify({"error": "'monthly_investment' and 'lump_sum' must be non-negative numbers"}), 400
+        if not 1 / 12 <= time_period <= MAX_SIMULATION_YEARS:
+            return jsonify({"error": f"'time_period' must be between one month and {MAX_SIMULATION_YEARS} years"}), 400
+
+        scheme_code = data.get("scheme_code")
+        if scheme_code is None and data.get("fund_name"):
+            scheme_code = get_fund_matcher().best_code(data["fund_name"])
+        if scheme_code is None:
+            return jsonify({"error": "Provide a valid 'scheme_code' or 'fund_name'"}), 400
+
+        try:
+            paths = int(data.get("paths", DEFAULT_SIMULATION_PATHS))
+            seed = data.get("seed")
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "'paths' and 'seed' must be integers"}), 400
+        if not 1 <= paths <= MAX_SIMULATION_PATHS:
+            return jsonify({"error": f"'paths' must be between 1 and {MAX_SIMULATION_PATHS}"}), 400
+
+        days, navs = nav_store.get(scheme_code)
+        returns = monthly_returns(days, navs) if len(days) else []
+        if len(returns) < MIN_MONTHLY_RETURNS:
+            return jsonify({"error": f"Not enough NAV history to simulate scheme '{scheme_code}'."}), 404
+
+        result = simulate_sip(returns, monthly_investment, time_period, lump_sum, paths=paths, seed=seed)
+        result["scheme_code"] = scheme_code
+        result["history_months"] = len(returns)
+        return jsonify(result)
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch NAV history: {str(e)}"}), 500
+    except Exception as e:
+        print(f"Error in SIP simulation: {e}")
+        return jsonify({"error": f"Failed to simulate SIP: {str(e)}"}), 500
+
+@app.route('/funds/<code>/returns', methods=['GET'])
+def get_fund_returns(code):
+    """
+    Serve trailing returns and rolling 1Y/3Y/5Y CAGR series for a fund.
+
+    Query parameters:
+    - periods: comma-separated rolling periods to include (default: 1Y,3Y,5Y)
+    - series=false: return only the distributions, not the full series
+    """
+    try:
+        periods = request.args.get("periods", ",".join(ROLLING_PERIODS)).upper().split(",")
+        unknown = [period for period in periods if period not in ROLLING_PERIODS]
+        if unknown:
+            return jsonify({"error": f"Unknown rolling period(s): {', '.join(unknown)}"}), 400
+        include_series = request.args.get("series", "true").lower() not in ("0", "false", "no")
+
+        days, navs = nav_store.get(code)
+        if not len(days):
+            return jsonify({"error": f"No historical data available for scheme '{code}'."}), 404
+
+        rolling = get_rolling_returns(code, days, navs)
+        result = {}
+        for period in periods:
+            result[period] = {"distribution": rolling.stats[period]}
+            if include_series:
+                series_days, cagr = rolling.series[period]
+                result[period]["dates"] = np.datetime_as_string(series_days.astype('datetime64[D]')).tolist()
+                result[period]["cagr"] = np.round(cagr, 4).tolist()
+
+        return jsonify({
+            "scheme_code": code,
+            "latest_date": str(np.datetime64(int(days[-1]), 'D')),
+            "trailing": trailing_returns(days, navs),
+            "rolling": result
+        })
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch NAV history for scheme '{code}': {str(e)}"}), 500
+
+# Largest number of cash flows accepted in one portfolio valuation
+MAX_PORTFOLIO_CASH_FLOWS = 50000
+
+@app.route('/funds/<code>/xirr', methods=['POST'])
+def get_fund_xirr(code):
+    """
+    Value a user's actual transactions in a fund and compute their XIRR.
+
+    The body holds "cash_flows": a list of {"date": "YYYY-MM-DD", "amount": ...}
+    with purchases as positive amounts and redemptions as negative ones. Units
+    are bought or sold at the NAV on or before each date and valued at the
+    latest NAV.
+    """
+    try:
+        cash_flows = (request.get_json(silent=True) or {}).get("cash_flows")
+        if not isinstance(cash_flows, list) or not cash_flows:
+            return jsonify({"error": "Provide a non-empty 'cash_flows' list"}), 400
+        if len(cash_flows) > MAX_PORTFOLIO_CASH_FLOWS:
+            return jsonify({"error": f"Send at most {MAX_PORTFOLIO_CASH_FLOWS} cash flows"}), 400
+
+        days, navs = nav_store.get(code)
+        if not len(days):
+            return jsonify({"error": f"No historical data available for scheme '{code}'."}), 404
+
+        try:
+            result = value_portfolio(days, navs, *parse_cash_flows(cash_flows))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        result["scheme_code"] = code
+        return jsonify(result)
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch NAV history for scheme '{code}': {str(e)}"}), 500
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Serve runtime counters, such as how often SIP queries were parsed without Gemini."""
+    return jsonify({
+        "chat_stream": chat_stream_latency.stats(),
+        "generation_cache": generation_cache.stats(),
+        "llm_gateway": model.stats(),
+        "sessions": sessions.stats(),
+        "sip_parser": sip_parser_stats.stats(),
+        "translation_cache": translation_cache.stats(),
+        "translation_round_trips": translation_round_trips.stats()
+    })
+
 @app.route('/<fundname>', methods=['GET'])
 def get_details(fundname):
     """Fetch past and present details for a specific mutual fund."""
-    api_url = "https://api.mfapi.in/mf"
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-
         # Find the code for the given fund name
-        maps = {scheme.get("schemeName"): scheme.get("schemeCode") for scheme in data}
-        code = maps.get(fundname)
+        code = get_scheme_index().code_for(fundname)
 
         if not code:
             return jsonify({"error": f"Fund name '{fundname}' not found."}), 404
@@ -389,17 +849,39 @@ def get_details(fundname):
 
 @app.route('/schemes', methods=['GET'])
 def get_names():
-    """Fetch all mutual fund schemes and return schemeName-to-schemeCode mappings."""
-    api_url = "https://api.mfapi.in/mf"
+    """Return every mutual fund scheme name as a plain list; /v2/schemes serves them a page at a time."""
+    try:
+        return jsonify(get_scheme_index().names)
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to fetch mutual fund codes: {str(e)}"}), 500
+
+@app.route('/v2/schemes', methods=['GET'])
+def get_names_page():
+    """
+    Return mutual fund scheme names for the @ autocomplete, one page at a time,
+    as {"schemes": [...], "next_cursor": ...}.
+
+    Query parameters:
+    - q: text the names must contain (or start with, with match=prefix)
+    - limit: page size (default 20, at most 200)
+    - cursor: value of next_cursor from the previous page
+    """
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
+        index = get_scheme_index()
 
-        # Build a list of scheme names
-        scheme_names = [scheme.get("schemeName") for scheme in data if scheme.get("schemeName")]
-        
-        return jsonify(scheme_names)  
+        try:
+            limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+            cursor = max(int(request.args.get("cursor", 0)), 0)
+        except ValueError:
+            return jsonify({"error": "'limit' and 'cursor' must be integers"}), 400
+
+        query = request.args.get("q", "").strip()
+        match = request.args.get("match", "contains")
+        if match not in ("contains", "prefix"):
+            return jsonify({"error": "'match' must be 'contains' or 'prefix'"}), 400
+        scheme_names, next_cursor = index.page(query, limit, cursor, match)
+
+        return jsonify({"schemes": scheme_names, "next_cursor": next_cursor})
     except requests.exceptions.RequestException as e:
         return jsonify({"error": f"Failed to fetch mutual fund codes: {str(e)}"}), 500
     
@@ -1,13 +1,17 @@
 import re
 import google.generativeai as genai
-from datetime import datetime, timedelta
 import numpy as np
 import json
+from nav_store import parse_nav_records, to_nav_records
+from fund_analytics import get_fund_analytics
+from generation_cache import generation_cache, generation_key
+from llm_gateway import LLMGateway
+from sip_parser import parse_sip_query, parse_sip_value, is_complete, sip_parser_stats
 
 def setup_gemini(api_key):
-    """Setup Gemini AI with the provided API key."""
+    """Setup Gemini AI with the provided API key; the model is wrapped in an LLMGateway."""
     genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-2.0-flash')
+    return LLMGateway(genai.GenerativeModel('gemini-2.0-flash'))
 
 def is_calculation_query(query):
     """Check if a query is calculation-based."""
@@ -39,7 +43,19 @@ def extract_fund_name(query):
     return None
 
 def extract_sip_parameters(query, model):
-    """Extract SIP calculation parameters from the query using Gemini."""
+    """
+    Extract SIP calculation parameters from the query.
+    
+    The local parser handles most queries; Gemini is only asked when it
+    cannot fill every required field from explicitly marked numbers, and its
+    answer is completed with whatever the local parser did find.
+    """
+    local_params, resolved = parse_sip_query(query)
+    parsed = resolved and is_complete(local_params)
+    sip_parser_stats.record(parsed)
+    if parsed:
+        return local_params
+    
     try:
         prompt = """
         Extract SIP (Systematic Investment Plan) calculation parameters from the following query.
@@ -48,6 +64,8 @@ def extract_sip_parameters(query, model):
         - interest_rate: Annual interest rate as a percentage (number only)
         - time_period: Investment duration in years (number only)
         - lump_sum: Any initial lump sum amount (number only, 0 if not specified)
+        - step_up: Yearly increase in the monthly investment as a percentage (number only, 0 if not specified)
+        - inflation: Annual inflation rate as a percentage to adjust for (number only, 0 if not specified)
         
         If any parameter is missing, set its value to null.
         
@@ -65,16 +83,14 @@ def extract_sip_parameters(query, model):
         
         # Parse the JSON
         params = json.loads(response_text)
+        for key, value in local_params.items():
+            if params.get(key) is None:
+                params[key] = value
         return params
     
     except Exception as e:
         print(f"Error extracting SIP parameters: {e}")
-        return {
-            "monthly_investment": None,
-            "interest_rate": None,
-            "time_period": None,
-            "lump_sum": 0
-        }
+        return local_params
 
 def calculate_sip(monthly_investment, interest_rate, time_period, lump_sum=0):
     """
@@ -105,8 +121,11 @@ def calculate_sip(monthly_investment, interest_rate, time_period, lump_sum=0):
         # Calculate number of months
         months = int(time_period * 12)
         
-        # Calculate future value of SIP
-        sip_future_value = monthly_investment * (((1 + monthly_rate) ** months - 1) / monthly_rate) * (1 + monthly_rate)
+        # Calculate future value of SIP (at 0% it is just the sum of instalments)
+        if monthly_rate == 0:
+            sip_future_value = monthly_investment * months
+        else:
+            sip_future_value = monthly_investment * (((1 + monthly_rate) ** months - 1) / monthly_rate) * (1 + monthly_rate)
         
         # Calculate future value of lump sum
         lump_sum_future_value = lump_sum * ((1 + interest_rate/100) ** time_period)
@@ -137,6 +156,310 @@ def calculate_sip(monthly_investment, interest_rate, time_period, lump_sum=0):
     except Exception as e:
         return {"error": f"Calculation error: {str(e)}"}
 
+def _round_paisa(values):
+    """Round an array to 2 decimals exactly like Python's round(x, 2) does for each element."""
+    rounded = np.round(values, 2)
+    # np.round scales by 100 first, which can tip values sitting right at half a paisa
+    # the other way; redo just those with Python's correctly rounded round()
+    scaled = np.abs(values) * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < np.maximum(1e-6, scaled * 1e-13)
+    for i in np.flatnonzero(near_half):
+        rounded.flat[i] = round(float(values.flat[i]), 2)
+    return rounded
+
+def calculate_sip_batch(monthly_investment, interest_rate, time_period, lump_sum=0):
+    """
+    Calculate SIP returns for many scenarios at once.
+    
+    Parameters are arrays (or scalars, which are broadcast) with the same
+    meaning as in calculate_sip. Results agree with calculate_sip to the paisa
+    (NumPy's power() can differ from Python's ** in the last bit, so a value
+    sitting exactly on a half paisa may round the other way). A 0% rate, which
+    calculate_sip rejects, gives the plain sum of instalments.
+    
+    Returns:
+    - Dictionary of NumPy arrays: total_investment, total_returns, total_future_value
+    """
+    monthly_investment, interest_rate, time_period, lump_sum = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (monthly_investment, interest_rate, time_period, lump_sum))
+    )
+    
+    monthly_rate = interest_rate / 12 / 100
+    months = np.trunc(time_period * 12)
+    
+    # Future value of the SIP, using the 0% limit (one payment per month) where the rate is 0.
+    # Operations are ordered as in calculate_sip so the floating-point results are identical.
+    has_rate = monthly_rate != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity_factor = np.where(has_rate, (np.power(1 + monthly_rate, months) - 1) / monthly_rate, months)
+    sip_future_value = monthly_investment * annuity_factor * np.where(has_rate, 1 + monthly_rate, 1)
+    
+    lump_sum_future_value = lump_sum * np.power(1 + interest_rate / 100, time_period)
+    total_future_value = sip_future_value + lump_sum_future_value
+    total_investment = monthly_investment * months + lump_sum
+    total_returns = total_future_value - total_investment
+    
+    return {
+        "total_investment": _round_paisa(total_investment),
+        "total_returns": _round_paisa(total_returns),
+        "total_future_value": _round_paisa(total_future_value)
+    }
+
+def benchmark_sip_batch(n=100000, seed=0):
+    """Compare calculate_sip in a loop with calculate_sip_batch on `n` random scenarios."""
+    import time
+    rng = np.random.default_rng(seed)
+    monthly_investment = rng.integers(500, 100000, n).astype(float)
+    interest_rate = np.round(rng.uniform(1, 20, n), 2)
+    time_period = rng.integers(1, 41, n).astype(float)
+    lump_sum = rng.choice([0, 10000, 100000], n).astype(float)
+    
+    start = time.perf_counter()
+    looped = [calculate_sip(*args) for args in zip(monthly_investment.tolist(), interest_rate.tolist(),
+                                                  time_period.tolist(), lump_sum.tolist())]
+    loop_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch = calculate_sip_batch(monthly_investment, interest_rate, time_period, lump_sum)
+    batch_seconds = time.perf_counter() - start
+    
+    max_difference = float(np.max(np.abs(batch["total_future_value"] - [r["total_future_value"] for r in looped])))
+    return {
+        "scenarios": n,
+        "loop_per_second": n / loop_seconds,
+        "batch_per_second": n / batch_seconds,
+        "speedup": loop_seconds / batch_seconds,
+        "max_difference": max_difference
+    }
+
+def _sip_future_value(monthly_investment, interest_rate, months, lump_sum=0, years=None):
+    """
+    Unrounded maturity value using the calculate_sip formula (0% rate allowed).
+
+    Like calculate_sip, instalments count whole months while the lump sum
+    compounds over `years`, the tenure as given (default months / 12).
+    """
+    monthly_rate = interest_rate / 12 / 100
+    if monthly_rate == 0:
+        sip_future_value = monthly_investment * months
+    else:
+        sip_future_value = monthly_investment * (((1 + monthly_rate) ** months - 1) / monthly_rate) * (1 + monthly_rate)
+    return sip_future_value + lump_sum * ((1 + interest_rate/100) ** (months / 12 if years is None else years))
+
+def solve_sip_goal(target_amount, monthly_investment=None, interest_rate=None, time_period=None, lump_sum=0,
+                   max_years=100, max_rate=100):
+    """
+    Find the missing SIP input needed to reach a target maturity value.
+    
+    Parameters:
+    - target_amount: Desired maturity value
+    - monthly_investment, interest_rate, time_period: exactly one must be None
+    - lump_sum: Initial lump sum investment (optional)
+    
+    The monthly amount has a closed form. The tenure is the smallest whole
+    number of months that reaches the target, found by bisection. The rate is
+    found with Newton's method, falling back to bisection when a step leaves
+    the bracket.
+    
+    Returns:
+    - calculate_sip result for the solved inputs, plus "solved_for" and
+      "target_amount"; or a dictionary with "error"
+    """
+    given = {"monthly_investment": monthly_investment, "interest_rate": interest_rate, "time_period": time_period}
+    unknown = [name for name, value in given.items() if value is None]
+    if target_amount is None or len(unknown) != 1:
+        return {"error": "Provide the target amount and exactly two of monthly investment, interest rate and time period"}
+    solved_for = unknown[0]
+    
+    try:
+        target_amount = float(target_amount)
+        lump_sum = float(lump_sum) if lump_sum is not None else 0
+        if target_amount <= 0:
+            return {"error": "Target amount must be positive"}
+        
+        if solved_for == "monthly_investment":
+            years = float(time_period)
+            months = int(years * 12)
+            rate = float(interest_rate)
+            if months <= 0:
+                return {"error": "Time period must be at least one month"}
+            shortfall = target_amount - _sip_future_value(0, rate, months, lump_sum, years)
+            per_rupee = _sip_future_value(1, rate, months)
+            # Round up to the paisa so the rounded amount still reaches the target
+            monthly_investment = np.ceil(max(shortfall, 0) / per_rupee * 100) / 100
+        
+        elif solved_for == "time_period":
+            amount, rate = float(monthly_investment), float(interest_rate)
+            reached = lambda m: _sip_future_value(amount, rate, m, lump_sum) >= target_amount
+            low, high = 0, int(max_years * 12)
+            if not reached(high):
+                return {"error": f"The target cannot be reached within {max_years} years"}
+            while high - low > 1:
+                mid = (low + high) // 2
+                if reached(mid):
+                    high = mid
+                else:
+                    low = mid
+            time_period = high / 12
+        
+        else:
+            amount, years = float(monthly_investment), float(time_period)
+            months = int(years * 12)
+            gap = lambda r: _sip_future_value(amount, r, months, lump_sum, years) - target_amount
+            low, high = 0.0, float(max_rate)
+            if gap(low) >= 0:
+                return {"error": "The target is already reached without any returns"}
+            if gap(high) < 0:
+                return {"error": f"The target needs a return above {max_rate}% a year"}
+            rate = high / 2
+            for _ in range(100):
+                value = gap(rate)
+                if abs(value) < 1e-6:
+                    break
+                if value > 0:
+                    high = rate
+                else:
+                    low = rate
+                step = 1e-6
+                slope = (gap(rate + step) - value) / step
+                next_rate = rate - value / slope if slope > 0 else None
+                # Keep Newton's step only while it stays inside the bracket
+                rate = next_rate if next_rate is not None and low < next_rate < high else (low + high) / 2
+            interest_rate = rate
+        
+        result = calculate_sip(monthly_investment, interest_rate, time_period, lump_sum)
+        if "error" not in result:
+            result["solved_for"] = solved_for
+            result["target_amount"] = target_amount
+        return result
+    
+    except Exception as e:
+        return {"error": f"Calculation error: {str(e)}"}
+
+def sip_schedule(monthly_investment, interest_rate, time_period, lump_sum=0, step_up=0, inflation=0,
+                 pauses=None, withdrawals=None, schedule_points=None, max_years=100):
+    """
+    Month-by-month SIP projection with an annual step-up, inflation adjustment,
+    paused months and partial withdrawals.
+
+    Parameters:
+    - monthly_investment, interest_rate, time_period, lump_sum: as in calculate_sip
+    - step_up: Yearly increase in the monthly instalment (as a percentage)
+    - inflation: Annual inflation (as a percentage) used to express values in today's money
+    - pauses: (first_month, last_month) pairs, 1-based and inclusive, with no instalment
+    - withdrawals: (month, amount) pairs, taken out at the end of that month
+    - schedule_points: if given, also return the schedule downsampled to about this many months
+    - max_years: longest tenure accepted, since the arrays hold one entry per month
+
+    Instalments are made at the start of each month and the lump sum grows at
+    the annual rate, as in calculate_sip, so with no step-up, pauses or
+    withdrawals the maturity value is the same. Balances come from cumulative
+    products of the monthly growth factor rather than a month-by-month loop.
+
+    Returns:
+    - Dictionary with the calculate_sip fields plus step_up, inflation,
+      total_withdrawn, final_monthly_investment, real_future_value and
+      optionally "schedule"; or a dictionary with "error"
+    """
+    if None in [monthly_investment, interest_rate, time_period]:
+        return {"error": "Missing required parameters"}
+
+    try:
+        monthly_investment = float(monthly_investment)
+        interest_rate = float(interest_rate)
+        time_period = float(time_period)
+        lump_sum = float(lump_sum) if lump_sum is not None else 0
+        step_up = float(step_up or 0)
+        inflation = float(inflation or 0)
+        months = int(time_period * 12)
+        if months <= 0:
+            return {"error": "Time period must be at least one month"}
+        if months > max_years * 12:
+            return {"error": f"Time period must be at most {max_years} years"}
+
+        month_numbers = np.arange(1, months + 1)
+        instalments = monthly_investment * (1 + step_up / 100) ** ((month_numbers - 1) // 12)
+
+        # Mark paused ranges with +1/-1 at their edges; a running sum is then > 0 inside them
+        paused = np.zeros(months, dtype=bool)
+        if pauses:
+            edges = np.zeros(months + 1)
+            for first, last in pauses:
+                first, last = max(int(first), 1), min(int(last), months)
+                if first <= last:
+                    edges[first - 1] += 1
+                    edges[last] -= 1
+            paused = np.cumsum(edges[:-1]) > 0
+            instalments[paused] = 0
+
+        withdrawn = np.zeros(months)
+        if withdrawals:
+            withdrawal_months, amounts = np.asarray(withdrawals, dtype=np.float64).reshape(-1, 2).T
+            if ((withdrawal_months < 1) | (withdrawal_months > months)).any() or (amounts < 0).any():
+                return {"error": f"Withdrawals need a month between 1 and {months} and a positive amount"}
+            np.add.at(withdrawn, withdrawal_months.astype(int) - 1, amounts)
+
+        # growth[k] = (1 + r)^(k + 1): the value after k + 1 months of one rupee invested at the start.
+        # Balance at the end of month k = growth[k] * (sum of instalments discounted to month 0)
+        # minus withdrawals discounted the same way, one month later.
+        # Huge rates or tenures overflow to inf/NaN, which is reported below instead of warned about
+        with np.errstate(over='ignore', invalid='ignore'):
+            monthly_rate = interest_rate / 12 / 100
+            growth = np.cumprod(np.full(months, 1 + monthly_rate))
+            discount = np.concatenate([[1.0], growth[:-1]])
+            sip_values = growth * np.cumsum(instalments / discount)
+            withdrawal_values = growth * np.cumsum(withdrawn / growth)
+            lump_sum_values = lump_sum * (1 + interest_rate / 100) ** (month_numbers / 12)
+            values = sip_values + lump_sum_values - withdrawal_values
+
+            deflator = np.cumprod(np.full(months, (1 + inflation / 100) ** (1 / 12)))
+            real_values = values / deflator
+            invested = np.cumsum(instalments) + lump_sum
+        if not all(np.isfinite(array).all() for array in (values, real_values, invested)):
+            return {"error": "The projection is too large to calculate; use smaller amounts or rates"}
+
+        short = np.flatnonzero(values < -0.005)
+        if len(short):
+            return {"error": f"Withdrawals exceed the corpus in month {short[0] + 1}"}
+
+        total_investment = float(invested[-1])
+        total_withdrawn = float(withdrawn.sum())
+        total_future_value = float(values[-1])
+
+        result = {
+            "monthly_investment": monthly_investment,
+            "interest_rate": interest_rate,
+            "time_period": time_period,
+            "lump_sum": lump_sum,
+            "step_up": step_up,
+            "inflation": inflation,
+            "total_investment": round(total_investment, 2),
+            "total_withdrawn": round(total_withdrawn, 2),
+            "total_returns": round(total_future_value + total_withdrawn - total_investment, 2),
+            "total_future_value": round(total_future_value, 2),
+            "real_future_value": round(float(real_values[-1]), 2),
+            "final_monthly_investment": round(float(monthly_investment * (1 + step_up / 100) ** ((months - 1) // 12)), 2),
+            "paused_months": int(paused.sum()),
+            "missing_parameters": []
+        }
+
+        if schedule_points:
+            # Evenly spaced months, always ending on the last one
+            picks = np.unique(np.linspace(0, months - 1, min(int(schedule_points), months)).round().astype(int))
+            result["schedule"] = {
+                "month": month_numbers[picks].tolist(),
+                "instalment": np.round(instalments[picks], 2).tolist(),
+                "invested": np.round(invested[picks], 2).tolist(),
+                "withdrawn": np.round(np.cumsum(withdrawn)[picks], 2).tolist(),
+                "value": np.round(values[picks], 2).tolist(),
+                "real_value": np.round(real_values[picks], 2).tolist()
+            }
+
+        return result
+
+    except Exception as e:
+        return {"error": f"Calculation error: {str(e)}"}
+
 def get_missing_parameters(params):
     """Identify which parameters are missing for SIP calculation."""
     missing = []
@@ -165,18 +488,26 @@ Your SIP calculation results:
 - Total Amount Invested: ₹{result['total_investment']:,.2f}
 - Total Returns: ₹{result['total_returns']:,.2f}
 - Maturity Value: ₹{result['total_future_value']:,.2f}
-
-This calculation assumes a constant interest rate throughout the investment period.
 """
+    if result.get('step_up'):
+        response += f"- Annual Step-up: {result['step_up']}% (final monthly investment ₹{result['final_monthly_investment']:,.2f})\n"
+    if result.get('inflation'):
+        response += f"- Maturity Value in Today's Money ({result['inflation']}% inflation): ₹{result['real_future_value']:,.2f}\n"
+    response += "\nThis calculation assumes a constant interest rate throughout the investment period.\n"
     return translate_func(response, 'en', target_lang) if translate_func else response
 
 def handle_calculation_query(query, model, translate_func=None, source_lang='en', target_lang='en'):
     """Handle calculation-based queries."""
-    # Translate query to English if needed
-    if source_lang != 'en' and translate_func:
-        query = translate_func(query, source_lang, 'en')
-    
-    calc_type = is_calculation_query(query)
+    # A query the local parser understands in full needs neither translation nor Gemini
+    params, resolved = parse_sip_query(query)
+    if resolved and is_complete(params):
+        calc_type = "sip"
+    else:
+        # Translate query to English if needed
+        if source_lang != 'en' and translate_func:
+            query = translate_func(query, source_lang, 'en')
+        
+        calc_type = is_calculation_query(query)
     
     if calc_type == "sip":
         # Extract parameters
@@ -199,13 +530,23 @@ def handle_calculation_query(query, model, translate_func=None, source_lang='en'
                 "missing": missing
             }
         
-        # Calculate SIP returns
-        result = calculate_sip(
-            params["monthly_investment"],
-            params["interest_rate"],
-            params["time_period"],
-            params["lump_sum"]
-        )
+        # Calculate SIP returns; a step-up or inflation adjustment needs the full schedule
+        if params.get("step_up") or params.get("inflation"):
+            result = sip_schedule(
+                params["monthly_investment"],
+                params["interest_rate"],
+                params["time_period"],
+                params.get("lump_sum", 0),
+                step_up=params.get("step_up"),
+                inflation=params.get("inflation")
+            )
+        else:
+            result = calculate_sip(
+                params["monthly_investment"],
+                params["interest_rate"],
+                params["time_period"],
+                params["lump_sum"]
+            )
         
         response = format_calculation_result(result, translate_func, target_lang)
         return {
@@ -231,15 +572,19 @@ def handle_calculation_query(query, model, translate_func=None, source_lang='en'
 def update_sip_parameters(params, query, model):
     """Update SIP parameters based on user's response."""
     try:
-        # Extract the value from the user's response
-        prompt = f"""
-        The user provided this response for a missing SIP parameter: "{query}"
-        Extract just the numerical value from this response.
-        Return only the number, with no additional text.
-        """
-        
-        response = model.generate_content(prompt)
-        extracted_value = float(response.text.strip())
+        # Extract the value from the user's response, asking Gemini only if the local parser can't
+        missing = params.get("missing", [])
+        extracted_value = parse_sip_value(query, missing[0]) if missing else None
+        sip_parser_stats.record(extracted_value is not None)
+        if extracted_value is None:
+            prompt = f"""
+            The user provided this response for a missing SIP parameter: "{query}"
+            Extract just the numerical value from this response.
+            Return only the number, with no additional text.
+            """
+            
+            response = model.generate_content(prompt)
+            extracted_value = float(response.text.strip())
         
         # Determine which parameter to update based on the missing parameters
         if "monthly_investment" in params.get("missing", []):
@@ -258,77 +603,34 @@ def update_sip_parameters(params, query, model):
         print(f"Error updating SIP parameters: {e}")
         return params
 
-def analyze_fund_data(nav_data, question, fund_name, model):
+def analyze_fund_data(nav_data, question, fund_name, model, scheme_code=None):
     """
     Analyze fund NAV data based on user's question using Gemini.
     
     Parameters:
-    - nav_data: List of NAV data points with dates
+    - nav_data: List of NAV data points with dates, or a (days, navs) tuple of arrays
     - question: User's question about the fund
     - fund_name: Name of the fund
     - model: Gemini model instance
+    - scheme_code: mfapi.in scheme code; when given, the computed metrics are
+      cached per (scheme code, latest NAV date)
+    
+    Answers are cached per (model, normalized question, fund data), so the
+    same question about a fund on the same NAV date is only generated once.
     
     Returns:
     - Analysis as a string
     """
     try:
-        # Prepare data for analysis
-        nav_data_sorted = sorted(nav_data, key=lambda x: datetime.strptime(x.get('date', ''), '%d-%m-%Y'))
-        
-        # Get latest and oldest NAV records
-        latest_nav = nav_data_sorted[0]
-        oldest_nav = nav_data_sorted[-1]
-        
-        # Calculate duration between dates in years
-        latest_date = datetime.strptime(latest_nav.get('date', ''), '%d-%m-%Y')
-        oldest_date = datetime.strptime(oldest_nav.get('date', ''), '%d-%m-%Y')
-        days_diff = (latest_date - oldest_date).days
-        years = days_diff / 365.25
-        
-        # Calculate growth metrics
-        latest_nav_value = float(latest_nav.get('nav', 0))
-        oldest_nav_value = float(oldest_nav.get('nav', 0))
-        
-        absolute_growth = ((latest_nav_value - oldest_nav_value) / oldest_nav_value) * 100
-        annualized_growth = (((latest_nav_value / oldest_nav_value) ** (1/years)) - 1) * 100 if years > 0 else 0
-        
-        # Calculate volatility (standard deviation of returns)
-        daily_returns = []
-        for i in range(1, min(100, len(nav_data_sorted))):  # Limit to 100 data points for efficiency
-            current_nav = float(nav_data_sorted[i-1].get('nav', 0))
-            previous_nav = float(nav_data_sorted[i].get('nav', 0))
-            if previous_nav > 0:
-                daily_return = (current_nav - previous_nav) / previous_nav
-                daily_returns.append(daily_return)
-        
-        volatility = np.std(daily_returns) * np.sqrt(252) * 100 if daily_returns else 0  # Annualized volatility
-        
-        # Calculate 1-month, 3-month, 6-month, 1-year returns if data is available
-        periods = {
-            "1_month": 30,
-            "3_month": 90,
-            "6_month": 180,
-            "1_year": 365
-        }
-        
-        period_returns = {}
-        for period_name, days in periods.items():
-            if days_diff >= days:
-                # Find the closest NAV to the period
-                target_date = latest_date - timedelta(days=days)
-                closest_nav = nav_data_sorted[0]
-                min_diff = float('inf')
-                
-                for nav in nav_data_sorted:
-                    nav_date = datetime.strptime(nav.get('date', ''), '%d-%m-%Y')
-                    diff = abs((nav_date - target_date).days)
-                    if diff < min_diff:
-                        min_diff = diff
-                        closest_nav = nav
-                
-                period_nav_value = float(closest_nav.get('nav', 0))
-                period_return = ((latest_nav_value - period_nav_value) / period_nav_value) * 100
-                period_returns[period_name] = period_return
+        # Parse dates once into arrays (oldest first) and compute the metrics on them
+        if isinstance(nav_data, tuple):
+            days, navs = nav_data
+        else:
+            days, navs = parse_nav_records(nav_data)
+        analytics = get_fund_analytics(days, navs, scheme_code)
+        metrics = analytics["metrics"]
+        risk = analytics["risk"]
+        period_returns = metrics["period_returns"]
         
         # Format period returns properly
         one_month = f"{period_returns.get('1_month'):.2f}%" if '1_month' in period_returns else 'Not available'
@@ -336,19 +638,33 @@ def analyze_fund_data(nav_data, question, fund_name, model):
         six_month = f"{period_returns.get('6_month'):.2f}%" if '6_month' in period_returns else 'Not available'
         one_year = f"{period_returns.get('1_year'):.2f}%" if '1_year' in period_returns else 'Not available'
         
-        # Create a prompt that analyzes the fund data based on the user's question
-        prompt = f"""
-        As a financial advisor, analyze this mutual fund data and answer the following question:
-        "{question}"
+        # Format risk metrics, some of which need enough history to exist
+        def risk_value(key, suffix="", fmt=".2f"):
+            return f"{risk[key]:{fmt}}{suffix}" if risk.get(key) is not None else 'Not available'
+        
+        max_drawdown = risk_value('max_drawdown', '%')
+        if risk.get('max_drawdown') is not None:
+            max_drawdown += f" (from {risk['max_drawdown_peak_date']} to {risk['max_drawdown_trough_date']})"
         
+        # The fund data block; with the question it fully determines the analysis
+        fund_block = f"""
         Fund Information:
         - Fund Name: {fund_name}
-        - Latest NAV: ₹{latest_nav_value} (as of {latest_nav.get('date')})
-        - Initial NAV in dataset: ₹{oldest_nav_value} (as of {oldest_nav.get('date')})
-        - Time Period: {years:.2f} years
-        - Total Growth: {absolute_growth:.2f}%
-        - Annualized Growth Rate: {annualized_growth:.2f}%
-        - Volatility: {volatility:.2f}%
+        - Latest NAV: ₹{metrics['latest_nav']} (as of {metrics['latest_date']})
+        - Initial NAV in dataset: ₹{metrics['oldest_nav']} (as of {metrics['oldest_date']})
+        - Time Period: {metrics['years']:.2f} years
+        - Total Growth: {metrics['absolute_growth']:.2f}%
+        - Annualized Growth Rate: {metrics['annualized_growth']:.2f}%
+        - Volatility (last 100 NAVs): {metrics['volatility']:.2f}%
+        
+        Risk Metrics (entire history):
+        - Annualized Volatility: {risk_value('annualized_volatility', '%')}
+        - Sharpe Ratio: {risk_value('sharpe_ratio')}
+        - Sortino Ratio: {risk_value('sortino_ratio')}
+        - Maximum Drawdown: {max_drawdown}
+        - Longest Drawdown: {risk_value('max_drawdown_duration_days', ' days', 'd')}
+        - Current Drawdown: {risk_value('current_drawdown', '%')}
+        - Beta vs Benchmark: {risk_value('beta')}
         
         Period Returns:
         - 1 Month: {one_month}
@@ -357,8 +673,14 @@ def analyze_fund_data(nav_data, question, fund_name, model):
         - 1 Year: {one_year}
         
         Recent NAV Data (Last 5 entries):
-        {json.dumps(nav_data_sorted[:5], indent=2)}
+        {json.dumps(to_nav_records(days[-5:], navs[-5:]), indent=2)}
+        """
         
+        # Create a prompt that analyzes the fund data based on the user's question
+        prompt = f"""
+        As a financial advisor, analyze this mutual fund data and answer the following question:
+        "{question}"
+        {fund_block}
         Based on this data, provide:
         1. A direct answer to the user's question about the fund
         2. Additional relevant insights about the fund's performance
@@ -367,12 +689,21 @@ def analyze_fund_data(nav_data, question, fund_name, model):
         Keep your response concise, informative, and focused on the data provided.
         """
         
-        # Generate analysis using Gemini
-        response = model.generate_content(prompt)
-        analysis = response.text
+        # Reuse the analysis of the same question about the same data (e.g. the default
+        # overview question); the answer is generated in English and translated separately
+        cache_key = generation_key(getattr(model, "model_name", type(model).__name__), question, fund_block, 'en')
+        analysis = generation_cache.get(cache_key)
+        if analysis is None:
+            # Generate analysis using Gemini
+            response = model.generate_content(prompt)
+            analysis = response.text
+            generation_cache.set(cache_key, analysis)
         
         return analysis
         
     except Exception as e:
         print(f"Error analyzing fund data: {e}")
-        return f"I encountered an error while analyzing the fund data: {str(e)}. Please try again with a different question or fund."
\ No newline at end of file
+        return f"I encountered an error while analyzing the fund data: {str(e)}. Please try again with a different question or fund."
+
+if __name__ == "__main__":
+    print(benchmark_sip_batch())
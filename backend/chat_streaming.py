@@ -0,0 +1,106 @@
+import json
+import re
+import threading
+from collections import deque
+import numpy as np
+
+# Longest piece of streamed English held back before translating it without a sentence end
+SEGMENT_MAX_CHARS = 300
+
+# Most sentences translated together in one model call while streaming
+STREAM_BATCH_SEGMENTS = 8
+
+# Number of recent streams kept for the latency percentiles
+LATENCY_WINDOW = 1000
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event whose data is `data` as JSON."""
+    lines = f"event: {event}\n" if event else ""
+    return f"{lines}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def assistant_text(chunk):
+    """Text carried by one streamed Pinecone assistant chunk; '' for non-content chunks."""
+    if isinstance(chunk, dict):
+        if chunk.get("type") == "content_chunk":
+            return (chunk.get("delta") or {}).get("content") or ""
+        return ""
+    if getattr(chunk, "type", None) == "content_chunk":
+        return getattr(chunk.delta, "content", None) or ""
+    return ""
+
+
+def sentence_segments(pieces, max_chars=SEGMENT_MAX_CHARS):
+    """
+    Regroup streamed text pieces into whole sentences, each with its trailing whitespace.
+
+    Everything up to the last sentence end seen so far is released at once,
+    so the first segment goes out as soon as the first sentence is complete.
+    Text without a sentence end is released at a word boundary once it grows
+    past `max_chars`.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        boundary = None
+        for boundary in _SENTENCE_END.finditer(buffer):
+            pass
+        if boundary is not None and boundary.end() < len(buffer):
+            cut = boundary.end()
+        elif len(buffer) > max_chars:
+            cut = buffer.rfind(" ", 0, max_chars) + 1 or len(buffer)
+        else:
+            continue
+        yield buffer[:cut]
+        buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+
+def segment_batches(segments, max_batch=STREAM_BATCH_SEGMENTS):
+    """
+    Group segments into lists of growing size: 1, 2, 4, ... up to `max_batch`.
+
+    The first sentence is released alone so the first token is not held
+    back; later batches grow so a long answer needs only a few round trips.
+    """
+    batch = []
+    size = 1
+    for segment in segments:
+        batch.append(segment)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+            size = min(size * 2, max_batch)
+    if batch:
+        yield batch
+
+
+class LatencyStats:
+    """Thread-safe time-to-first-token and total time of recent streams, in milliseconds."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.count = 0
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, first_token_ms, total_ms):
+        with self._lock:
+            self.count += 1
+            self._samples.append((first_token_ms, total_ms))
+
+    def stats(self):
+        """Return the stream count and p50/p95 of both timings over the recent window."""
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64).reshape(-1, 2)
+        result = {"streams": self.count}
+        for column, name in enumerate(("ttfb_ms", "total_ms")):
+            for p in (50, 95):
+                result[f"{name}_p{p}"] = float(np.percentile(samples[:, column], p)) if len(samples) else None
+        return result
+
+
+chat_stream_latency = LatencyStats()
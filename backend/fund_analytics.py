@@ -0,0 +1,32 @@
+import os
+from cache_utils import LRUCache
+from fund_metrics import compute_fund_metrics
+from risk_metrics import compute_risk_metrics, load_benchmark
+
+# Maximum number of funds whose computed analytics are kept in memory
+FUND_ANALYTICS_CACHE_SIZE = int(os.environ.get("FUND_ANALYTICS_CACHE_SIZE", 512))
+
+# (scheme code, latest NAV day) -> {"metrics": ..., "risk": ...}
+fund_analytics_cache = LRUCache(maxsize=FUND_ANALYTICS_CACHE_SIZE)
+
+
+def compute_fund_analytics(days, navs):
+    """Compute the performance and risk metrics used in fund analyses."""
+    return {
+        "metrics": compute_fund_metrics(days, navs),
+        "risk": compute_risk_metrics(days, navs, benchmark=load_benchmark())
+    }
+
+
+def get_fund_analytics(days, navs, scheme_code=None):
+    """
+    Return performance and risk metrics for a fund, cached per (scheme code, latest NAV date).
+
+    The metrics are fully determined by the NAV history, so they only change when
+    a new NAV day is appended. Without a scheme code nothing is cached.
+    """
+    if scheme_code is None or len(days) == 0:
+        return compute_fund_analytics(days, navs)
+
+    key = (str(scheme_code), int(days[-1]))
+    return fund_analytics_cache.get_or_compute(key, lambda: compute_fund_analytics(days, navs))
@@ -0,0 +1,194 @@
+import random
+import re
+import time
+import numpy as np
+from scheme_index import NGRAM_SIZE, fold, ngrams
+
+# Number of trigram candidates that get re-ranked by edit distance
+CANDIDATE_POOL = 30
+
+# Largest per-word edit distance still counted as a (typo) match
+MAX_WORD_DISTANCE = 2
+
+
+def tokenize(text):
+    """Split a folded name or query into alphanumeric words."""
+    return re.findall(r'\w+', text)
+
+
+def bounded_levenshtein(a, b, max_dist):
+    """
+    Levenshtein distance between `a` and `b`, or max_dist + 1 once it is
+    certain the distance exceeds max_dist.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_dist:
+            return max_dist + 1
+        previous = current
+    return min(previous[-1], max_dist + 1)
+
+
+class FundMatcher:
+    """
+    Ranked, typo-tolerant fund name matcher over a SchemeIndex.
+
+    Candidates are the names sharing the most informative trigrams with the
+    query, or for a query too short to have any trigram, the first names
+    containing it. They are re-ranked by how well each query word matches some word in
+    the name (exact, prefix, or within MAX_WORD_DISTANCE edits).
+    """
+
+    def __init__(self, index):
+        self.index = index
+        # Zero-copy NumPy views of the index's posting arrays
+        self.postings = {gram: np.frombuffer(ids, dtype=np.intc) for gram, ids in index.postings.items()}
+        self.idf = {gram: np.log(len(index) / len(ids)) for gram, ids in self.postings.items()}
+        self.words = [tokenize(name) for name in index.folded]
+        self.word_sets = [set(words) for words in self.words]
+
+    def _candidates(self, query):
+        """Return (id, score) pairs for the names sharing the most informative trigrams with `query`."""
+        if len(query) < NGRAM_SIZE:
+            # No trigrams to score by; take the names containing the query, unscored
+            if not query.strip():
+                return []
+            return [(i, 0.0) for i in self.index.substring_ids(query, limit=CANDIDATE_POOL)]
+
+        grams = [gram for gram in ngrams(query) if gram in self.postings]
+        if not grams:
+            return []
+
+        # Each shared trigram counts log(N / df), so rare grams dominate the score
+        ids = np.concatenate([self.postings[gram] for gram in grams])
+        weights = np.repeat([self.idf[gram] for gram in grams], [len(self.postings[gram]) for gram in grams])
+        scores = np.bincount(ids, weights=weights, minlength=len(self.index))
+
+        pool = min(CANDIDATE_POOL, len(scores))
+        top = np.argpartition(-scores, pool - 1)[:pool]
+        top = top[scores[top] > 0]
+        return zip(top.tolist(), scores[top].tolist())
+
+    def _word_distance(self, word, i, seen):
+        """
+        Smallest edit distance from a query word to any word of name `i`.
+
+        `seen` memoises (query word, name word) distances for one query, since
+        the same few name words recur across nearly every candidate.
+        """
+        if word in self.word_sets[i]:
+            return 0
+        best = MAX_WORD_DISTANCE + 1
+        for name_word in self.words[i]:
+            distance = seen.get((word, name_word))
+            if distance is None:
+                if name_word.startswith(word):
+                    distance = 0
+                else:
+                    distance = bounded_levenshtein(word, name_word, MAX_WORD_DISTANCE)
+                seen[(word, name_word)] = distance
+            if distance < best:
+                best = distance
+                if best == 0:
+                    break
+        return best
+
+    def match(self, query, k=5):
+        """
+        Return up to `k` (scheme name, scheme code, distance) tuples, best first.
+
+        An exact name match is always returned first with distance 0.
+        """
+        exact = self.index.lookup(query)
+        folded = fold(query).strip()
+        words = tokenize(folded)
+
+        ranked = []
+        seen = {}
+        for i, shared in self._candidates(folded):
+            distance = sum(self._word_distance(word, i, seen) for word in words)
+            ranked.append((i != exact, distance, -shared, len(self.index.names[i]), i))
+        if exact is not None and all(entry[-1] != exact for entry in ranked):
+            ranked.append((False, 0, 0, 0, exact))
+        ranked.sort()
+
+        return [(self.index.names[i], self.index.codes[i], distance)
+                for _, distance, _, _, i in ranked[:k]]
+
+    def best_code(self, query):
+        """Return the scheme code of the best match for `query`, or None if no word matched at all."""
+        matches = self.match(query, k=1)
+        if not matches:
+            return None
+        _, code, distance = matches[0]
+        if distance >= (MAX_WORD_DISTANCE + 1) * len(tokenize(fold(query))):
+            return None
+        return code
+
+
+def _with_typo(text, rng):
+    """Return `text` with one random character dropped, swapped or replaced."""
+    if len(text) < 4:
+        return text
+    pos = rng.randrange(1, len(text) - 1)
+    kind = rng.choice(("drop", "swap", "replace"))
+    if kind == "drop":
+        return text[:pos] + text[pos + 1:]
+    if kind == "swap":
+        return text[:pos - 1] + text[pos] + text[pos - 1] + text[pos + 1:]
+    return text[:pos] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[pos + 1:]
+
+
+def benchmark(matcher, samples=1000, k=5, seed=0):
+    """
+    Time FundMatcher.match on queries drawn from the whole catalog.
+
+    Each query is the first few words of a random scheme name with one typo.
+    Returns latency stats in milliseconds and the share of queries for which
+    some top-k result contains the original, typo-free words.
+    """
+    rng = random.Random(seed)
+    names = matcher.index.names
+    timings = []
+    hits = 0
+
+    for _ in range(samples):
+        name = names[rng.randrange(len(names))]
+        intended = " ".join(name.split()[:rng.randint(2, 4)])
+        query = _with_typo(intended, rng)
+
+        start = time.perf_counter()
+        matches = matcher.match(query, k)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        if any(fold(intended) in fold(match[0]) for match in matches):
+            hits += 1
+
+    timings.sort()
+    return {
+        "catalog_size": len(names),
+        "samples": samples,
+        "mean_ms": sum(timings) / len(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p99_ms": timings[int(len(timings) * 0.99)],
+        "top_k_recall": hits / samples,
+    }
+
+
+if __name__ == "__main__":
+    from scheme_catalog import get_scheme_index
+
+    index = get_scheme_index()
+    print(benchmark(FundMatcher(index)))
@@ -0,0 +1,171 @@
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from nav_store import parse_nav_records, to_nav_records
+
+# Trailing periods reported for every fund, in calendar days
+PERIODS = {
+    "1_month": 30,
+    "3_month": 90,
+    "6_month": 180,
+    "1_year": 365
+}
+
+# Number of most recent NAVs used for the volatility figure
+VOLATILITY_WINDOW = 100
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def day_to_date_str(day):
+    """Format an int day number (days since 1970-01-01) as dd-mm-yyyy, like mfapi.in."""
+    return np.datetime64(int(day), 'D').astype(datetime).strftime('%d-%m-%Y')
+
+
+def compute_fund_metrics(days, navs):
+    """
+    Compute the performance figures used in fund analyses from NAV arrays.
+
+    Parameters:
+    - days: int day numbers (days since 1970-01-01), oldest first
+    - navs: NAVs matching `days`
+
+    Returns:
+    - Dictionary with latest/oldest NAV and date, years covered, total and
+      annualized growth, volatility and trailing period returns (percentages)
+    """
+    days = np.asarray(days)
+    navs = np.asarray(navs, dtype=np.float64)
+
+    latest_day, oldest_day = int(days[-1]), int(days[0])
+    latest_nav, oldest_nav = float(navs[-1]), float(navs[0])
+    days_diff = latest_day - oldest_day
+    years = days_diff / 365.25
+
+    absolute_growth = ((latest_nav - oldest_nav) / oldest_nav) * 100
+    annualized_growth = (((latest_nav / oldest_nav) ** (1 / years)) - 1) * 100 if years > 0 else 0
+
+    # Annualized volatility of the most recent daily returns
+    recent = navs[-VOLATILITY_WINDOW:]
+    previous, current = recent[:-1], recent[1:]
+    valid = previous > 0
+    daily_returns = (current[valid] - previous[valid]) / previous[valid]
+    volatility = float(np.std(daily_returns) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100) if len(daily_returns) else 0
+
+    # NAV closest to each period's target date; on a tie the later date wins
+    targets = latest_day - np.array(list(PERIODS.values()))
+    after = np.clip(np.searchsorted(days, targets), 0, len(days) - 1)
+    before = np.clip(after - 1, 0, len(days) - 1)
+    closest = np.where(np.abs(days[after] - targets) <= np.abs(days[before] - targets), after, before)
+
+    period_returns = {}
+    for (period_name, period_days), period_nav in zip(PERIODS.items(), navs[closest].tolist()):
+        if days_diff >= period_days:
+            period_returns[period_name] = ((latest_nav - period_nav) / period_nav) * 100
+
+    return {
+        "latest_nav": latest_nav,
+        "latest_date": day_to_date_str(latest_day),
+        "oldest_nav": oldest_nav,
+        "oldest_date": day_to_date_str(oldest_day),
+        "years": years,
+        "absolute_growth": absolute_growth,
+        "annualized_growth": annualized_growth,
+        "volatility": volatility,
+        "period_returns": period_returns
+    }
+
+
+def _reference_fund_metrics(nav_data):
+    """The original record-by-record computation, kept for benchmarking and cross-checks."""
+    nav_data_sorted = sorted(nav_data, key=lambda x: datetime.strptime(x.get('date', ''), '%d-%m-%Y'), reverse=True)
+    latest_nav = nav_data_sorted[0]
+    oldest_nav = nav_data_sorted[-1]
+
+    latest_date = datetime.strptime(latest_nav.get('date', ''), '%d-%m-%Y')
+    oldest_date = datetime.strptime(oldest_nav.get('date', ''), '%d-%m-%Y')
+    days_diff = (latest_date - oldest_date).days
+    years = days_diff / 365.25
+
+    latest_nav_value = float(latest_nav.get('nav', 0))
+    oldest_nav_value = float(oldest_nav.get('nav', 0))
+    absolute_growth = ((latest_nav_value - oldest_nav_value) / oldest_nav_value) * 100
+    annualized_growth = (((latest_nav_value / oldest_nav_value) ** (1/years)) - 1) * 100 if years > 0 else 0
+
+    daily_returns = []
+    for i in range(1, min(VOLATILITY_WINDOW, len(nav_data_sorted))):
+        current_nav = float(nav_data_sorted[i-1].get('nav', 0))
+        previous_nav = float(nav_data_sorted[i].get('nav', 0))
+        if previous_nav > 0:
+            daily_returns.append((current_nav - previous_nav) / previous_nav)
+    volatility = np.std(daily_returns) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100 if daily_returns else 0
+
+    period_returns = {}
+    for period_name, days in PERIODS.items():
+        if days_diff >= days:
+            target_date = latest_date - timedelta(days=days)
+            closest_nav = nav_data_sorted[0]
+            min_diff = float('inf')
+            for nav in nav_data_sorted:
+                nav_date = datetime.strptime(nav.get('date', ''), '%d-%m-%Y')
+                diff = abs((nav_date - target_date).days)
+                if diff < min_diff:
+                    min_diff = diff
+                    closest_nav = nav
+            period_nav_value = float(closest_nav.get('nav', 0))
+            period_returns[period_name] = ((latest_nav_value - period_nav_value) / period_nav_value) * 100
+
+    return {
+        "latest_nav": latest_nav_value,
+        "latest_date": latest_nav.get('date'),
+        "oldest_nav": oldest_nav_value,
+        "oldest_date": oldest_nav.get('date'),
+        "years": years,
+        "absolute_growth": absolute_growth,
+        "annualized_growth": annualized_growth,
+        "volatility": float(volatility),
+        "period_returns": period_returns
+    }
+
+
+def synthetic_nav_history(years=20, seed=0):
+    """Return (days, navs) for a random-walk NAV series over `years` of business days."""
+    rng = np.random.default_rng(seed)
+    end = np.datetime64('2025-01-01')
+    start = end - np.timedelta64(int(years * 365.25), 'D')
+    dates = np.arange(start, end, dtype='datetime64[D]')
+    dates = dates[np.is_busday(dates)]
+    navs = 10 * np.cumprod(1 + rng.normal(0.0004, 0.01, len(dates)))
+    return dates.astype(np.int32), np.round(navs, 5)
+
+
+def benchmark(years=20, repeat=5):
+    """
+    Compare the original record-based metrics with compute_fund_metrics on a
+    synthetic history. Returns best-of-`repeat` timings in milliseconds.
+    """
+    days, navs = synthetic_nav_history(years)
+    records = to_nav_records(days, navs)
+
+    def best(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    before_ms = best(lambda: _reference_fund_metrics(records))
+    after_ms = best(lambda: compute_fund_metrics(*parse_nav_records(records)))
+    arrays_ms = best(lambda: compute_fund_metrics(days, navs))
+    return {
+        "records": len(records),
+        "before_ms": before_ms,
+        "after_from_records_ms": after_ms,
+        "after_from_arrays_ms": arrays_ms,
+        "speedup": before_ms / after_ms
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,25 @@
+import hashlib
+import os
+import re
+from cache_utils import LRUCache
+
+# Maximum number of generated answers kept in memory
+GENERATION_CACHE_SIZE = int(os.environ.get("GENERATION_CACHE_SIZE", 1024))
+
+# Longest an answer is reused, in seconds. The fund data in the key includes the
+# latest NAV date, so answers also stop matching as soon as a new NAV day arrives.
+GENERATION_CACHE_TTL = float(os.environ.get("GENERATION_CACHE_TTL", 24 * 60 * 60))
+
+# generation_key(...) -> generated text
+generation_cache = LRUCache(maxsize=GENERATION_CACHE_SIZE, ttl=GENERATION_CACHE_TTL)
+
+
+def normalize_question(question):
+    """Lowercase, collapse whitespace and drop trailing punctuation, so trivially different phrasings share an answer."""
+    return re.sub(r"\s+", " ", question or "").strip().rstrip("?.!").strip().lower()
+
+
+def generation_key(model_name, question, context, language='en'):
+    """SHA-256 key of (model, normalized question, context block, language) for generation_cache."""
+    parts = (str(model_name), normalize_question(question), context, language)
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
@@ -0,0 +1,247 @@
+import asyncio
+import os
+import queue
+import random
+import re
+import threading
+import time
+import types
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    _TRANSIENT_ERRORS = (
+        asyncio.TimeoutError, ConnectionError,
+        google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError, google_exceptions.DeadlineExceeded
+    )
+except ImportError:
+    _TRANSIENT_ERRORS = (asyncio.TimeoutError, ConnectionError)
+
+# Most model calls in flight at once, across all Flask worker threads
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+
+# Seconds allowed for one call, including retries and time spent waiting for a slot
+LLM_DEADLINE = float(os.environ.get("LLM_DEADLINE", 30))
+
+# Extra attempts after a timeout or transient error, and the base backoff delay in seconds
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+LLM_BACKOFF = float(os.environ.get("LLM_BACKOFF", 0.5))
+
+
+class LLMGateway:
+    """
+    Gemini client with a concurrency limit, deadlines and retries.
+
+    Calls run on a private event loop in a background thread, where a
+    semaphore bounds how many are in flight. Every call has a deadline
+    covering all its attempts; timeouts and transient API errors are retried
+    with jittered exponential backoff while time remains, and a call that
+    runs out of time is cancelled.
+
+    The gateway has the same generate_content / generate_content_async
+    interface as a genai.GenerativeModel, so it can be passed anywhere a
+    model is expected. Sync callers block only until the deadline.
+    """
+
+    def __init__(self, model, max_concurrency=LLM_MAX_CONCURRENCY, deadline=LLM_DEADLINE,
+                 max_retries=LLM_MAX_RETRIES, backoff=LLM_BACKOFF):
+        self.model = model
+        self.model_name = getattr(model, "model_name", type(model).__name__)
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.in_flight = 0
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _event_loop(self):
+        """Start the gateway's event loop thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _call_model(self, prompt, kwargs):
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt, **kwargs)
+        # Blocking-only models run in a worker thread; a timeout abandons the thread's result
+        return await asyncio.to_thread(self.model.generate_content, prompt, **kwargs)
+
+    def _slots(self):
+        # Created on first use so it belongs to the gateway loop (only that loop's thread calls this)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _attempt(self, prompt, kwargs):
+        async with self._slots():
+            self.in_flight += 1
+            try:
+                return await self._call_model(prompt, kwargs)
+            finally:
+                self.in_flight -= 1
+
+    async def _generate(self, prompt, deadline, kwargs):
+        """Run one call with retries on the gateway loop, giving up at `deadline` (monotonic time)."""
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                # Waiting for a slot counts against the deadline too
+                return await asyncio.wait_for(self._attempt(prompt, kwargs), remaining)
+            except _TRANSIENT_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.failures += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+            except Exception:
+                self.failures += 1
+                raise
+
+    def _submit(self, prompt, deadline, kwargs):
+        seconds = self.deadline if deadline is None else deadline
+        coroutine = self._generate(prompt, time.monotonic() + seconds, kwargs)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop())
+
+    def generate_content(self, prompt, deadline=None, **kwargs):
+        """
+        Blocking call with the signature of GenerativeModel.generate_content.
+
+        deadline overrides the default number of seconds for this call. Raises
+        TimeoutError when it runs out, or the model's last error.
+        """
+        future = self._submit(prompt, deadline, kwargs)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def generate_content_async(self, prompt, deadline=None, **kwargs):
+        """Awaitable version of generate_content, usable from any event loop; cancelling it cancels the call."""
+        return await asyncio.wrap_future(self._submit(prompt, deadline, kwargs))
+
+    def stream_content(self, prompt, deadline=None, **kwargs):
+        """
+        Blocking generator over the text pieces of a streamed generation.
+
+        The stream holds a concurrency slot until it ends and is cut off with
+        TimeoutError at the deadline. It is not retried, since text may already
+        have been passed on. Closing the generator early cancels the call.
+        """
+        pieces = queue.Queue()
+        finished = object()
+        seconds = self.deadline if deadline is None else deadline
+
+        async def produce():
+            async with self._slots():
+                self.in_flight += 1
+                try:
+                    if hasattr(self.model, "generate_content_async"):
+                        response = await self.model.generate_content_async(prompt, stream=True, **kwargs)
+                        async for chunk in response:
+                            pieces.put(chunk.text)
+                    else:
+                        def iterate():
+                            for chunk in self.model.generate_content(prompt, stream=True, **kwargs):
+                                pieces.put(chunk.text)
+                        await asyncio.to_thread(iterate)
+                finally:
+                    self.in_flight -= 1
+
+        async def run():
+            self.calls += 1
+            try:
+                await asyncio.wait_for(produce(), seconds)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self.failures += 1
+                raise
+            except Exception:
+                self.failures += 1
+                raise
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._event_loop())
+        future.add_done_callback(lambda _: pieces.put(finished))
+        try:
+            while True:
+                piece = pieces.get()
+                if piece is finished:
+                    break
+                yield piece
+            future.result()
+        finally:
+            future.cancel()
+
+    def stats(self):
+        """Return call, retry, timeout and failure counts and the calls currently in flight."""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency
+        }
+
+
+class StubModel:
+    """
+    Offline stand-in for a GenerativeModel, for local runs and tests.
+
+    reply(prompt) builds the response text (by default it echoes the end of
+    the prompt); latency adds a delay in seconds and the first `failures`
+    calls raise ConnectionError. With stream=True the reply comes back in
+    word-sized chunks. Prompts are kept in `prompts`.
+    """
+
+    def __init__(self, reply=None, latency=0.0, failures=0):
+        self.reply = reply or (lambda prompt: f"[stub] {prompt[-200:]}")
+        self.latency = latency
+        self.failures = failures
+        self.prompts = []
+
+    def _respond(self, prompt):
+        self.prompts.append(prompt)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("stub model failure")
+        return types.SimpleNamespace(text=self.reply(prompt))
+
+    @staticmethod
+    def _chunks(text):
+        """Split a reply into word-sized streaming chunks."""
+        return [types.SimpleNamespace(text=piece) for piece in re.findall(r"\s*\S+", text)]
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        time.sleep(self.latency)
+        response = self._respond(prompt)
+        return self._chunks(response.text) if stream else response
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        await asyncio.sleep(self.latency)
+        response = self._respond(prompt)
+        if not stream:
+            return response
+
+        async def chunks():
+            for chunk in self._chunks(response.text):
+                await asyncio.sleep(0)
+                yield chunk
+        return chunks()
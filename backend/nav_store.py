@@ -0,0 +1,454 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import requests
+from cache_utils import LRUCache
+
+try:
+    import fcntl
+except ImportError:    # Windows: per-scheme file locks are skipped
+    fcntl = None
+
+# mfapi.in endpoint serving the full NAV history of one scheme
+MFAPI_NAV_URL = "https://api.mfapi.in/mf/{code}"
+
+# Where the per-scheme NAV files are kept
+NAV_STORE_DIR = os.environ.get("NAV_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "nav_data"))
+
+# How often (seconds) a stored history is checked upstream for newer NAVs
+NAV_REFRESH_INTERVAL = float(os.environ.get("NAV_REFRESH_INTERVAL", 6 * 60 * 60))
+
+# Most scheme histories kept in memory per process
+NAV_CACHE_SIZE = int(os.environ.get("NAV_CACHE_SIZE", 512))
+
+# Number of locks that serialize work on the same scheme within a process
+NAV_LOCK_STRIPES = 64
+
+# On-disk layout: two raw little-endian arrays per scheme, appended to in place
+DAY_DTYPE = np.dtype('<i4')    # days since 1970-01-01
+NAV_DTYPE = np.dtype('<f8')
+
+
+# Directory holding the shared, memory-mapped archive of every scheme's NAVs
+NAV_ARCHIVE_DIR = os.environ.get("NAV_ARCHIVE_DIR", os.path.join(NAV_STORE_DIR, "archive"))
+
+# How often (seconds) a running process checks whether the archive was rebuilt
+NAV_ARCHIVE_RECHECK = float(os.environ.get("NAV_ARCHIVE_RECHECK", 60))
+
+# Per-scheme row of the offset table, sorted by code
+INDEX_DTYPE = np.dtype([('code', '<i8'), ('start', '<i8'), ('length', '<i8')])
+
+
+
+def parse_nav_records(records):
+    """
+    Convert mfapi.in NAV records ({"date": "dd-mm-yyyy", "nav": "..."}) to arrays.
+
+    Returns (days, navs) sorted by date, oldest first, with duplicate dates and
+    unparseable NAVs dropped. Days are int32 counts since 1970-01-01.
+    """
+    iso_dates = []
+    navs = []
+    for record in records:
+        try:
+            day, month, year = record["date"].split("-")
+            nav = float(record["nav"])
+        except (KeyError, ValueError, AttributeError):
+            continue
+        iso_dates.append(f"{year}-{month}-{day}")
+        navs.append(nav)
+
+    days = np.array(iso_dates, dtype='datetime64[D]').astype(DAY_DTYPE)
+    navs = np.array(navs, dtype=NAV_DTYPE)
+    days, first = np.unique(days, return_index=True)
+    return days, navs[first]
+
+
+def to_nav_records(days, navs):
+    """Convert (days, navs) arrays back to mfapi.in style records, newest first."""
+    dates = days[::-1].astype('datetime64[D]').tolist()
+    return [
+        {"date": d.strftime('%d-%m-%Y'), "nav": f"{nav:.5f}"}
+        for d, nav in zip(dates, navs[::-1].tolist())
+    ]
+
+
+def build_archive(histories, archive_dir=NAV_ARCHIVE_DIR):
+    """
+    Write a NAV archive from an iterable of (code, days, navs).
+
+    All NAVs go into one contiguous float64 array (and the dates into a parallel
+    int32 array); index.npy maps each scheme code to its (start, length) slice.
+
+    Each build is written to a new version directory and published by
+    atomically replacing the CURRENT file, so readers never see a partial archive.
+    """
+    histories = sorted(((int(code), days, navs) for code, days, navs in histories), key=lambda h: h[0])
+    total = sum(len(days) for _, days, _ in histories)
+
+    version = f"v{time.time_ns()}"
+    version_dir = os.path.join(archive_dir, version)
+    os.makedirs(version_dir)
+
+    index = np.lib.format.open_memmap(os.path.join(version_dir, "index.npy"), mode='w+',
+                                      dtype=INDEX_DTYPE, shape=(len(histories),))
+    all_days = np.lib.format.open_memmap(os.path.join(version_dir, "days.npy"), mode='w+',
+                                         dtype=DAY_DTYPE, shape=(total,))
+    all_navs = np.lib.format.open_memmap(os.path.join(version_dir, "navs.npy"), mode='w+',
+                                         dtype=NAV_DTYPE, shape=(total,))
+
+    start = 0
+    for i, (code, days, navs) in enumerate(histories):
+        n = len(days)
+        index[i] = (code, start, n)
+        all_days[start:start + n] = days
+        all_navs[start:start + n] = navs
+        start += n
+
+    for array in (index, all_days, all_navs):
+        array.flush()
+    del index, all_days, all_navs
+
+    current_tmp = os.path.join(archive_dir, "CURRENT.tmp")
+    with open(current_tmp, "w") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(archive_dir, "CURRENT"))
+
+    # Processes that already mapped an older version keep their open files; only
+    # the directory entries of versions before the previous one are removed
+    old_versions = sorted(name for name in os.listdir(archive_dir) if name.startswith("v") and name != version)
+    for name in old_versions[:-1]:
+        old_dir = os.path.join(archive_dir, name)
+        for filename in os.listdir(old_dir):
+            os.remove(os.path.join(old_dir, filename))
+        os.rmdir(old_dir)
+    return len(histories), total
+
+
+def _stored_codes(root):
+    """Codes of the schemes that have their own files in a NavStore directory."""
+    if not os.path.isdir(root):
+        return []
+    return [code for code, ext in map(os.path.splitext, os.listdir(root)) if ext == ".days" and code.isdigit()]
+
+
+def iter_store_histories(root=NAV_STORE_DIR, archive=None):
+    """
+    Yield (code, days, navs) for every scheme saved in a NavStore directory or
+    the archive it extends, merging the two the way NavStore reads them.
+    """
+    store = NavStore(root, archive=archive)
+    codes = set(_stored_codes(root))
+    if archive is not None:
+        codes.update(str(code) for code in archive.codes().tolist())
+    for code in sorted(codes, key=int):
+        stored = store._read(code)
+        if stored is not None and len(stored[0]):
+            yield code, stored[0], stored[1]
+
+
+class NavArchive:
+    """
+    Read side of the NAV archive.
+
+    The three .npy files are opened with mmap_mode='r', so every worker process
+    shares the same page-cache pages and a lookup returns NumPy views into them
+    with no parsing or copying.
+    """
+
+    def __init__(self, archive_dir=NAV_ARCHIVE_DIR, recheck=NAV_ARCHIVE_RECHECK):
+        self.archive_dir = archive_dir
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._arrays = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _open(self):
+        """(Re)open the archive if one exists and a newer version was published."""
+        try:
+            with open(os.path.join(self.archive_dir, "CURRENT")) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            self._arrays = None
+            self._version = None
+            return
+        if version == self._version:
+            return
+
+        version_dir = os.path.join(self.archive_dir, version)
+        index = np.load(os.path.join(version_dir, "index.npy"), mmap_mode='r')
+        days = np.load(os.path.join(version_dir, "days.npy"), mmap_mode='r')
+        navs = np.load(os.path.join(version_dir, "navs.npy"), mmap_mode='r')
+        self._arrays = (index, days, navs)
+        self._version = version
+
+    def _current(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.recheck:
+            with self._lock:
+                if now - self._checked_at >= self.recheck:
+                    self._open()
+                    self._checked_at = now
+        return self._arrays
+
+    def get(self, code):
+        """Return read-only (days, navs) views for a scheme, or None if it is not archived."""
+        arrays = self._current()
+        if arrays is None:
+            return None
+        index, days, navs = arrays
+
+        code = int(code)
+        i = np.searchsorted(index['code'], code)
+        if i == len(index) or index['code'][i] != code:
+            return None
+        start, length = int(index['start'][i]), int(index['length'][i])
+        return days[start:start + length], navs[start:start + length]
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def codes(self):
+        """Return the scheme codes present in the archive."""
+        arrays = self._current()
+        return arrays[0]['code'] if arrays is not None else np.empty(0, dtype='<i8')
+
+
+class NavStore:
+    """
+    Local on-disk NAV history, keyed by scheme code.
+
+    Each scheme is stored as `<code>.days` (int32 day numbers) and `<code>.navs`
+    (float64 NAVs), oldest first. The first request downloads the full history;
+    afterwards only days newer than the last stored date are appended. Within
+    NAV_REFRESH_INTERVAL a scheme is served from a bounded in-memory LRU with
+    no disk or upstream I/O.
+
+    Several worker processes may share the directory: updates of a scheme
+    hold an exclusive lock on `<code>.lock` and re-read the files under it,
+    and appends never write a day at or before the last one on disk.
+
+    With a shared NavArchive, an archived scheme's history is served as views
+    into the memory-mapped archive, and its own files only hold the days
+    after the archive ends. Until those appear, or once prune_archived()
+    folds them into a rebuilt archive, every worker reads the same pages.
+    """
+
+    def __init__(self, root=NAV_STORE_DIR, refresh_interval=NAV_REFRESH_INTERVAL, timeout=30, archive=None):
+        self.root = root
+        self.archive = archive
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self._histories = LRUCache(maxsize=NAV_CACHE_SIZE, ttl=refresh_interval)    # code -> (days, navs)
+        self._code_locks = [threading.Lock() for _ in range(NAV_LOCK_STRIPES)]
+
+    def _paths(self, code):
+        base = os.path.join(self.root, str(code))
+        return base + ".days", base + ".navs"
+
+    @contextmanager
+    def _code_lock(self, code):
+        """Hold a scheme exclusively, against other threads and (where fcntl exists) other processes."""
+        with self._code_locks[hash(str(code)) % NAV_LOCK_STRIPES]:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, f"{code}.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_files(self, code):
+        """Load a scheme's own files, or None if it has none."""
+        days_path, navs_path = self._paths(code)
+        if not (os.path.exists(days_path) and os.path.exists(navs_path)):
+            return None
+        days = np.fromfile(days_path, dtype=DAY_DTYPE)
+        navs = np.fromfile(navs_path, dtype=NAV_DTYPE)
+        # An interrupted append can leave one file longer than the other
+        n = min(len(days), len(navs))
+        if len(days) != len(navs):
+            os.truncate(days_path, n * DAY_DTYPE.itemsize)
+            os.truncate(navs_path, n * NAV_DTYPE.itemsize)
+        return days[:n], navs[:n]
+
+    def _archived(self, code):
+        """The scheme's (days, navs) views in the archive, or None if it is not archived."""
+        archived = self.archive.get(code) if self.archive is not None else None
+        return archived if archived is not None and len(archived[0]) else None
+
+    def _read(self, code):
+        """
+        Load a scheme's history, or None if it has never been stored.
+
+        Archived history comes first, as zero-copy views; only days in the
+        scheme's own files after the archive ends are joined onto it.
+        """
+        archived = self._archived(code)
+        stored = self._read_files(code)
+        if archived is None or stored is None:
+            return archived if stored is None else stored
+        newer = stored[0] > archived[0][-1]
+        if not newer.any():
+            return archived
+        return np.concatenate([archived[0], stored[0][newer]]), np.concatenate([archived[1], stored[1][newer]])
+
+    def _last_stored_day(self, days_path):
+        """The last day in a .days file, or None if it is missing or empty."""
+        try:
+            with open(days_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell() - f.tell() % DAY_DTYPE.itemsize
+                if size == 0:
+                    return None
+                f.seek(size - DAY_DTYPE.itemsize)
+                return int(np.frombuffer(f.read(DAY_DTYPE.itemsize), dtype=DAY_DTYPE)[0])
+        except FileNotFoundError:
+            return None
+
+    def _append(self, code, days, navs):
+        """
+        Append rows to a scheme's files, skipping any not after the last stored or
+        archived day, so the files stay sorted, free of duplicates and never repeat
+        the archive. Call with the scheme's lock held.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        days_path, navs_path = self._paths(code)
+        last_day = self._last_stored_day(days_path)
+        if last_day is None:
+            archived = self._archived(code)
+            last_day = int(archived[0][-1]) if archived is not None else None
+        if last_day is not None:
+            newer = days > last_day
+            days, navs = days[newer], navs[newer]
+        if not len(days):
+            return
+        with open(navs_path, "ab") as f:
+            f.write(navs.astype(NAV_DTYPE).tobytes())
+        with open(days_path, "ab") as f:
+            f.write(days.astype(DAY_DTYPE).tobytes())
+
+    def _fetch(self, code, latest_only=False):
+        """Download NAV records from mfapi.in, either the full history or just the latest day."""
+        url = MFAPI_NAV_URL.format(code=code) + ("/latest" if latest_only else "")
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_nav_records(response.json().get("data", []))
+
+    def _update(self, code, days, navs):
+        """Append any days newer than the last stored one. Returns the updated arrays."""
+        last_day = int(days[-1])
+        new_days, new_navs = self._fetch(code, latest_only=True)
+        if len(new_days) == 0 or new_days[-1] <= last_day:
+            return days, navs
+
+        # The latest NAV is enough only if it is the very next business day;
+        # otherwise fetch the history to fill in whatever was missed
+        next_business_day = np.busday_offset(np.datetime64(last_day, 'D'), 1, roll='forward')
+        if new_days[-1] != next_business_day.astype(DAY_DTYPE):
+            new_days, new_navs = self._fetch(code)
+
+        newer = new_days > last_day
+        new_days, new_navs = new_days[newer], new_navs[newer]
+        if len(new_days):
+            # Archived history stays in the archive; the files only get the new days
+            self._append(code, new_days, new_navs)
+            days = np.concatenate([days, new_days])
+            navs = np.concatenate([navs, new_navs])
+        return days, navs
+
+    def get(self, code):
+        """
+        Return (days, navs) for a scheme, oldest first.
+
+        Raises requests.exceptions.RequestException if the scheme has never
+        been stored and the download fails.
+        """
+        code = str(code)
+        cached = self._histories.get(code)
+        if cached is not None:
+            return cached
+
+        with self._code_lock(code):
+            cached = self._histories.get(code)
+            if cached is not None:
+                return cached
+
+            # Read under the lock: another process may have just written this scheme
+            stored = self._read(code)
+            if stored is None or len(stored[0]) == 0:
+                days, navs = self._fetch(code)
+                self._append(code, days, navs)
+            else:
+                try:
+                    days, navs = self._update(code, *stored)
+                except Exception as e:
+                    print(f"NAV update failed for scheme {code}, serving stored history: {e}")
+                    days, navs = stored
+
+            self._histories.set(code, (days, navs))
+            return days, navs
+
+    def prune_archived(self):
+        """
+        Delete the files of schemes whose every stored day is in the archive, so
+        they are served from the shared mapping again. Returns the number pruned.
+
+        Run after build_archive() has published a new version, with an archive
+        that has already opened it.
+        """
+        pruned = 0
+        for code in _stored_codes(self.root):
+            with self._code_lock(code):
+                archived = self._archived(code)
+                days_path, navs_path = self._paths(code)
+                last_day = self._last_stored_day(days_path)
+                if archived is None or (last_day is not None and last_day > archived[0][-1]):
+                    continue
+                for path in (days_path, navs_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._histories.pop(code)
+                pruned += 1
+        return pruned
+
+    def records(self, code):
+        """Return a scheme's NAV history as mfapi.in style records, newest first."""
+        return to_nav_records(*self.get(code))
+
+
+# Shared archive and store used by all endpoints in this process
+nav_archive = NavArchive()
+nav_store = NavStore(archive=nav_archive)
+
+
+def get_nav_history(code):
+    """Return (days, navs) arrays for a scheme from the shared NAV store."""
+    return nav_store.get(code)
+
+
+if __name__ == "__main__":
+    # Usage: python nav_store.py build-archive [--all]
+    #   --all  first download every scheme in the mfapi.in catalog into the store
+    if "build-archive" in sys.argv:
+        if "--all" in sys.argv:
+            from scheme_catalog import get_scheme_index
+
+            for code in get_scheme_index().codes:
+                try:
+                    nav_store.get(code)
+                except Exception as e:
+                    print(f"Skipping scheme {code}: {e}")
+
+        schemes, rows = build_archive(iter_store_histories(archive=nav_archive))
+        # Open the new version right away, then drop the files it made redundant
+        store = NavStore(archive=NavArchive(recheck=0))
+        pruned = store.prune_archived()
+        print(f"Archived {rows} NAVs for {schemes} schemes in {NAV_ARCHIVE_DIR}; removed the files of {pruned}")
@@ -0,0 +1,170 @@
+import time
+import numpy as np
+from fund_metrics import day_to_date_str, synthetic_nav_history
+
+# Annual rates (fractions) at which the NPV is evaluated to bracket the XIRR
+XIRR_RATE_GRID = np.concatenate([np.linspace(-0.99, 1, 200, endpoint=False), np.geomspace(1, 100, 50)])
+
+# Stop when |NPV| falls below this fraction of the gross cash flow, or the bracket collapses
+XIRR_TOLERANCE = 1e-10
+XIRR_MAX_ITERATIONS = 100
+
+
+def parse_cash_flows(cash_flows):
+    """
+    Turn [{"date": "YYYY-MM-DD", "amount": ...}, ...] into (day numbers, amounts).
+
+    Raises ValueError if a date or amount is missing or malformed.
+    """
+    try:
+        dates = np.array([flow["date"] for flow in cash_flows], dtype='datetime64[D]')
+        amounts = np.array([flow["amount"] for flow in cash_flows], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Each cash flow needs a 'date' (YYYY-MM-DD) and a numeric 'amount': {e}")
+    if not np.isfinite(amounts).all():
+        raise ValueError("Cash flow amounts must be finite numbers")
+    return dates.astype(np.int32), amounts
+
+
+def nav_lookup(days, navs, query_days):
+    """
+    The NAV applicable on each query day: the last NAV on or before it.
+
+    Binary search over the sorted NAV days, so thousands of lookups cost one
+    searchsorted call. Returns (NAV day numbers, NAVs); raises ValueError for
+    query days before the first NAV.
+    """
+    positions = np.searchsorted(days, query_days, side='right') - 1
+    if len(positions) and positions.min() < 0:
+        raise ValueError(f"No NAV on or before {day_to_date_str(np.min(query_days))}; "
+                         f"history starts on {day_to_date_str(days[0])}")
+    return days[positions], navs[positions]
+
+
+def _npv(rates, years, amounts):
+    """Net present value of the cash flows at each of `rates` (annual fractions)."""
+    discount = np.exp(-np.multiply.outer(np.log1p(rates), years))
+    return discount @ amounts
+
+
+def xirr(days, amounts, guess=0.1):
+    """
+    Annualized internal rate of return (fraction) of dated cash flows.
+
+    Parameters:
+    - days: day numbers of the cash flows, in any order
+    - amounts: signed amounts, money paid in negative and money received positive
+    - guess: when the NPV has several roots, the one bracketed nearest this rate is returned
+
+    The NPV is evaluated over XIRR_RATE_GRID in one matrix product to bracket a
+    root, which is then refined with Newton steps, bisecting whenever a step
+    would leave the bracket. Returns None when the flows are all one sign or no
+    rate in the grid's range zeroes the NPV.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if not (amounts > 0).any() or not (amounts < 0).any():
+        return None
+
+    # Flows on the same day are discounted identically, so merge them first
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    amounts = np.bincount(inverse, weights=amounts)
+    years = (unique_days - unique_days[0]) / 365.0
+    tolerance = XIRR_TOLERANCE * np.abs(amounts).sum()
+
+    values = _npv(XIRR_RATE_GRID, years, amounts)
+    brackets = np.flatnonzero(np.sign(values[:-1]) * np.sign(values[1:]) <= 0)
+    if not len(brackets):
+        return None
+    i = brackets[np.argmin(np.abs(XIRR_RATE_GRID[brackets] - guess))]
+    low, high = XIRR_RATE_GRID[i], XIRR_RATE_GRID[i + 1]
+    low_sign = np.sign(values[i])
+    if low_sign == 0:
+        return float(low)
+
+    rate = (low + high) / 2
+    for _ in range(XIRR_MAX_ITERATIONS):
+        discount = np.exp(-years * np.log1p(rate))
+        value = discount @ amounts
+        if abs(value) <= tolerance or high - low <= XIRR_TOLERANCE:
+            break
+        if np.sign(value) == low_sign:
+            low = rate
+        else:
+            high = rate
+        slope = -(years * discount) @ amounts / (1 + rate)
+        next_rate = rate - value / slope if slope != 0 else None
+        rate = next_rate if next_rate is not None and low < next_rate < high else (low + high) / 2
+    return float(rate)
+
+
+def value_portfolio(days, navs, flow_days, amounts):
+    """
+    Value a holding in one fund and compute its realized XIRR.
+
+    Parameters:
+    - days, navs: the fund's NAV arrays, oldest first (as returned by the NAV store)
+    - flow_days: day numbers of the transactions
+    - amounts: rupees invested (positive) or redeemed (negative) on each day
+
+    Each transaction buys or sells units at the NAV on or before its date; the
+    holding is valued at the latest NAV.
+
+    Returns:
+    - Dictionary with amounts invested and redeemed, units held, current value,
+      gain, absolute return and XIRR (percentages), or raises ValueError for
+      transactions outside the NAV history or redemptions beyond the units held
+    """
+    flow_days = np.asarray(flow_days, dtype=np.int32)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if len(flow_days) == 0:
+        raise ValueError("No cash flows given")
+    if flow_days.max() > days[-1]:
+        raise ValueError(f"Cash flows after the latest NAV ({day_to_date_str(days[-1])}) cannot be valued")
+
+    _, flow_navs = nav_lookup(days, navs, flow_days)
+    units = float((amounts / flow_navs).sum())
+    if units < -1e-6:
+        raise ValueError("Redemptions exceed the units bought")
+    units = max(units, 0.0)
+
+    current_value = units * float(navs[-1])
+    invested = float(amounts[amounts > 0].sum())
+    redeemed = float(-amounts[amounts < 0].sum())
+    gain = current_value + redeemed - invested
+    rate = xirr(np.append(flow_days, days[-1]), np.append(-amounts, current_value))
+
+    return {
+        "valuation_date": day_to_date_str(days[-1]),
+        "latest_nav": float(navs[-1]),
+        "cash_flows": int(len(amounts)),
+        "total_invested": round(invested, 2),
+        "total_redeemed": round(redeemed, 2),
+        "units": round(units, 4),
+        "current_value": round(current_value, 2),
+        "gain": round(gain, 2),
+        "absolute_return": round(gain / invested * 100, 2) if invested else None,
+        "xirr": round(rate * 100, 4) if rate is not None else None
+    }
+
+
+def benchmark(flows=5000, years=20, repeat=5):
+    """
+    Time value_portfolio on a synthetic history with `flows` random-day instalments.
+    Returns the best-of-`repeat` timing in milliseconds.
+    """
+    days, navs = synthetic_nav_history(years)
+    rng = np.random.default_rng(0)
+    flow_days = np.sort(rng.integers(days[0], days[-1], flows)).astype(np.int32)
+    amounts = rng.choice([1000.0, 2500.0, 5000.0], flows)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = value_portfolio(days, navs, flow_days, amounts)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"cash_flows": flows, "ms": min(timings), "xirr": result["xirr"]}
+
+
+if __name__ == "__main__":
+    print(benchmark())
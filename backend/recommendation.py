@@ -1,47 +1,13 @@
-def get_recommendation(age: int, income: float, risk: int) -> str:
-  """
-  Get investment recommendations dynamically based on user profile.
-
-  Args:
-      age: User's age
-      income: Annual income in dollars
-      risk: Risk tolerance on a scale of 1-5
+from recommendation_corpus import recommendation_corpus
 
-  Returns:
-      A string with tailored investment recommendations.
-  """
-  # Determine the age group
-  if age <= 23:
-      age_group = "18-23"
-  elif 24 <= age <= 30:
-      age_group = "24-30"
-  elif 31 <= age <= 40:
-      age_group = "31-40"
-  elif 40 <= age <= 55:
-      age_group = "40-55"
-  else:
-      age_group = "above 55"
-
-  # Determine the income bracket
-  if income >= 60000:
-      income_bracket = "60k+"
-  elif 35000 <= income < 60000:
-      income_bracket = "35-60k"
-  elif 20000 <= income < 35000:
-      income_bracket = "20-35k"
-  elif 10000 <= income < 20000:
-      income_bracket = "10-20k"
-  else:
-      income_bracket = "<10k"
-
-  # Comprehensive recommendations dictionary
-  recommendations = {
-      # Age 18-23
-      (
-          "18-23",
-          "60k+",
-          5,
-      ): """Overall Strategy:
+# Comprehensive recommendations dictionary, keyed by (age group, income bracket, risk)
+RECOMMENDATIONS = {
+    # Age 18-23
+    (
+        "18-23",
+        "60k+",
+        5,
+    ): """Overall Strategy:
 * Aggressive Growth: Focus on high-growth investments with substantial potential returns.
 * High Risk, High Reward: Embrace investments with higher volatility and risk.
 * Diversification: Ensure a well-diversified portfolio across different sectors and market caps to manage risk.
@@ -125,11 +91,11 @@ Things to Remember:
 * Fund Selection: Choose funds that align with your overall investment strategy and risk tolerance.
 The top funds in which you can invest if you are planning to invest in an equity fund are Union Innovation & Opportunities Direct with Nav = ₹15.3200, HDFC Defence Direct with Nav = ₹21.9820, Quant Commodities Direct with Nav = ₹14.2726. 
 Growth/Dividend Payout: I recommend opting for Growth. Given your age and income, reinvesting your earnings to capitalize on compounding is a smart strategy. This means your profits will be reinvested to generate even more returns over time.""",
-      (
-          "18-23",
-          "35-60k",
-          4,
-      ): """Overall Strategy:
+    (
+        "18-23",
+        "35-60k",
+        4,
+    ): """Overall Strategy:
 * Balanced Growth: Focus on investments that offer a mix of growth and stability.
 * Moderate Risk: Choose investments that balance risk and return.
 * Diversification: Ensure a well-diversified portfolio across different market caps and sectors to manage risk.
@@ -213,11 +179,11 @@ Things to Remember:
 * Diversification: Ensure your investments are diversified within the sector to mitigate risks associated with individual companies.
 The top funds in which you can invest if you are planning to invest in a infrastructure sector fund are LIC MF Infrastructure Direct with Nav = ₹59.2614, Bandhan Infrastructure Direct with Nav = ₹60.7220, Canara Robeco Infrastructure Direct with Nav = ₹178.3300.
 Growth/Dividend Payout: I suggest opting for Growth. Reinvesting your earnings will help maximize returns through compounding, which is beneficial given your moderate to high risk capacity.""",
-      (
-          "18-23",
-          "20-35k",
-          3,
-      ): """Overall Strategy:
+    (
+        "18-23",
+        "20-35k",
+        3,
+    ): """Overall Strategy:
 * Balanced Growth and Stability: Focus on investments that offer a mix of growth and stability.
 * Moderate Risk: Choose investments that balance risk and return.
 * Diversification: Ensure a well-diversified portfolio across different market caps and sectors to manage risk.
@@ -300,11 +266,11 @@ Things to Remember:
 * Diversification: Ensure your investments are diversified within the large-cap category to mitigate risks associated with individual companies.
 The top funds in which you can invest if you are planning to invest in a  Large Cap fund are Aditya Birla Sun Life Nifty Next 50 ETF with Nav = ₹71.8665, UTI Nifty Next 50 ETF with Nav = ₹73.5983, ICICI Pru Nifty Next 50 ETF with Nav = ₹72.0424.
 Growth/Dividend Payout: Opt for Growth to take advantage of compounding. This will help you maximize returns by reinvesting your earnings.""",
-      (
-          "18-23",
-          "10-20k",
-          2,
-      ): """Overall Strategy:
+    (
+        "18-23",
+        "10-20k",
+        2,
+    ): """Overall Strategy:
 * Focus on Stability and Steady Growth: Emphasize investments that offer stable returns with lower risk.
 * Lower Risk Tolerance: Choose investments that provide steady income and capital protection.
 * Diversification: Ensure a well-diversified portfolio to manage risk effectively.
@@ -387,11 +353,11 @@ Things to Remember:
 * Diversification: Ensure your bond investments are diversified across different types of bonds and issuers.
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Dividend Payout to get regular income. This suits your lower risk capacity and provides a steady cash flow.""",
-      (
-          "18-23",
-          "<10k",
-          1,
-      ): """Overall Strategy:
+    (
+        "18-23",
+        "<10k",
+        1,
+    ): """Overall Strategy:
 * Emphasize Capital Protection: Prioritize investments that protect your capital.
 * Low Risk: Choose investments that offer stable returns with minimal risk.
 * Income Generation: Focus on investments that provide regular income to supplement your lower income bracket.
@@ -477,12 +443,12 @@ Things to Remember:
 * Diversification: Ensure your cash equivalents are diversified across different instruments to mitigate risks.
 The top funds in which you can invest if you are planning to invest in a  cash/cash equivalents fund are Tata Money Market Direct with Nav = ₹4,622.2364, Axis Money Market Direct with Nav = ₹1,388.2474, Aditya Birla Sun Life Money Manager Fund - Direct with Nav = ₹360.4930.
 Growth/Dividend Payout: Opt for Dividend Payout to get regular income. This suits your lower risk capacity and provides a steady cash flow.""",
-      # Age 24-30
-      (
-          "24-30",
-          "60k+",
-          5,
-      ): """Overall Strategy:
+    # Age 24-30
+    (
+        "24-30",
+        "60k+",
+        5,
+    ): """Overall Strategy:
 * High Growth Potential: Focus on investments with high growth potential, even if they come with higher risk.
 * Diversification: Ensure the portfolio is diversified across various sectors to spread risk.
 * Capital Appreciation: Aim for substantial capital appreciation through equity investments.
@@ -555,11 +521,11 @@ Things to Remember:
 The top funds in which you can invest if you are planning to invest in an equity fund are Union Innovation & Opportunities Direct with Nav = ₹15.3200, HDFC Defence Direct with Nav = ₹21.9820, Quant Commodities Direct with Nav = ₹14.2726. 
 Growth/Dividend Payout: Opt for Growth. Given your age and income, reinvesting your earnings to capitalize on compounding is a smart strategy. This means your profits will be reinvested to generate even more returns over time.
 ________________""",
-      (
-          "24-30",
-          "35-60k",
-          4,
-      ): """* Moderate Growth Potential: Focus on investments with moderate growth potential and acceptable risk.
+    (
+        "24-30",
+        "35-60k",
+        4,
+    ): """* Moderate Growth Potential: Focus on investments with moderate growth potential and acceptable risk.
 * Tax Efficiency: Take advantage of tax-saving investment options.
 * Balanced Diversification: Ensure the portfolio is diversified across various sectors and asset classes.
 Investment Breakdown:
@@ -631,11 +597,11 @@ Things to Remember:
 The top funds in which you can invest if you are planning to invest in a infrastructure sector fund are LIC MF Infrastructure Direct with Nav = ₹59.2614, Bandhan Infrastructure Direct with Nav = ₹60.7220, Canara Robeco Infrastructure Direct with Nav = ₹178.3300.
 Growth/Dividend Payout: Opt for Growth. Reinvesting your earnings will help maximize returns through compounding, which is beneficial given your moderate to high-risk capacity.
     """,
-      (
-          "24-30",
-          "20-35k",
-          3,
-      ): """Overall Strategy:
+    (
+        "24-30",
+        "20-35k",
+        3,
+    ): """Overall Strategy:
 * Balanced Growth: Focus on investments that provide balanced growth with moderate risk.
 * Tax Efficiency: Utilize tax-saving investments to enhance returns.
 * Diversification: Ensure a well-diversified portfolio across different asset classes.
@@ -707,11 +673,11 @@ Things to Remember:
 The top funds in which you can invest if you are planning to invest in a  Large Cap fund are Aditya Birla Sun Life Nifty Next 50 ETF with Nav = ₹71.8665, UTI Nifty Next 50 ETF with Nav = ₹73.5983, ICICI Pru Nifty Next 50 ETF with Nav = ₹72.0424.
 Growth/Dividend Payout: Opt for Growth to take advantage of compounding. This will help you
 maximize returns by reinvesting your earnings.""",
-      (
-          "24-30",
-          "10-20k",
-          2,
-      ): """Overall Strategy:
+    (
+        "24-30",
+        "10-20k",
+        2,
+    ): """Overall Strategy:
 * Capital Protection: Focus on investments that protect capital and provide stable returns.
 * Moderate Growth: Aim for moderate growth with lower volatility.
 * Diversification: Ensure a well-diversified portfolio across different asset classes.
@@ -783,11 +749,11 @@ Things to Remember:
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Dividend Payout. This ensures you receive regular income, helping you manage your expenses and reinvest if desired.
 """,
-      (
-          "24-30",
-          "<10k",
-          10,
-      ): """Overall Strategy:
+    (
+        "24-30",
+        "<10k",
+        10,
+    ): """Overall Strategy:
 * Capital Protection: Prioritize investments that protect capital.
 * Steady Income: Focus on generating regular income.
 * Low Risk: Choose low-risk investments to minimize volatility.
@@ -861,11 +827,11 @@ Growth/Dividend Payout: Opt for Dividend Payout to receive regular income. This
 
 
 """,
-      (
-          "31-40",
-          "60k+",
-          5,
-      ): """Given your high income and high risk tolerance, we can focus on maximizing growth while managing risk through diversification. Here's a detailed investment plan for you:
+    (
+        "31-40",
+        "60k+",
+        5,
+    ): """Given your high income and high risk tolerance, we can focus on maximizing growth while managing risk through diversification. Here's a detailed investment plan for you:
     Investment Breakdown:
     1. ELSS (Equity Linked Savings Scheme) (35%)
     Why: ELSS funds invest primarily in equities and are designed to offer high returns over the long term. One of the key benefits of ELSS is the tax deduction under Section 80C of the Income Tax Act, which allows you to reduce your taxable income by up to ₹1.5 lakhs per year. This dual advantage of potential high returns and tax savings makes ELSS a compelling choice.
@@ -913,11 +879,11 @@ Things to Remember:
 * Duration: Intermediate bonds have a medium-term maturity, typically between 3 to 10 years, balancing income and risk.
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Growth to maximize compounding benefits over time. This means the returns will be reinvested, potentially increasing your overall investment value.""",
-      (
-          "31-40",
-          "35-60k",
-          4,
-      ): """Overall Strategy:
+    (
+        "31-40",
+        "35-60k",
+        4,
+    ): """Overall Strategy:
 * Balanced Approach: We'll combine investments with high growth potential and those providing stability.
 * Diversification: Spreading investments across different asset types to manage risk and capture diverse opportunities.
 * Tax Efficiency: Utilizing tax-saving investments to optimize your returns.
@@ -1018,12 +984,12 @@ The top funds in which you can invest if you are planning to invest in an Interm
     * Regularly review the fund’s performance and allocation strategy.
 The top funds in which you can invest if you are planning to invest in a FlexiCap fund are Motilal Oswal FlexiCap Direct with Nav = ₹71.5907, Invesco India Focused Direct with Nav = ₹30.9100, Invesco India Flexi Cap Direct with Nav = ₹20.0800.
 Growth/Dividend Payout: Opt for Growth to maximize the benefits of compounding over time.""",
-      # Age above 40
-      (
-          "31-40",
-          "20-35k",
-          3,
-      ): """Overall Strategy:
+    # Age above 40
+    (
+        "31-40",
+        "20-35k",
+        3,
+    ): """Overall Strategy:
 * Balanced Growth and Stability: We’ll focus on a mix of investments that offer both growth and stability.
 * Diversification: Spread investments across different asset types to mitigate risk.
 * Moderate Risk Tolerance: Ensure a mix of growth-oriented and stable investments to balance risk and returns.
@@ -1074,11 +1040,11 @@ The top funds in which you can invest if you are planning to invest in a  Large
     3. The returns are fixed and guaranteed, providing security.
 The top funds in which you can invest if you are planning to invest in a  tax saving fund are Quant ELSS Tax Saver Direct with Nav = ₹398.9609, Bandhan ELSS Tax Saver Direct with Nav = ₹170.5130, Parag Parikh ELSS Tax Saver Direct with Nav = ₹32.7684.
 Growth/Dividend Payout: Opt for Growth to maximize long-term returns through compounding.""",
-      (
-          "31-40",
-          "10-20k",
-          2,
-      ): """Overall Strategy:
+    (
+        "31-40",
+        "10-20k",
+        2,
+    ): """Overall Strategy:
 * Conservative Growth: Focus on investments that offer steady returns while providing some growth potential.
 * Low to Moderate Risk: Choose investments that have a lower risk profile but still offer reasonable growth opportunities.
 * Diversification: Spread investments across different asset types to manage risk effectively and provide stability.
@@ -1129,11 +1095,11 @@ Important Points:
 * Growth Potential: Being equity-oriented, ELSS funds offer significant growth potential over time.
 The top funds in which you can invest if you are planning to invest in a ELSS fund are Motilal Oswal ELSS Tax Saver Direct with Nav = ₹63.8660, HSBC ELSS Tax Saver Direct with Nav = ₹149.3156, WhiteOak Capital ELSS Tax Saver Direct with Nav = ₹18.1900.
 Growth/Dividend Payout: Opt for Growth to leverage the power of compounding over time. Given your moderate risk tolerance, this approach aligns well with your investment goals, allowing your money to grow while maintaining a focus on stability.""",
-      (
-          "31-40",
-          "<10k",
-          1,
-      ): """Overall Strategy:
+    (
+        "31-40",
+        "<10k",
+        1,
+    ): """Overall Strategy:
 * High Safety: Focus on investments that are secure and provide consistent returns.
 * Minimal Risk: Ensure that your portfolio is protected from significant losses.
 * Liquidity: Ensure that investments are easily accessible in case of need.
@@ -1183,11 +1149,11 @@ Important Points:
 * Guaranteed Returns: Fixed deposits offer guaranteed interest rates.
 * Safety: Both options are low-risk and provide capital protection.
 Growth/Dividend Payout: Opt for Dividend Payout. Given your very low risk capacity, having a regular income from dividends can be beneficial. It provides a steady stream of income while preserving your capital.""",
-      (
-          "40-55",
-          "60k+",
-          5,
-      ): """Overall Strategy:
+    (
+        "40-55",
+        "60k+",
+        5,
+    ): """Overall Strategy:
 1. Diversification: We'll spread your investments across different asset classes to minimize risk.
 2. Growth Focus: With your high risk tolerance, we'll prioritize high growth potential investments.
 3. Tax Efficiency: Utilizing tax-saving instruments to maximize your post-tax returns.
@@ -1244,11 +1210,11 @@ Important Points:
 * Regular Income: Bonds provide predictable income through interest payments.
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Growth. Given your high risk capacity and long investment horizon, reinvesting your earnings to capitalize on compounding is a smart strategy. This helps in maximizing returns over the long term.""",
-      (
-          "40-55",
-          "35-60k",
-          4,
-      ): """Overall Strategy:
+    (
+        "40-55",
+        "35-60k",
+        4,
+    ): """Overall Strategy:
 1. Diversification: Spread investments across various asset classes to balance risk and reward.
 2. Moderate Growth: Prioritize investments that offer moderate growth potential.
 3. Tax Efficiency: Utilize tax-saving instruments to enhance post-tax returns.
@@ -1299,11 +1265,11 @@ Important Points:
 * Active Management: Requires active management to capitalize on market opportunities effectively.
 The top funds in which you can invest if you are planning to invest in a FlexiCap fund are Motilal Oswal FlexiCap Direct with Nav = ₹71.5907, Invesco India Focused Direct with Nav = ₹30.9100, Invesco India Flexi Cap Direct with Nav = ₹20.0800.
 Growth/Dividend Payout: Opt for Growth for compounding benefits. Reinvesting earnings helps in maximizing returns over the long term, which aligns well with your risk capacity and investment goals.""",
-      (
-          "40-55",
-          "20-35k",
-          3,
-      ): """Overall Strategy:
+    (
+        "40-55",
+        "20-35k",
+        3,
+    ): """Overall Strategy:
 * Diversification: Spread investments across various asset classes to balance risk and reward.
 * Balanced Growth: Prioritize investments that offer a mix of growth and stability.
 * Risk Management: Ensure a significant portion of the portfolio is allocated to stable, lower-risk investments.
@@ -1374,11 +1340,11 @@ Things to Remember:
 * Market Volatility: As equity investments, ELSS funds can be volatile, but the lock-in period helps smooth out short-term fluctuations.
 The top funds in which you can invest if you are planning to invest in a ELSS fund are Motilal Oswal ELSS Tax Saver Direct with Nav = ₹63.8660, HSBC ELSS Tax Saver Direct with Nav = ₹149.3156, WhiteOak Capital ELSS Tax Saver Direct with Nav = ₹18.1900.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your moderate risk capacity, receiving regular dividends can provide a steady income while still allowing for growth.""",
-      (
-          "40-55",
-          "10-20k",
-          2,
-      ): """Overall Strategy:
+    (
+        "40-55",
+        "10-20k",
+        2,
+    ): """Overall Strategy:
 * Diversification: Spread investments across various asset classes to manage risk effectively.
 * Conservative Growth: Prioritize investments that offer stability and modest growth.
 * Regular Income: Ensure a portion of the portfolio provides regular income.
@@ -1450,11 +1416,11 @@ Things to Remember:
 The top funds in which you can invest if you are planning to invest in a  Large Cap fund are Aditya Birla Sun Life Nifty Next 50 ETF with Nav = ₹71.8665, UTI Nifty Next 50 ETF with Nav = ₹73.5983, ICICI Pru Nifty Next 50 ETF with Nav = ₹72.0424.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your lower risk capacity, receiving regular dividends can provide a steady income while still allowing for some growth.
 """,
-      (
-          "40-55",
-          "<10k",
-          1,
-      ): """Overall Strategy:
+    (
+        "40-55",
+        "<10k",
+        1,
+    ): """Overall Strategy:
 * Conservative Investments: Prioritize investments with low risk and stable returns.
 * Regular Income: Ensure a portion of the portfolio provides regular income.
 * Capital Preservation: Focus on preserving capital while generating modest returns.
@@ -1525,11 +1491,11 @@ Things to Remember:
 * Expense Ratio: Be mindful of the expense ratio, as it can affect net returns.
 The top funds in which you can invest if you are planning to invest in an Arbitrage fund are Kotak Equity Arbitrage Direct with Nav = ₹38.6464, Edelweiss Arbitrage Direct with Nav = ₹20.0745, Tata Arbitrage Direct with Nav = ₹14.5744.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your very low risk capacity, receiving regular dividends can provide a steady income while ensuring capital preservation.""",
-      (
-          "above 55",
-          "60k+",
-          5,
-      ): """Overall Strategy:
+    (
+        "above 55",
+        "60k+",
+        5,
+    ): """Overall Strategy:
 1. Capital Preservation: Ensuring your investments are safe and stable.
 2. Income Generation: Focusing on investments that provide regular income.
 3. Moderate Growth: Allocating a portion to growth-oriented investments to keep up with inflation.
@@ -1586,11 +1552,11 @@ Important Points:
 * Diversification: Adding bonds to your portfolio reduces overall volatility and risk.
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your high risk capacity, receiving regular dividends can provide a steady income while still allowing for some growth.""",
-      (
-          "above 55",
-          "35-60k",
-          4,
-      ): """Overall Strategy:
+    (
+        "above 55",
+        "35-60k",
+        4,
+    ): """Overall Strategy:
 1. Capital Preservation: Focus on investments that protect your capital.
 2. Income Generation: Ensure regular income through stable investments.
 3. Moderate Growth: Include growth-oriented investments to keep up with inflation.
@@ -1641,11 +1607,11 @@ Important Points:
 * Diversification: Adding bonds to your portfolio reduces overall volatility and risk.
 The top funds in which you can invest if you are planning to invest in an Intermediate Bond fund are Aditya Birla Sun Life Medium Term Plan - Direct with Nav = ₹40.3251, Kotak Medium Term Direct with Nav = ₹24.0279, Axis Strategic Bond Direct with Nav = ₹29.2883.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your moderate-high risk capacity, receiving regular dividends can provide a steady income while still allowing for some growth.""",
-      (
-          "above 55",
-          "20-35k",
-          3,
-      ): """Overall Strategy:
+    (
+        "above 55",
+        "20-35k",
+        3,
+    ): """Overall Strategy:
 1. Stable Income: Prioritize investments that provide regular income.
 2. Moderate Growth: Include growth-oriented investments to keep up with inflation.
 3. Diversification: Spread investments across different asset classes to manage risk.
@@ -1696,11 +1662,11 @@ Important Points:
 * Dividends: Large-cap companies often pay dividends, providing an additional income stream.
 The top funds in which you can invest if you are planning to invest in a  Large Cap fund are Aditya Birla Sun Life Nifty Next 50 ETF with Nav = ₹71.8665, UTI Nifty Next 50 ETF with Nav = ₹73.5983, ICICI Pru Nifty Next 50 ETF with Nav = ₹72.0424.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your moderate risk capacity, receiving regular dividends can provide a steady income while still allowing for some growth.""",
-      (
-          "above 55",
-          "10-20k",
-          2,
-      ): """Overall Strategy:
+    (
+        "above 55",
+        "10-20k",
+        2,
+    ): """Overall Strategy:
 1. Stable Income: Prioritize investments that provide regular income.
 2. Low Risk: Focus on low-risk investments to preserve capital.
 3. Diversification: Spread investments across different asset classes to manage risk.
@@ -1771,11 +1737,11 @@ Things to Remember:
 * Market Efficiency: The returns depend on the fund manager’s ability to identify and exploit price differences efficiently.
 The top funds in which you can invest if you are planning to invest in an Arbitrage fund are Kotak Equity Arbitrage Direct with Nav = ₹38.6464, Edelweiss Arbitrage Direct with Nav = ₹20.0745, Tata Arbitrage Direct with Nav = ₹14.5744.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your low risk capacity, receiving regular dividends can provide a steady income while minimizing risk.""",
-      (
-          "above 55",
-          "<10k",
-          1,
-      ): """Overall Strategy:
+    (
+        "above 55",
+        "<10k",
+        1,
+    ): """Overall Strategy:
 1. Stable Income: Prioritize investments that provide regular income.
 2. Low Risk: Focus on low-risk investments to preserve capital.
 3. Liquidity: Ensure part of the portfolio is easily accessible for emergencies.
@@ -1848,10 +1814,62 @@ Things to Remember:
 * Accessibility: Ensure you can access your funds quickly in case of an emergency.
 The top funds in which you can invest if you are planning to invest in a short term bond fund are Bank of India Short Term Income Fund - Direct with Nav = ₹27.8521, Aditya Birla Sun Life Short Term Fund - Direct with Nav = ₹49.1352, Nippon India Short Term Fund - Direct with Nav = ₹54.6701.
 Growth/Dividend Payout: Opt for Dividend Payout to ensure regular cash flow. Given your very low risk capacity, receiving regular dividends can provide a steady income while minimizing risk.""",
-  }
+}
+
+
+def recommendation_key(age: int, income: float, risk: int) -> tuple:
+  """Map a user profile to its (age_group, income_bracket, risk) key in RECOMMENDATIONS."""
+  # Determine the age group
+  if age <= 23:
+      age_group = "18-23"
+  elif 24 <= age <= 30:
+      age_group = "24-30"
+  elif 31 <= age <= 40:
+      age_group = "31-40"
+  elif 40 <= age <= 55:
+      age_group = "40-55"
+  else:
+      age_group = "above 55"
+
+  # Determine the income bracket
+  if income >= 60000:
+      income_bracket = "60k+"
+  elif 35000 <= income < 60000:
+      income_bracket = "35-60k"
+  elif 20000 <= income < 35000:
+      income_bracket = "20-35k"
+  elif 10000 <= income < 20000:
+      income_bracket = "10-20k"
+  else:
+      income_bracket = "<10k"
+
+  return (age_group, income_bracket, risk)
+
+
+def get_recommendation(age: int, income: float, risk: int, lang: str = 'en', fallback: bool = True) -> str:
+  """
+  Get investment recommendations dynamically based on user profile.
+
+  Args:
+      age: User's age
+      income: Annual income in dollars
+      risk: Risk tolerance on a scale of 1-5
+      lang: Language code; other languages than English come from the pre-translated corpus
+      fallback: Return the English text when the corpus has no translation (otherwise None)
+
+  Returns:
+      A string with tailored investment recommendations.
+  """
+  key = recommendation_key(age, income, risk)
+
+  # Use the pre-translated variant if the corpus has one
+  if lang != 'en':
+      translated = recommendation_corpus.lookup(*key, lang)
+      if translated is not None or not fallback:
+          return translated
 
   # Get the recommendation based on age group, income bracket, and risk
-  recommendation = recommendations.get((age_group, income_bracket, risk))
+  recommendation = RECOMMENDATIONS.get(key)
 
   # If no recommendation is found, return a default message
   if recommendation:
@@ -0,0 +1,130 @@
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+
+# Pre-translated recommendations, built offline by running this module
+RECOMMENDATION_CORPUS_PATH = os.environ.get(
+    "RECOMMENDATION_CORPUS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "recommendations.corpus")
+)
+
+# File layout: magic, little-endian uint32 header length, JSON header mapping
+# "age_group|income_bracket|risk|lang" to [offset, length] of a zlib-compressed
+# UTF-8 text in the data section that follows
+_MAGIC = b"RECCORP1"
+
+
+def corpus_key(age_group, income_bracket, risk, lang):
+    return f"{age_group}|{income_bracket}|{risk}|{lang}"
+
+
+def build_corpus(recommendations, languages, translate, path=RECOMMENDATION_CORPUS_PATH):
+    """
+    Translate every recommendation into every language and write the corpus file.
+
+    Parameters:
+    - recommendations: {(age_group, income_bracket, risk): English text}
+    - languages: target language codes
+    - translate: translate(text, lang) returning the translation; it should raise
+      on failure so an untranslated text is never stored
+    - path: output file, replaced atomically
+
+    Returns:
+    - Number of texts written
+    """
+    index = {}
+    blobs = []
+    offset = 0
+    for (age_group, income_bracket, risk), text in recommendations.items():
+        for lang in languages:
+            blob = zlib.compress(translate(text, lang).encode("utf-8"), 9)
+            index[corpus_key(age_group, income_bracket, risk, lang)] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+
+    header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, path)
+    return len(index)
+
+
+class RecommendationCorpus:
+    """
+    Read-only view of the pre-translated recommendation file.
+
+    The file is read on first use; texts are decompressed on demand and kept.
+    A missing or unreadable file behaves as an empty corpus.
+    """
+
+    def __init__(self, path=RECOMMENDATION_CORPUS_PATH):
+        self.path = path
+        self._index = None
+        self._data = b""
+        self._texts = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._index is not None:
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    content = f.read()
+                if content[:len(_MAGIC)] != _MAGIC:
+                    raise ValueError("not a recommendation corpus")
+                start = len(_MAGIC) + 4
+                (header_length,) = struct.unpack("<I", content[len(_MAGIC):start])
+                self._index = json.loads(content[start:start + header_length])
+                self._data = content[start + header_length:]
+            except FileNotFoundError:
+                self._index = {}
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Error loading recommendation corpus: {e}")
+                self._index = {}
+
+    def lookup(self, age_group, income_bracket, risk, lang):
+        """Return the pre-translated recommendation, or None if the corpus has no such variant."""
+        self._load()
+        key = corpus_key(age_group, income_bracket, risk, lang)
+        text = self._texts.get(key)
+        if text is None and key in self._index:
+            offset, length = self._index[key]
+            text = zlib.decompress(self._data[offset:offset + length]).decode("utf-8")
+            self._texts[key] = text
+        return text
+
+    def reload(self):
+        """Forget the loaded file so the next lookup reads it again."""
+        with self._lock:
+            self._index = None
+            self._data = b""
+            self._texts = {}
+
+
+recommendation_corpus = RecommendationCorpus()
+
+
+if __name__ == "__main__":
+    # Offline build: python recommendation_corpus.py [output_path]
+    # Uses the Gemini model configured in app2 and reuses its translation cache.
+    from recommendation import RECOMMENDATIONS
+    from app2 import gemini_translate, language_names
+    from translation_cache import translation_cache
+
+    languages = [lang for lang in language_names if lang != 'en']
+    written = build_corpus(
+        RECOMMENDATIONS,
+        languages,
+        lambda text, lang: translation_cache.translate(text, 'en', lang, gemini_translate, pinned=True),
+        sys.argv[1] if len(sys.argv) > 1 else RECOMMENDATION_CORPUS_PATH
+    )
+    print(f"Wrote {written} translated recommendations for {', '.join(languages)}")
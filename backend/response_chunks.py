@@ -0,0 +1,186 @@
+import codecs
+import operator
+import re
+import time
+import numpy as np
+
+# Longest message an assistant answer is split into, in characters (or bytes, with an encoding)
+CHUNK_SIZE = 300
+
+# Characters (or bytes, for a bytes/memoryview answer) split into words at a time
+BLOCK_SIZE = 64 * 1024
+
+_WORD = re.compile(r"(\s*)(\S+)")
+
+# Closing quotes, brackets and markdown emphasis that may follow a sentence end
+_CLOSERS = "\"')]*_"
+_SENTENCE_TAIL = frozenset(".!?" + _CLOSERS)
+
+
+def _blocks(text):
+    for start in range(0, len(text), BLOCK_SIZE):
+        yield text[start:start + BLOCK_SIZE]
+
+
+def _pieces(data):
+    """Decode UTF-8 bytes block by block, never splitting a character."""
+    view = memoryview(data)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for start in range(0, len(view), BLOCK_SIZE):
+        yield decoder.decode(view[start:start + BLOCK_SIZE])
+    yield decoder.decode(b"", final=True)
+
+
+def _words(text):
+    """Yield (preceding whitespace, word) pairs of a str, UTF-8 bytes/memoryview or iterable of str pieces."""
+    if isinstance(text, str):
+        text = _blocks(text)
+    elif isinstance(text, (bytes, bytearray, memoryview)):
+        text = _pieces(text)
+
+    tail = ""
+    for piece in text:
+        buffered = tail + piece
+        pairs = _WORD.findall(buffered)
+        # A word touching the end of the buffer may continue in the next piece
+        if pairs and not buffered[-1].isspace():
+            tail = "".join(pairs.pop())
+        else:
+            tail = buffered[len(buffered.rstrip()):]
+        yield from pairs
+    if tail.strip():
+        yield _WORD.match(tail).groups()
+
+
+def _ends_sentence(word):
+    # Most words end in a letter, so the cheap test on the last character comes first
+    return word[-1] in _SENTENCE_TAIL and word.rstrip(_CLOSERS).endswith((".", "!", "?"))
+
+
+def _scan(gaps, words, measure):
+    """Size and last line-break / sentence-end cut points of a chunk; see iter_chunks."""
+    length = 0
+    block = sentence = None
+    for i, (gap, word) in enumerate(zip(gaps, words)):
+        if i:
+            if "\n" in gap:
+                block = (i, length)
+            if _ends_sentence(words[i - 1]):
+                sentence = (i, length)
+            length += measure(gap)
+        length += measure(word)
+    return length, block, sentence
+
+
+def _join(gaps, words):
+    """Chunk text: the words with the whitespace between them, without the leading whitespace."""
+    return words[0] + "".join(map(operator.concat, gaps[1:], words[1:]))
+
+
+def iter_chunks(text, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Lazily split an answer into chunks of at most `chunk_size`, in one pass.
+
+    `text` may be a str, UTF-8 bytes or memoryview, or an iterable of str
+    pieces (e.g. a streamed answer). Sizes count characters, or encoded bytes
+    when `encoding` is given. A chunk is cut at the last line break (a
+    markdown paragraph, heading or list item) if that keeps it at least half
+    full, else at the last sentence end, else before the word that does not
+    fit. Words are never split, so a word longer than chunk_size becomes a
+    chunk of its own. Whitespace inside a chunk is kept as it is.
+    """
+    measure = len if encoding is None else (lambda s: len(s.encode(encoding)))
+    min_cut = chunk_size // 2
+    gaps = []                   # whitespace before each word of the chunk being built
+    words = []
+    length = 0                  # size of the chunk, not counting its leading whitespace
+    block = sentence = None     # last cut points as (word index, chunk size before it)
+
+    for gap, word in _words(text):
+        size = measure(word)
+        while words and length + measure(gap) + size > chunk_size:
+            if block and block[1] >= min_cut:
+                cut = block[0]
+            elif sentence and sentence[1] >= min_cut:
+                cut = sentence[0]
+            else:
+                cut = len(words)
+            yield _join(gaps[:cut], words[:cut])
+            # Words after the cut start the next chunk; the running size only restarts at a cut
+            gaps, words = gaps[cut:], words[cut:]
+            length, block, sentence = _scan(gaps, words, measure)
+
+        if words:
+            if "\n" in gap:
+                block = (len(words), length)
+            if _ends_sentence(words[-1]):
+                sentence = (len(words), length)
+            size += measure(gap)
+        length += size
+        gaps.append(gap)
+        words.append(word)
+
+    if words:
+        yield _join(gaps, words)
+
+
+def chunk_response(text, chunk_size=CHUNK_SIZE, encoding=None):
+    """Split a long response into a list of chunks of at most `chunk_size`; see iter_chunks."""
+    return list(iter_chunks(text, chunk_size, encoding))
+
+
+def _chunk_response_quadratic(text, chunk_size=CHUNK_SIZE):
+    """The previous chunker, which re-sums the chunk for every word; kept for benchmark()."""
+    words = text.split()
+    chunks = []
+    chunk = []
+
+    for word in words:
+        if sum(len(w) for w in chunk) + len(word) + len(chunk) > chunk_size:
+            chunks.append(" ".join(chunk))
+            chunk = []
+        chunk.append(word)
+
+    if chunk:
+        chunks.append(" ".join(chunk))
+
+    return chunks
+
+
+def synthetic_answer(size=50_000, seed=0):
+    """Markdown-like assistant answer of about `size` characters: headings, bullets and prose."""
+    rng = np.random.default_rng(seed)
+    vocabulary = ["fund", "returns", "NAV", "equity", "debt", "SIP", "investment", "risk", "the",
+                  "a", "portfolio", "long-term", "expense", "ratio", "market", "allocation", "is"]
+    parts = []
+    total = 0
+    while total < size:
+        words = " ".join(rng.choice(vocabulary, rng.integers(5, 25)))
+        sentence = words[0].upper() + words[1:] + "."
+        kind = rng.integers(10)
+        part = f"\n\n## {sentence[:-1]}\n\n" if kind == 0 else f"\n- {sentence}" if kind < 4 else f" {sentence}"
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)[:size].strip()
+
+
+def benchmark(size=50_000, chunk_size=CHUNK_SIZE, repeat=5):
+    """
+    Time chunk_response against the previous quadratic chunker on a synthetic
+    answer of `size` characters. Returns best-of-`repeat` timings in milliseconds.
+    """
+    text = synthetic_answer(size)
+    timings = {}
+    for name, chunker in (("quadratic", _chunk_response_quadratic), ("linear", chunk_response)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            chunks = chunker(text, chunk_size)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        timings[name] = {"ms": best, "chunks": len(chunks)}
+    timings["speedup"] = timings["quadratic"]["ms"] / timings["linear"]["ms"]
+    return timings
+
+
+if __name__ == "__main__":
+    print(benchmark())
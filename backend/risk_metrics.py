@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from fund_metrics import TRADING_DAYS_PER_YEAR, day_to_date_str
+from nav_store import nav_store
+
+# Annual risk-free rate (percentage) used for Sharpe and Sortino ratios
+RISK_FREE_RATE = float(os.environ.get("RISK_FREE_RATE", 6.5))
+
+# Scheme code of the fund used as the market benchmark for beta (e.g. a Nifty 50 index fund)
+RISK_BENCHMARK_SCHEME_CODE = os.environ.get("RISK_BENCHMARK_SCHEME_CODE")
+
+# Default window for rolling metrics, in NAV observations (about one year)
+ROLLING_WINDOW = 252
+
+
+def _ratio(numerator, denominator):
+    """Divide, giving None (scalars) or NaN (arrays) where the result is not finite."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.divide(numerator, denominator)
+    if np.ndim(value) == 0:
+        return float(value) if np.isfinite(value) else None
+    return np.where(np.isfinite(value), value, np.nan)
+
+
+def drawdowns(days, navs):
+    """
+    Return (drawdown, underwater_days) arrays for a NAV series.
+
+    drawdown[i] is the fall from the running peak as a fraction (<= 0);
+    underwater_days[i] is the number of calendar days since that peak.
+    """
+    peaks = np.maximum.accumulate(navs)
+    drawdown = navs / peaks - 1
+    at_peak = drawdown >= 0
+    last_peak = np.maximum.accumulate(np.where(at_peak, np.arange(len(navs)), 0))
+    return drawdown, days - days[last_peak]
+
+
+def beta(days, navs, benchmark_days, benchmark_navs):
+    """Beta of a fund's daily returns against a benchmark, over the dates both have a NAV."""
+    common, fund_idx, bench_idx = np.intersect1d(days, benchmark_days, return_indices=True)
+    if len(common) < 3:
+        return None
+    fund_returns = np.diff(navs[fund_idx]) / navs[fund_idx][:-1]
+    bench_returns = np.diff(benchmark_navs[bench_idx]) / benchmark_navs[bench_idx][:-1]
+    covariance = np.cov(fund_returns, bench_returns)
+    return _ratio(covariance[0, 1], covariance[1, 1])
+
+
+def rolling_risk_metrics(days, navs, window=ROLLING_WINDOW, risk_free_rate=RISK_FREE_RATE):
+    """
+    Rolling volatility, Sharpe, Sortino, max drawdown and drawdown duration.
+
+    Each value covers the `window` daily returns ending at that date. Returns a
+    dictionary of arrays aligned with "days" (the window end dates); it is empty
+    when the history is shorter than one window.
+    """
+    returns = np.diff(navs) / navs[:-1]
+    if len(returns) < window:
+        return {}
+
+    excess = returns - risk_free_rate / 100 / TRADING_DAYS_PER_YEAR
+    downside = np.minimum(excess, 0) ** 2
+
+    # Window sums from cumulative sums: one pass over the history for each moment
+    def window_sum(values):
+        totals = np.concatenate([[0.0], np.cumsum(values)])
+        return totals[window:] - totals[:-window]
+
+    mean = window_sum(returns) / window
+    variance = (window_sum(returns ** 2) - window * mean ** 2) / (window - 1)
+    volatility = np.sqrt(np.maximum(variance, 0) * TRADING_DAYS_PER_YEAR)
+    annual_excess = window_sum(excess) / window * TRADING_DAYS_PER_YEAR
+    downside_deviation = np.sqrt(window_sum(downside) / window * TRADING_DAYS_PER_YEAR)
+
+    # Drawdowns within each window of window + 1 NAVs
+    nav_windows = sliding_window_view(navs, window + 1)
+    day_windows = sliding_window_view(days, window + 1)
+    peaks = np.maximum.accumulate(nav_windows, axis=1)
+    window_drawdowns = nav_windows / peaks - 1
+    positions = np.arange(window + 1)
+    last_peak = np.maximum.accumulate(np.where(window_drawdowns >= 0, positions, 0), axis=1)
+    underwater = day_windows - np.take_along_axis(day_windows, last_peak, axis=1)
+
+    return {
+        "days": days[window:],
+        "volatility": volatility * 100,
+        "sharpe_ratio": _ratio(annual_excess, volatility),
+        "sortino_ratio": _ratio(annual_excess, downside_deviation),
+        "max_drawdown": window_drawdowns.min(axis=1) * 100,
+        "max_drawdown_duration_days": underwater.max(axis=1)
+    }
+
+
+def compute_risk_metrics(days, navs, risk_free_rate=RISK_FREE_RATE, benchmark=None,
+                         rolling=False, window=ROLLING_WINDOW):
+    """
+    Compute risk metrics over a fund's entire NAV history.
+
+    Parameters:
+    - days, navs: NAV arrays, oldest first (as returned by the NAV store)
+    - risk_free_rate: annual risk-free rate as a percentage
+    - benchmark: optional (days, navs) of a benchmark fund, used for beta
+    - rolling: also return rolling_risk_metrics() under "rolling"
+    - window: rolling window length in NAV observations
+
+    Returns:
+    - Dictionary with annualized return and volatility, Sharpe and Sortino
+      ratios, max drawdown with its dates, longest drawdown in days, current
+      drawdown and beta (percentages for returns, volatility and drawdowns).
+      Values are None when there is not enough data.
+    """
+    days = np.asarray(days)
+    navs = np.asarray(navs, dtype=np.float64)
+    if len(navs) < 3:
+        return {
+            "annualized_return": None, "annualized_volatility": None, "sharpe_ratio": None,
+            "sortino_ratio": None, "max_drawdown": None, "max_drawdown_peak_date": None,
+            "max_drawdown_trough_date": None, "max_drawdown_duration_days": None,
+            "current_drawdown": None, "beta": None
+        }
+
+    returns = np.diff(navs) / navs[:-1]
+    excess = returns - risk_free_rate / 100 / TRADING_DAYS_PER_YEAR
+
+    years = (int(days[-1]) - int(days[0])) / 365.25
+    annualized_return = ((navs[-1] / navs[0]) ** (1 / years) - 1) * 100 if years > 0 else None
+    volatility = float(np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR))
+    annual_excess = float(np.mean(excess) * TRADING_DAYS_PER_YEAR)
+    downside_deviation = float(np.sqrt(np.mean(np.minimum(excess, 0) ** 2) * TRADING_DAYS_PER_YEAR))
+
+    drawdown, underwater_days = drawdowns(days, navs)
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(navs[:trough + 1]))
+
+    metrics = {
+        "annualized_return": float(annualized_return) if annualized_return is not None else None,
+        "annualized_volatility": volatility * 100,
+        "sharpe_ratio": _ratio(annual_excess, volatility),
+        "sortino_ratio": _ratio(annual_excess, downside_deviation),
+        "max_drawdown": float(drawdown[trough]) * 100,
+        "max_drawdown_peak_date": day_to_date_str(days[peak]),
+        "max_drawdown_trough_date": day_to_date_str(days[trough]),
+        "max_drawdown_duration_days": int(underwater_days.max()),
+        "current_drawdown": float(drawdown[-1]) * 100,
+        "beta": beta(days, navs, *benchmark) if benchmark is not None else None
+    }
+    if rolling:
+        metrics["rolling"] = rolling_risk_metrics(days, navs, window, risk_free_rate)
+    return metrics
+
+
+def load_benchmark():
+    """Return (days, navs) of the configured benchmark fund from the NAV store, or None."""
+    if not RISK_BENCHMARK_SCHEME_CODE:
+        return None
+    try:
+        return nav_store.get(RISK_BENCHMARK_SCHEME_CODE)
+    except Exception as e:
+        print(f"Error loading benchmark NAV history: {e}")
+        return None
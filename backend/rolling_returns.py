@@ -0,0 +1,137 @@
+import os
+import threading
+import numpy as np
+from cache_utils import LRUCache
+
+# Rolling CAGR windows, in years
+ROLLING_PERIODS = {
+    "1Y": 1,
+    "3Y": 3,
+    "5Y": 5
+}
+
+# Trailing periods, in calendar days; periods of a year or more are annualized
+TRAILING_PERIODS = {
+    "1M": 30,
+    "3M": 91,
+    "6M": 182,
+    "1Y": 365,
+    "3Y": 1096,
+    "5Y": 1826
+}
+
+# Maximum number of funds whose rolling series are kept in memory
+ROLLING_RETURNS_CACHE_SIZE = int(os.environ.get("ROLLING_RETURNS_CACHE_SIZE", 256))
+
+
+def _look_back(days, ends, period_days):
+    """Index of the last NAV on or before `period_days` before each end index, or -1."""
+    return np.searchsorted(days, days[ends] - period_days, side='right') - 1
+
+
+def rolling_cagr(days, navs, years, start=0):
+    """
+    Rolling CAGR (percentage) for every NAV from index `start` on.
+
+    Each value compares a NAV with the last NAV at least `years` earlier, so
+    NAVs without that much history before them are skipped. Because a NAV is
+    the running product of daily growth factors, the window growth is just
+    navs[end] / navs[begin]. Returns (end day numbers, CAGR values).
+    """
+    ends = np.arange(start, len(days))
+    begins = _look_back(days, ends, round(years * 365.25))
+    valid = begins >= 0
+    ends, begins = ends[valid], begins[valid]
+
+    elapsed_years = (days[ends] - days[begins]) / 365.25
+    cagr = ((navs[ends] / navs[begins]) ** (1 / elapsed_years) - 1) * 100
+    return days[ends], cagr
+
+
+def distribution(values):
+    """Summary statistics of a rolling return series."""
+    if len(values) == 0:
+        return None
+    return {
+        "count": int(len(values)),
+        "mean": float(np.mean(values)),
+        "median": float(np.median(values)),
+        "min": float(np.min(values)),
+        "max": float(np.max(values)),
+        "p10": float(np.percentile(values, 10)),
+        "p90": float(np.percentile(values, 90)),
+        "percent_positive": float(np.mean(values > 0) * 100)
+    }
+
+
+def trailing_returns(days, navs):
+    """
+    Trailing returns (percentages) ending at the latest NAV.
+
+    Periods under a year are absolute returns, longer ones are CAGR; periods
+    longer than the available history are None.
+    """
+    ends = np.full(len(TRAILING_PERIODS), len(days) - 1)
+    begins = _look_back(days, ends, np.array(list(TRAILING_PERIODS.values())))
+
+    returns = {}
+    for (name, period_days), begin in zip(TRAILING_PERIODS.items(), begins.tolist()):
+        if begin < 0:
+            returns[name] = None
+            continue
+        growth = navs[-1] / navs[begin]
+        if period_days >= 365:
+            growth **= 365.25 / (days[-1] - days[begin])
+        returns[name] = float((growth - 1) * 100)
+    return returns
+
+
+class RollingReturns:
+    """
+    Rolling CAGR series for one fund, extended incrementally.
+
+    When new NAV days are appended, only the windows ending on those days are
+    computed; earlier values never change because the history before them is
+    fixed.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.last_day = None
+        self.series = {name: (np.empty(0, dtype=np.int32), np.empty(0)) for name in ROLLING_PERIODS}
+        self.stats = {name: None for name in ROLLING_PERIODS}
+        self._lock = threading.Lock()
+
+    def update(self, days, navs):
+        """Bring the series up to date with (days, navs). Returns self."""
+        with self._lock:
+            if len(days) == self.length and (self.length == 0 or days[-1] == self.last_day):
+                return self
+
+            # Anything other than a pure append (e.g. a rebuilt history) starts over
+            start = self.length
+            if self.length == 0 or len(days) < self.length or days[self.length - 1] != self.last_day:
+                start = 0
+
+            for name, years in ROLLING_PERIODS.items():
+                new_days, new_cagr = rolling_cagr(days, navs, years, start)
+                if start:
+                    old_days, old_cagr = self.series[name]
+                    new_days = np.concatenate([old_days, new_days])
+                    new_cagr = np.concatenate([old_cagr, new_cagr])
+                self.series[name] = (new_days, new_cagr)
+                self.stats[name] = distribution(new_cagr)
+
+            self.length = len(days)
+            self.last_day = days[-1] if len(days) else None
+            return self
+
+
+# scheme code -> RollingReturns
+rolling_returns_cache = LRUCache(maxsize=ROLLING_RETURNS_CACHE_SIZE)
+
+
+def get_rolling_returns(scheme_code, days, navs):
+    """Return the up-to-date RollingReturns for a scheme, reusing earlier work where possible."""
+    rolling = rolling_returns_cache.get_or_compute(str(scheme_code), RollingReturns)
+    return rolling.update(days, navs)
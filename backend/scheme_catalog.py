@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import requests
+from scheme_index import SchemeIndex
+from fund_matcher import FundMatcher
+
+# mfapi.in endpoint that lists every scheme as {"schemeCode": ..., "schemeName": ...}
+MFAPI_SCHEMES_URL = "https://api.mfapi.in/mf"
+
+# How long a downloaded catalog is considered fresh (seconds)
+SCHEME_CATALOG_TTL = float(os.environ.get("SCHEME_CATALOG_TTL", 6 * 60 * 60))
+
+# Start a background refresh this many seconds before the TTL runs out
+SCHEME_CATALOG_REFRESH_AHEAD = float(os.environ.get("SCHEME_CATALOG_REFRESH_AHEAD", 10 * 60))
+
+# Past the TTL, keep serving the old catalog for at most this long while a refresh runs
+SCHEME_CATALOG_MAX_STALE = float(os.environ.get("SCHEME_CATALOG_MAX_STALE", 24 * 60 * 60))
+
+
+class SchemeCatalog:
+    """
+    In-process cache of the mfapi.in scheme master list.
+
+    The list is downloaded once and served from memory. Shortly before the TTL
+    expires a background thread refreshes it; requests keep getting the old
+    (stale) list until the new one is in place. Only one refresh is ever in
+    flight, and a failed refresh keeps the last good list.
+
+    A SchemeIndex and a FundMatcher are built alongside every list that is
+    loaded, so lookups never have to scan the raw catalog.
+    """
+
+    def __init__(self, url=MFAPI_SCHEMES_URL, ttl=SCHEME_CATALOG_TTL,
+                 refresh_ahead=SCHEME_CATALOG_REFRESH_AHEAD, max_stale=SCHEME_CATALOG_MAX_STALE,
+                 timeout=30):
+        self.url = url
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.max_stale = max_stale
+        self.timeout = timeout
+
+        self._schemes = None
+        self._index = None
+        self._matcher = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self):
+        """Download the full scheme list from mfapi.in."""
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _refresh(self):
+        """Download the catalog and swap it in. Caller must hold _refresh_lock."""
+        schemes = self._fetch()
+        index = SchemeIndex(schemes)
+        matcher = FundMatcher(index)
+        with self._lock:
+            self._schemes = schemes
+            self._index = index
+            self._matcher = matcher
+            self._loaded_at = time.monotonic()
+            self._version += 1
+        return schemes
+
+    def _refresh_in_background(self):
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._refresh_lock:
+                    self._refresh()
+            except Exception as e:
+                print(f"Scheme catalog refresh failed, serving stale data: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="scheme-catalog-refresh", daemon=True).start()
+
+    def get(self):
+        """
+        Return the cached scheme list, downloading it on first use.
+
+        Raises requests.exceptions.RequestException if there is no usable copy
+        and the download fails.
+        """
+        with self._lock:
+            schemes = self._schemes
+            age = time.monotonic() - self._loaded_at
+
+        if schemes is not None and age < self.ttl + self.max_stale:
+            if age >= self.ttl - self.refresh_ahead:
+                self._refresh_in_background()
+            return schemes
+
+        # Nothing usable in memory: block, but let only one caller download
+        with self._refresh_lock:
+            with self._lock:
+                if self._schemes is not None and time.monotonic() - self._loaded_at < self.ttl:
+                    return self._schemes
+            try:
+                return self._refresh()
+            except Exception:
+                # A too-old list is still better than no list at all
+                if schemes is not None:
+                    print("Scheme catalog refresh failed, serving expired data")
+                    return schemes
+                raise
+
+    def get_index(self):
+        """Return the SchemeIndex built for the currently cached scheme list."""
+        self.get()
+        return self._index
+
+    def get_matcher(self):
+        """Return the FundMatcher built for the currently cached scheme list."""
+        self.get()
+        return self._matcher
+
+    @property
+    def version(self):
+        """Incremented every time a new catalog is loaded."""
+        return self._version
+
+    def invalidate(self):
+        """Drop the cached catalog so the next get() downloads it again."""
+        with self._lock:
+            self._schemes = None
+            self._index = None
+            self._matcher = None
+            self._loaded_at = 0.0
+
+
+# Shared catalog used by all endpoints in this process
+scheme_catalog = SchemeCatalog()
+
+
+def get_schemes():
+    """Return the mfapi.in scheme list from the shared in-memory catalog."""
+    return scheme_catalog.get()
+
+
+def get_scheme_index():
+    """Return the SchemeIndex for the shared in-memory catalog."""
+    return scheme_catalog.get_index()
+
+
+def get_fund_matcher():
+    """Return the FundMatcher for the shared in-memory catalog."""
+    return scheme_catalog.get_matcher()
@@ -0,0 +1,135 @@
+from array import array
+from bisect import bisect_left
+
+# Length of the character n-grams used by the inverted index
+NGRAM_SIZE = 3
+
+
+def fold(text):
+    """Normalise a scheme name or query for case-insensitive matching."""
+    return text.casefold()
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    """Return the set of character n-grams in an already folded string."""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SchemeIndex:
+    """
+    Lookup structures over the mfapi.in scheme list, built once per catalog load.
+
+    Holds:
+    - an exact map (as-is and case-folded) from scheme name to scheme code
+    - a sorted array of folded names for prefix search
+    - an n-gram inverted index for substring search
+
+    Scheme ids are positions in the original catalog, so results keep the
+    catalog order the old linear scans returned.
+    """
+
+    def __init__(self, schemes):
+        self.names = []
+        self.codes = []
+        for scheme in schemes:
+            name = scheme.get("schemeName")
+            if name:
+                self.names.append(name)
+                self.codes.append(scheme.get("schemeCode"))
+
+        self.folded = [fold(name) for name in self.names]
+
+        # Later duplicates win in both maps, matching the old {name: code} dict comprehension
+        self.exact = {name: i for i, name in enumerate(self.names)}
+        self.exact_folded = {name: i for i, name in enumerate(self.folded)}
+
+        # Sorted (folded name, id) pairs for prefix search
+        order = sorted(range(len(self.folded)), key=lambda i: (self.folded[i], i))
+        self.sorted_folded = [self.folded[i] for i in order]
+        self.sorted_ids = array('i', order)
+
+        # n-gram -> ascending ids of the names containing it
+        postings = {}
+        for i, name in enumerate(self.folded):
+            for gram in ngrams(name):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: array('i', ids) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """Return the scheme id for an exact name (case-insensitive fallback), or None."""
+        i = self.exact.get(name)
+        if i is None:
+            i = self.exact_folded.get(fold(name))
+        return i
+
+    def code_for(self, name):
+        """Return the scheme code for an exact name, or None."""
+        i = self.lookup(name)
+        return self.codes[i] if i is not None else None
+
+    def prefix_ids(self, prefix, limit=None, start=0):
+        """
+        Return ids of names starting with `prefix`, in alphabetical order.
+
+        `start` skips that many matches, which lets callers page through results.
+        """
+        prefix = fold(prefix)
+        lo = bisect_left(self.sorted_folded, prefix) + start
+        ids = []
+        while lo < len(self.sorted_folded) and self.sorted_folded[lo].startswith(prefix):
+            if limit is not None and len(ids) >= limit:
+                break
+            ids.append(self.sorted_ids[lo])
+            lo += 1
+        return ids
+
+    def prefix_search(self, prefix, limit=None):
+        """Return scheme names starting with `prefix`, in alphabetical order."""
+        return [self.names[i] for i in self.prefix_ids(prefix, limit)]
+
+    def substring_ids(self, query, limit=None, start=0):
+        """Return ids of names containing `query`, in catalog order, skipping the first `start`."""
+        query = fold(query)
+        grams = ngrams(query)
+        if grams:
+            # Only names sharing the rarest n-gram can match; verify those directly
+            rarest = min((self.postings.get(gram, ()) for gram in grams), key=len)
+            candidates = rarest
+        else:
+            candidates = range(len(self.folded))
+
+        ids = []
+        for i in candidates:
+            if query in self.folded[i]:
+                if start > 0:
+                    start -= 1
+                    continue
+                ids.append(i)
+                if limit is not None and len(ids) >= limit:
+                    break
+        return ids
+
+    def page(self, query="", limit=20, cursor=0, match="prefix"):
+        """
+        Return one page of scheme names matching `query` plus the cursor of the next page.
+
+        `match` is "prefix" (alphabetical order) or "contains" (catalog order).
+        The cursor is the number of matches already returned; None means no more pages.
+        """
+        find = self.substring_ids if match == "contains" else self.prefix_ids
+        # Ask for one extra match to know whether another page exists
+        ids = find(query, limit=limit + 1, start=cursor)
+        next_cursor = cursor + limit if len(ids) > limit else None
+        return [self.names[i] for i in ids[:limit]], next_cursor
+
+    def substring_search(self, query, limit=None):
+        """Return scheme names containing `query`, in catalog order."""
+        return [self.names[i] for i in self.substring_ids(query, limit)]
+
+    def first_match_code(self, query):
+        """Return the code of the first scheme whose name contains `query`, or None."""
+        ids = self.substring_ids(query, limit=1)
+        return self.codes[ids[0]] if ids else None
@@ -0,0 +1,282 @@
+from abc import ABC, abstractmethod
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from cache_utils import LRUCache
+
+# Session backend: "memory" (per process) or "sqlite:///path/to/sessions.sqlite3", which
+# every worker process on the host shares
+SESSION_STORE = os.environ.get("SESSION_STORE", "memory")
+
+# Seconds of inactivity after which a user's conversation state is forgotten
+SESSION_TTL = float(os.environ.get("SESSION_TTL", 30 * 60))
+
+# Most sessions kept at once; the least recently active are evicted first
+SESSION_MAX_USERS = int(os.environ.get("SESSION_MAX_USERS", 10000))
+
+# The SQLite backend drops expired and surplus sessions once every this many saves
+SESSION_PURGE_EVERY = 100
+
+# Number of locks that serialize requests of the same user within a process
+SESSION_LOCK_STRIPES = 64
+
+# Version argument of SQLiteSessionStore._write that skips the concurrent-update check
+_ANY = object()
+
+
+def new_session():
+    """
+    Conversation state of a user with no dialogue in progress and no unread answer chunks.
+
+    "answer" holds the last multi-part assistant answer as {"chunks": {lang:
+    [chunk, ...]}, "next": index of the first unread chunk}.
+    """
+    return {
+        "recommendation_mode": False,
+        "recommendation_state": {},
+        "calculation_mode": False,
+        "calculation_state": {},
+        "answer": None
+    }
+
+
+class SessionStore(ABC):
+    """
+    Per-user conversation state keyed by user_id, bounded in size and age.
+
+    Backends implement load (None when absent or expired), save and delete
+    on JSON-serializable dicts, plus a versioned load and a conditional
+    write used by the session blocks. Each load returns the caller's own
+    copy, so nothing is shared between requests until it is saved.
+    """
+
+    def __init__(self):
+        self.conflicts = 0
+        self._user_locks = [threading.RLock() for _ in range(SESSION_LOCK_STRIPES)]
+
+    @abstractmethod
+    def load(self, user_id):
+        """Return a copy of the user's session, or None if it is absent or expired."""
+
+    @abstractmethod
+    def save(self, user_id, session):
+        """Store the user's session, restarting its expiry time."""
+
+    @abstractmethod
+    def delete(self, user_id):
+        """Forget the user's session."""
+
+    @abstractmethod
+    def _load_versioned(self, user_id):
+        """Return (a copy of the session, or None if absent or expired; its version, or None if there is none)."""
+
+    @abstractmethod
+    def _write(self, user_id, session, expected_version):
+        """
+        Store the session and return True, or return False if it changed since it
+        was loaded at `expected_version` (None: it did not exist). _ANY skips the check.
+        """
+
+    def user_lock(self, user_id):
+        """The lock that serializes requests of this user within the process."""
+        return self._user_locks[hash(user_id) % SESSION_LOCK_STRIPES]
+
+    def _write_back(self, user_id, session, version):
+        if not self._write(user_id, session, version):
+            print(f"Session of {user_id!r} was changed by another request; keeping that version")
+
+    @contextmanager
+    def session(self, user_id):
+        """
+        Yield the user's session (a new one if absent) and save it when the block
+        exits normally, including on return. A block that raises saves nothing.
+
+        Concurrent blocks for the same user in one process run one after the
+        other, so neither loses the other's update. (Users share a fixed set of
+        locks, so blocks of two different users may occasionally wait too.)
+        Keep these blocks short; use detached_session around slow work.
+        """
+        with self.user_lock(user_id):
+            session, version = self._load_versioned(user_id)
+            if session is None:
+                session = new_session()
+            yield session
+            self._write_back(user_id, session, version)
+
+    @contextmanager
+    def detached_session(self, user_id):
+        """
+        Like session(), but the user's lock is only held while loading and
+        saving, not while the block runs, so slow work such as model calls
+        never makes other requests wait.
+
+        If another request saved the same user while the block ran, that
+        newer state is kept, the block's own update is dropped and the
+        conflict is counted in stats().
+        """
+        with self.user_lock(user_id):
+            session, version = self._load_versioned(user_id)
+        if session is None:
+            session = new_session()
+        yield session
+        with self.user_lock(user_id):
+            self._write_back(user_id, session, version)
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in an in-process LRU; an entry expires `ttl` seconds after its last save."""
+
+    def __init__(self, maxsize=SESSION_MAX_USERS, ttl=SESSION_TTL):
+        super().__init__()
+        self.sessions = LRUCache(maxsize=maxsize, ttl=ttl)    # user_id -> (version, session)
+        self._lock = threading.Lock()
+
+    def _load_versioned(self, user_id):
+        entry = self.sessions.get(user_id)
+        if entry is None:
+            return None, None
+        version, session = entry
+        return copy.deepcopy(session), version
+
+    def load(self, user_id):
+        return self._load_versioned(user_id)[0]
+
+    def _write(self, user_id, session, expected_version):
+        with self._lock:
+            entry = self.sessions.get(user_id)
+            version = entry[0] if entry is not None else None
+            if expected_version is not _ANY and version != expected_version:
+                self.conflicts += 1
+                return False
+            self.sessions.set(user_id, ((version or 0) + 1, copy.deepcopy(session)))
+            return True
+
+    def save(self, user_id, session):
+        self._write(user_id, session, _ANY)
+
+    def delete(self, user_id):
+        self.sessions.pop(user_id)
+
+    def stats(self):
+        return {"backend": "memory", "ttl": self.sessions.ttl, "conflicts": self.conflicts, **self.sessions.stats()}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions as JSON rows in a SQLite table, shared by every process using the
+    same file, so requests of one user may land on any worker. Timestamps are
+    wall-clock so all processes agree on expiry.
+
+    The per-user lock only covers one process. Across processes each row
+    carries a version, so session blocks keep another worker's newer state
+    just as detached_session does within one process.
+    """
+
+    def __init__(self, path, maxsize=SESSION_MAX_USERS, ttl=SESSION_TTL):
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.saves = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                         "user_id TEXT PRIMARY KEY, data TEXT, updated_at REAL, version INTEGER NOT NULL DEFAULT 0)")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(sessions)")]
+        if "version" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._db.commit()
+
+    def _load_versioned(self, user_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, updated_at, version FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        data, updated_at, version = row
+        return (json.loads(data) if updated_at > time.time() - self.ttl else None), version
+
+    def load(self, user_id):
+        return self._load_versioned(user_id)[0]
+
+    def _write(self, user_id, session, expected_version):
+        args = (json.dumps(session), time.time(), user_id)
+        with self._lock:
+            if expected_version is _ANY:
+                self._db.execute(
+                    "INSERT INTO sessions (data, updated_at, user_id) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, "
+                    "updated_at = excluded.updated_at, version = version + 1",
+                    args
+                )
+                written = True
+            elif expected_version is None:
+                written = self._db.execute(
+                    "INSERT OR IGNORE INTO sessions (data, updated_at, user_id) VALUES (?, ?, ?)", args
+                ).rowcount == 1
+            else:
+                written = self._db.execute(
+                    "UPDATE sessions SET data = ?, updated_at = ?, version = version + 1 "
+                    "WHERE user_id = ? AND version = ?",
+                    args + (expected_version,)
+                ).rowcount == 1
+
+            if written:
+                self.saves += 1
+                if self.saves % SESSION_PURGE_EVERY == 0:
+                    self._purge()
+            else:
+                self.conflicts += 1
+            self._db.commit()
+        return written
+
+    def save(self, user_id, session):
+        self._write(user_id, session, _ANY)
+
+    def _purge(self):
+        """Delete expired sessions and all but the `maxsize` most recently saved ones."""
+        self._db.execute("DELETE FROM sessions WHERE updated_at <= ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM sessions WHERE user_id IN "
+            "(SELECT user_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+
+    def delete(self, user_id):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "ttl": self.ttl,
+            "size": size,
+            "maxsize": self.maxsize,
+            "saves": self.saves,
+            "conflicts": self.conflicts
+        }
+
+
+def create_session_store(url=SESSION_STORE, maxsize=SESSION_MAX_USERS, ttl=SESSION_TTL):
+    """
+    Build the backend named by `url` ("memory" or "sqlite:///path"). Falls back
+    to memory, with a warning, if the SQLite file cannot be opened.
+    """
+    if url.startswith("sqlite:///"):
+        try:
+            return SQLiteSessionStore(url[len("sqlite:///"):], maxsize, ttl)
+        except sqlite3.Error as e:
+            print(f"Session database unavailable, keeping sessions in memory: {e}")
+    elif url != "memory":
+        raise ValueError(f"Unknown session store {url!r}; use 'memory' or 'sqlite:///path'")
+    return MemorySessionStore(maxsize, ttl)
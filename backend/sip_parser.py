@@ -0,0 +1,206 @@
+import re
+import threading
+
+# Devanagari (०-९) and Gujarati (૦-૯) digits mapped to ASCII
+_DIGITS = str.maketrans("०१२३४५६७८९૦૧૨૩૪૫૬૭૮૯", "01234567890123456789")
+
+# Multipliers for amount suffixes (English, Hindi, Gujarati)
+_UNITS = [
+    (r"k|thousand|हज़ार|हजार|હજાર", 1e3),
+    (r"lakhs?|lacs?|लाख|લાખ", 1e5),
+    (r"million|mn", 1e6),
+    (r"crores?|cr|करोड़|करोड|કરોડ", 1e7)
+]
+
+# Every number is taken whole (no backtracking into its digits) and a unit or currency
+# suffix only counts when it ends on a word boundary, so "5000rs" is 5000 and "10yrs" is 10
+_NUMBER = re.compile(
+    r"(?P<currency>₹|\brs\.?|\binr\b)?\s*"
+    r"(?P<value>\d+(?:,\d+)*(?:\.\d+)?)(?![\d.,]\d)"
+    r"(?:\s*(?P<unit>" + "|".join(pattern for pattern, _ in _UNITS) + r")(?!\w))?"
+    r"(?:\s*(?P<suffix>rs\b\.?|rupees?\b|inr\b|₹|/-|रुपये|रुपए|રૂપિયા))?",
+    re.IGNORECASE
+)
+_PERCENT = re.compile(r"\s*(?:%|percent\b|pc\b|प्रतिशत|ટકા)", re.IGNORECASE)
+_YEARS = re.compile(r"\s*(?:years?|yrs?)(?!\w)|\s*(?:साल|वर्ष|વર્ષ|વરસ)", re.IGNORECASE)
+_MONTHS = re.compile(r"\s*months?\b", re.IGNORECASE)
+_YEARS_OLD = re.compile(r"\s*(?:years?|yrs?)[\s-]*old\b", re.IGNORECASE)
+_AGE_BEFORE = re.compile(r"(?:\bage|\baged|\bi\s*am|\bi'm|उम्र|ઉંમર)\s*(?:is|of)?\s*$", re.IGNORECASE)
+_PER_MONTH = re.compile(
+    r"^\s*(?:/\s*m(?:onth)?\b|(?:per|a|every|each)\s+month\b|monthly\b|p\.?m\b\.?|हर\s*महीने|प्रति\s*माह|प्रति\s*महीने|દર\s*મહિને|મહિને)",
+    re.IGNORECASE
+)
+_MONTHLY_BEFORE = re.compile(r"(?:\bmonthly|\bper month|\bevery month|\bsip|हर\s*महीने|प्रति\s*माह|मासिक|દર\s*મહિને|માસિક)\s*(?:investment|amount|contribution)?\s*(?:of|is|=|:)?\s*$", re.IGNORECASE)
+_LUMP_SUM_MARKER = r"(?:lump\s*-?sum|one[\s-]*time|initial|upfront|एकमुश्त|એકસાથે)"
+_LUMP_SUM_BEFORE = re.compile(_LUMP_SUM_MARKER + r"[^\d]{0,20}$", re.IGNORECASE)
+_LUMP_SUM_AFTER = re.compile(r"^\s*(?:as\s+(?:an?\s+)?)?" + _LUMP_SUM_MARKER, re.IGNORECASE)
+_STEP_UP = re.compile(r"step[\s-]*up|increase|increment|top[\s-]*up|hike|बढ़|વધાર", re.IGNORECASE)
+_INFLATION = re.compile(r"inflation|महंगाई|મોંઘવારી", re.IGNORECASE)
+
+# Words that end one number's phrase and start the next one's, so a marker only binds to its side
+_CLAUSE_BREAK = re.compile(r"[,;\n]|\.\s|\b(?:and|with|plus|then|also)\b|और|અને", re.IGNORECASE)
+
+SIP_FIELDS = ("monthly_investment", "interest_rate", "time_period", "lump_sum", "step_up", "inflation")
+REQUIRED_FIELDS = ("monthly_investment", "interest_rate", "time_period")
+
+
+def normalize_digits(text):
+    """Replace Hindi and Gujarati digits with ASCII ones."""
+    return text.translate(_DIGITS)
+
+
+def _amount(match):
+    value = float(match.group("value").replace(",", ""))
+    unit = match.group("unit")
+    if unit:
+        for pattern, multiplier in _UNITS:
+            if re.fullmatch(pattern, unit, re.IGNORECASE):
+                return value * multiplier
+    return value
+
+
+def _clauses(text, matches):
+    """
+    For each number, the text after its predecessor and the text up to its successor,
+    cut at the nearest clause break so that a marker between two numbers binds to one.
+    """
+    for i, match in enumerate(matches):
+        before = text[matches[i - 1].end() if i else 0:match.start()]
+        after = text[match.end():matches[i + 1].start() if i + 1 < len(matches) else len(text)]
+        breaks = list(_CLAUSE_BREAK.finditer(before))
+        if breaks:
+            before = before[breaks[-1].end():]
+        first_break = _CLAUSE_BREAK.search(after)
+        if first_break:
+            after = after[:first_break.start()]
+        yield match, before, after
+
+
+def parse_sip_query(text):
+    """
+    Extract SIP parameters from free text without calling the LLM.
+
+    Understands amounts with ₹/Rs and k, thousand, lakh, crore (in English,
+    Hindi or Gujarati, with any of their digits), percentages and durations in
+    years or months. A percentage next to a step-up or inflation keyword fills
+    that field, otherwise it is the interest rate. An amount fills a field
+    only when it is marked: as monthly ("5000 per month", "SIP of 5000") or as
+    a lump sum ("2 lakh lump sum", "initial 50000"). Ages ("30 years old")
+    are recognised and skipped.
+
+    Returns:
+    - (params, resolved): params has the keys of extract_sip_parameters, with
+      None for fields that were not found (lump_sum, step_up and inflation
+      default to 0). resolved is False if any number could not be placed
+      (an unmarked amount, a bare year) or two numbers claimed the same
+      field; the parse must then not be trusted on its own.
+    """
+    text = normalize_digits(text)
+    params = dict.fromkeys(SIP_FIELDS)
+    resolved = True
+
+    def assign(field, value):
+        nonlocal resolved
+        if params[field] is None:
+            params[field] = value
+        else:
+            resolved = False
+
+    for match, before, after in _clauses(text, list(_NUMBER.finditer(text))):
+        value = float(match.group("value").replace(",", ""))
+        plain = not (match.group("unit") or match.group("currency") or match.group("suffix"))
+
+        if _PERCENT.match(after):
+            context = before + after
+            if _INFLATION.search(context):
+                assign("inflation", value)
+            elif _STEP_UP.search(context):
+                assign("step_up", value)
+            else:
+                assign("interest_rate", value)
+        elif plain and (_YEARS_OLD.match(after) or _AGE_BEFORE.search(before)):
+            continue
+        elif plain and _YEARS.match(after):
+            assign("time_period", value)
+        elif plain and _MONTHS.match(after):
+            assign("time_period", value / 12)
+        else:
+            lump_sum = bool(_LUMP_SUM_BEFORE.search(before) or _LUMP_SUM_AFTER.match(after))
+            monthly = bool(_PER_MONTH.match(after) or _MONTHLY_BEFORE.search(before))
+            if lump_sum != monthly:
+                assign("lump_sum" if lump_sum else "monthly_investment", _amount(match))
+            else:
+                # Unmarked, or marked both ways: leave it to the LLM
+                resolved = False
+
+    for field in ("lump_sum", "step_up", "inflation"):
+        if params[field] is None:
+            params[field] = 0
+    return params, resolved
+
+
+def parse_sip_parameters(text):
+    """Extract SIP parameters from free text without calling the LLM; see parse_sip_query."""
+    return parse_sip_query(text)[0]
+
+
+def parse_sip_value(text, field):
+    """
+    Parse a single reply such as "₹5k", "12%", "10 years" or "18 months" for one SIP field.
+
+    Durations in months are converted to years. Returns None unless the reply
+    holds exactly one number, and when its marker belongs to another field
+    (e.g. "12%" for the time period).
+    """
+    text = normalize_digits(text)
+    matches = list(_NUMBER.finditer(text))
+    if len(matches) != 1:
+        return None
+    match = matches[0]
+    after = text[match.end():]
+    percent = _PERCENT.match(after)
+    duration = _YEARS.match(after) or _MONTHS.match(after)
+    if field == "time_period":
+        if percent:
+            return None
+        if _MONTHS.match(after):
+            return float(match.group("value").replace(",", "")) / 12
+        return float(match.group("value").replace(",", ""))
+    if duration or (percent and field == "monthly_investment"):
+        return None
+    if field == "interest_rate":
+        return float(match.group("value").replace(",", ""))
+    return _amount(match)
+
+
+def is_complete(params):
+    """True if every field needed for a SIP calculation is present."""
+    return all(params.get(field) is not None for field in REQUIRED_FIELDS)
+
+
+class ParserStats:
+    """Thread-safe counts of how often the local parser avoided an LLM call."""
+
+    def __init__(self):
+        self.local_hits = 0
+        self.llm_calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.local_hits += 1
+            else:
+                self.llm_calls += 1
+
+    def stats(self):
+        total = self.local_hits + self.llm_calls
+        return {
+            "queries": total,
+            "local_hits": self.local_hits,
+            "llm_calls": self.llm_calls,
+            "hit_rate": self.local_hits / total if total else 0.0
+        }
+
+
+sip_parser_stats = ParserStats()
@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Default and maximum number of simulated paths per request
+DEFAULT_SIMULATION_PATHS = 10000
+MAX_SIMULATION_PATHS = int(os.environ.get("MAX_SIMULATION_PATHS", 100000))
+
+# Longest tenure simulated, in years; the work grows with every simulated month
+MAX_SIMULATION_YEARS = 100
+
+# Maturity-value percentiles reported for every simulation
+SIMULATION_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Fewest monthly returns a fund needs before its history is worth bootstrapping
+MIN_MONTHLY_RETURNS = 12
+
+
+def monthly_returns(days, navs):
+    """
+    Month-over-month returns (fractions) from a daily NAV history, oldest first.
+
+    Each month is represented by its last available NAV.
+    """
+    months = np.asarray(days).astype('datetime64[D]').astype('datetime64[M]')
+    month_ends = np.append(np.flatnonzero(months[1:] != months[:-1]), len(months) - 1)
+    month_end_navs = np.asarray(navs, dtype=np.float64)[month_ends]
+    return month_end_navs[1:] / month_end_navs[:-1] - 1
+
+
+def _simulate_paths(returns, monthly_investment, months, lump_sum, paths, seed):
+    """Maturity values of `paths` SIPs whose monthly returns are resampled from `returns`."""
+    rng = np.random.default_rng(seed)
+    growth = 1 + np.asarray(returns, dtype=np.float64)
+    values = np.full(paths, float(lump_sum))
+    # One vector step per month keeps memory at O(paths) whatever the tenure.
+    # Instalments are made at the start of each month, as in calculate_sip. The
+    # lump sum sits in the same fund, so it compounds monthly with the sampled
+    # returns (calculate_sip compounds it annually at the nominal rate).
+    for _ in range(months):
+        values += monthly_investment
+        values *= growth[rng.integers(0, len(growth), paths)]
+    return values
+
+
+def simulate_sip(returns, monthly_investment, time_period, lump_sum=0, paths=DEFAULT_SIMULATION_PATHS,
+                 seed=None, workers=1):
+    """
+    Monte Carlo SIP outcomes by bootstrapping historical monthly returns.
+
+    Parameters:
+    - returns: historical monthly returns (fractions), e.g. from monthly_returns()
+    - monthly_investment: Monthly investment amount
+    - time_period: Investment duration in years
+    - lump_sum: Initial lump sum investment (optional)
+    - paths: number of simulated paths
+    - seed: RNG seed; the same seed, paths and workers give the same result
+    - workers: split the paths over this many processes
+
+    Returns:
+    - Dictionary with the amount invested, maturity-value percentiles, mean,
+      and the probability of ending below the amount invested; raises
+      ValueError for a tenure outside one month to MAX_SIMULATION_YEARS
+
+    With every return equal to rate/12 the monthly instalments grow exactly as
+    in calculate_sip, but the lump sum does not: here it compounds monthly,
+    ending at lump_sum * (1 + rate/12) ** months, while calculate_sip uses
+    lump_sum * (1 + rate) ** years. So a simulation with a lump sum ends
+    slightly above calculate_sip at the same nominal rate.
+    """
+    months = int(float(time_period) * 12)
+    if not 1 <= months <= MAX_SIMULATION_YEARS * 12:
+        raise ValueError(f"Time period must be between one month and {MAX_SIMULATION_YEARS} years")
+    monthly_investment = float(monthly_investment)
+    lump_sum = float(lump_sum or 0)
+    paths = int(paths)
+
+    if workers > 1:
+        # Independent child seeds keep every worker's stream reproducible
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [len(chunk) for chunk in np.array_split(np.arange(paths), workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(_simulate_paths, [returns] * workers, [monthly_investment] * workers,
+                              [months] * workers, [lump_sum] * workers, sizes, seeds)
+            values = np.concatenate(list(chunks))
+    else:
+        values = _simulate_paths(returns, monthly_investment, months, lump_sum, paths, seed)
+
+    total_investment = monthly_investment * months + lump_sum
+    return {
+        "monthly_investment": monthly_investment,
+        "time_period": float(time_period),
+        "lump_sum": lump_sum,
+        "paths": paths,
+        "total_investment": round(total_investment, 2),
+        "mean_future_value": round(float(values.mean()), 2),
+        "percentiles": {
+            f"p{p}": round(float(v), 2)
+            for p, v in zip(SIMULATION_PERCENTILES, np.percentile(values, SIMULATION_PERCENTILES))
+        },
+        "probability_of_loss": float(np.mean(values < total_investment))
+    }
@@ -0,0 +1,43 @@
+from fund_matcher import FundMatcher, bounded_levenshtein
+from scheme_index import SchemeIndex
+
+SCHEMES = [
+    {"schemeCode": 100, "schemeName": "SBI Bluechip Fund - Direct Plan - Growth"},
+    {"schemeCode": 101, "schemeName": "HDFC Top 100 Fund - Regular Plan - Growth"},
+    {"schemeCode": 102, "schemeName": "Axis Midcap Fund - Direct Plan - Growth"},
+    {"schemeCode": 103, "schemeName": "ICICI Prudential Bluechip Fund - Growth"},
+    {"schemeCode": 104, "schemeName": "UTI Nifty 50 Index Fund - Direct Plan"},
+]
+
+
+def matcher():
+    return FundMatcher(SchemeIndex(SCHEMES))
+
+
+def test_bounded_levenshtein_stops_past_the_bound():
+    assert bounded_levenshtein("bluechip", "bluechip", 2) == 0
+    assert bounded_levenshtein("bluchip", "bluechip", 2) == 1
+    assert bounded_levenshtein("midcap", "bluechip", 2) == 3
+
+
+def test_exact_name_comes_first():
+    name = "HDFC Top 100 Fund - Regular Plan - Growth"
+    assert matcher().match(name)[0] == (name, 101, 0)
+
+
+def test_typo_still_finds_the_fund():
+    names = [name for name, _, _ in matcher().match("axis midcpa", k=2)]
+    assert names[0] == "Axis Midcap Fund - Direct Plan - Growth"
+
+
+def test_best_code_rejects_queries_with_no_matching_word():
+    fund_matcher = matcher()
+    assert fund_matcher.best_code("sbi bluechip") == 100
+    assert fund_matcher.best_code("zzzz qqqq") is None
+
+
+def test_short_query_falls_back_to_substring_search():
+    fund_matcher = matcher()
+    assert [code for _, code, _ in fund_matcher.match("ut")] == [104]
+    assert fund_matcher.best_code("ut") == 104
+    assert fund_matcher.match("  ") == []
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_gateway import LLMGateway, StubModel
+
+
+class CountingModel(StubModel):
+    """StubModel that records the most calls it ever had running at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return await super().generate_content_async(prompt, stream=stream, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_sync_facade_returns_the_model_response():
+    model = StubModel(reply=lambda prompt: prompt.upper())
+    gateway = LLMGateway(model)
+
+    assert gateway.generate_content("hello").text == "HELLO"
+    assert model.prompts == ["hello"]
+    assert gateway.stats()["calls"] == 1
+
+
+def test_async_callers_share_the_gateway():
+    gateway = LLMGateway(StubModel(reply=lambda prompt: prompt))
+
+    async def ask_all():
+        return await asyncio.gather(*(gateway.generate_content_async(f"q{i}") for i in range(5)))
+
+    assert [response.text for response in asyncio.run(ask_all())] == [f"q{i}" for i in range(5)]
+
+
+def test_concurrency_is_limited_across_threads():
+    model = CountingModel(latency=0.05)
+    gateway = LLMGateway(model, max_concurrency=2)
+    threads = [threading.Thread(target=gateway.generate_content, args=(f"q{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(model.prompts) == 6
+    assert model.peak == 2
+    assert gateway.stats()["in_flight"] == 0
+
+
+def test_transient_errors_are_retried():
+    model = StubModel(failures=2)
+    gateway = LLMGateway(model, max_retries=2, backoff=0.01)
+
+    assert gateway.generate_content("hello").text.startswith("[stub]")
+    assert len(model.prompts) == 3
+    assert gateway.stats()["retries"] == 2 and gateway.stats()["failures"] == 0
+
+
+def test_retries_give_up_after_max_retries():
+    gateway = LLMGateway(StubModel(failures=5), max_retries=1, backoff=0.01)
+
+    with pytest.raises(ConnectionError):
+        gateway.generate_content("hello")
+    assert gateway.stats()["failures"] == 1
+
+
+def test_deadline_cuts_off_a_slow_call():
+    gateway = LLMGateway(StubModel(latency=1.0), max_retries=0)
+
+    start = time.monotonic()
+    with pytest.raises((asyncio.TimeoutError, TimeoutError)):
+        gateway.generate_content("hello", deadline=0.1)
+    assert time.monotonic() - start < 0.5
+    assert gateway.stats()["timeouts"] == 1
+
+
+def test_stream_content_yields_the_reply_in_pieces():
+    gateway = LLMGateway(StubModel(reply=lambda prompt: "one two three"))
+
+    pieces = list(gateway.stream_content("count"))
+    assert pieces == ["one", " two", " three"]
+    assert gateway.stats()["in_flight"] == 0
+
+
+def test_stream_content_times_out():
+    gateway = LLMGateway(StubModel(latency=1.0))
+
+    with pytest.raises((asyncio.TimeoutError, TimeoutError)):
+        list(gateway.stream_content("count", deadline=0.1))
+    assert gateway.stats()["timeouts"] == 1
@@ -0,0 +1,136 @@
+import multiprocessing
+import time
+import numpy as np
+from nav_store import (DAY_DTYPE, NAV_DTYPE, NavArchive, NavStore, build_archive, iter_store_histories,
+                       parse_nav_records, to_nav_records)
+
+
+def business_days(first, count):
+    start = np.datetime64(first, 'D')
+    return np.busday_offset(start, np.arange(count), roll='forward').astype(DAY_DTYPE)
+
+
+class OfflineNavStore(NavStore):
+    """NavStore whose upstream is a fixed in-memory history instead of mfapi.in."""
+
+    def __init__(self, root, days, navs, delay=0.0, **kwargs):
+        super().__init__(root=root, **kwargs)
+        self.upstream = (days, navs)
+        self.delay = delay
+        self.fetches = 0
+
+    def _fetch(self, code, latest_only=False):
+        self.fetches += 1
+        time.sleep(self.delay)
+        days, navs = self.upstream
+        return (days[-1:], navs[-1:]) if latest_only else (days, navs)
+
+
+def test_parse_nav_records_sorts_and_drops_bad_rows():
+    records = [
+        {"date": "03-01-2024", "nav": "11.0"},
+        {"date": "01-01-2024", "nav": "10.0"},
+        {"date": "02-01-2024", "nav": "n/a"},
+        {"date": "01-01-2024", "nav": "10.0"},
+    ]
+    days, navs = parse_nav_records(records)
+    assert days.tolist() == np.array(["2024-01-01", "2024-01-03"], dtype="datetime64[D]").astype(DAY_DTYPE).tolist()
+    assert navs.tolist() == [10.0, 11.0]
+    assert to_nav_records(days, navs)[0] == {"date": "03-01-2024", "nav": "11.00000"}
+
+
+def test_first_get_downloads_and_later_gets_append_only_new_days(tmp_path):
+    days = business_days("2024-01-01", 10)
+    navs = np.linspace(10, 11, 10)
+    store = OfflineNavStore(str(tmp_path), days[:8], navs[:8], refresh_interval=0)
+    got_days, got_navs = store.get(100)
+    assert got_days.tolist() == days[:8].tolist()
+
+    store.upstream = (days, navs)
+    got_days, got_navs = store.get(100)
+    assert got_days.tolist() == days.tolist()
+    assert np.fromfile(tmp_path / "100.days", dtype=DAY_DTYPE).tolist() == days.tolist()
+    assert np.fromfile(tmp_path / "100.navs", dtype=NAV_DTYPE).tolist() == navs.tolist()
+
+
+def test_append_never_writes_old_days(tmp_path):
+    days = business_days("2024-01-01", 5)
+    store = OfflineNavStore(str(tmp_path), days, np.ones(5))
+    store._append(7, days, np.ones(5))
+    store._append(7, days, np.ones(5))
+    assert np.fromfile(tmp_path / "7.days", dtype=DAY_DTYPE).tolist() == days.tolist()
+
+
+def test_histories_are_cached_and_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr("nav_store.NAV_CACHE_SIZE", 2)
+    days = business_days("2024-01-01", 5)
+    store = OfflineNavStore(str(tmp_path), days, np.ones(5))
+    for code in (1, 2, 3):
+        store.get(code)
+    fetches = store.fetches
+    store.get(3)
+    assert store.fetches == fetches
+    assert len(store._histories) == 2
+
+
+def _fetch_in_process(root, code):
+    days = business_days("2024-01-01", 200)
+    OfflineNavStore(root, days, np.arange(200.0), delay=0.2).get(code)
+
+
+def test_processes_fetching_the_same_new_scheme_write_it_once(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fetch_in_process, args=(str(tmp_path), 42)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stored = np.fromfile(tmp_path / "42.days", dtype=DAY_DTYPE)
+    assert len(stored) == 200 and np.all(np.diff(stored) > 0)
+
+
+def test_archive_round_trip(tmp_path):
+    days = business_days("2024-01-01", 4)
+    histories = [(200, days, np.arange(4.0)), (100, days[:2], np.arange(2.0))]
+    assert build_archive(histories, str(tmp_path)) == (2, 6)
+
+    archive = NavArchive(str(tmp_path), recheck=0)
+    got_days, got_navs = archive.get(100)
+    assert got_days.tolist() == days[:2].tolist() and got_navs.tolist() == [0.0, 1.0]
+    assert archive.get(300) is None
+    assert archive.codes().tolist() == [100, 200]
+
+
+def test_archived_schemes_are_served_from_the_mapping(tmp_path):
+    days = business_days("2024-01-01", 10)
+    navs = np.linspace(10, 11, 10)
+    store_dir, archive_dir = str(tmp_path / "store"), str(tmp_path / "archive")
+    OfflineNavStore(store_dir, days[:8], navs[:8]).get(100)
+    build_archive(iter_store_histories(store_dir), archive_dir)
+
+    store = OfflineNavStore(store_dir, days[:8], navs[:8], archive=NavArchive(archive_dir, recheck=0))
+    assert store.prune_archived() == 1
+    assert not (tmp_path / "store" / "100.days").exists()
+
+    got_days, got_navs = store.get(100)
+    mapped_days, mapped_navs = store.archive._arrays[1:]
+    assert np.shares_memory(got_days, mapped_days) and np.shares_memory(got_navs, mapped_navs)
+    assert got_navs.tolist() == navs[:8].tolist()
+
+
+def test_updates_of_archived_schemes_store_only_the_new_days(tmp_path):
+    days = business_days("2024-01-01", 10)
+    navs = np.linspace(10, 11, 10)
+    archive_dir = str(tmp_path / "archive")
+    build_archive([(100, days[:8], navs[:8])], archive_dir)
+    archive = NavArchive(archive_dir, recheck=0)
+
+    store = OfflineNavStore(str(tmp_path / "store"), days, navs, archive=archive, refresh_interval=0)
+    got_days, got_navs = store.get(100)
+    assert got_days.tolist() == days.tolist() and got_navs.tolist() == navs.tolist()
+    assert np.fromfile(tmp_path / "store" / "100.days", dtype=DAY_DTYPE).tolist() == days[8:].tolist()
+
+    # The next archive folds the new days in, after which the files are redundant
+    build_archive(iter_store_histories(str(tmp_path / "store"), archive), archive_dir)
+    assert NavArchive(archive_dir).get(100)[0].tolist() == days.tolist()
+    assert NavStore(str(tmp_path / "store"), archive=NavArchive(archive_dir)).prune_archived() == 1
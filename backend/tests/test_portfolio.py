@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from portfolio import nav_lookup, parse_cash_flows, value_portfolio, xirr
+
+
+def test_xirr_of_a_single_year():
+    assert xirr([0, 365], [-1000, 1100]) == pytest.approx(0.10)
+    assert xirr([0, 365], [-1000, 900]) == pytest.approx(-0.10)
+
+
+def test_xirr_merges_same_day_flows_and_ignores_order():
+    assert xirr([365, 0, 0], [1100, -600, -400]) == pytest.approx(0.10)
+
+
+def test_xirr_needs_both_signs():
+    assert xirr([0, 365], [-1000, -100]) is None
+
+
+def test_parse_cash_flows_rejects_bad_input():
+    days, amounts = parse_cash_flows([{"date": "1970-01-11", "amount": 500}])
+    assert days.tolist() == [10] and amounts.tolist() == [500.0]
+    with pytest.raises(ValueError):
+        parse_cash_flows([{"date": "someday", "amount": 500}])
+    with pytest.raises(ValueError):
+        parse_cash_flows([{"date": "2024-01-01", "amount": float("nan")}])
+
+
+def test_nav_lookup_uses_the_last_nav_on_or_before_each_day():
+    days = np.array([10, 12, 15])
+    navs = np.array([1.0, 2.0, 3.0])
+    nav_days, values = nav_lookup(days, navs, np.array([10, 11, 14, 20]))
+
+    assert nav_days.tolist() == [10, 10, 12, 15]
+    assert values.tolist() == [1.0, 1.0, 2.0, 3.0]
+    with pytest.raises(ValueError):
+        nav_lookup(days, navs, np.array([9]))
+
+
+def test_value_portfolio():
+    days = np.array([0, 100, 365])
+    navs = np.array([10.0, 12.5, 11.0])
+    result = value_portfolio(days, navs, [0, 100], [1000, -250])
+
+    assert result["units"] == 80
+    assert result["current_value"] == 880
+    assert result["gain"] == 130
+    assert result["xirr"] == pytest.approx(xirr([0, 100, 365], [-1000, 250, 880]) * 100, abs=1e-4)
+
+    with pytest.raises(ValueError):
+        value_portfolio(days, navs, [0, 100], [1000, -1500])
@@ -0,0 +1,56 @@
+import pytest
+
+import response_chunks
+from response_chunks import chunk_response, synthetic_answer
+
+
+def test_short_answer_is_one_chunk():
+    assert chunk_response("  A short answer.\n") == ["A short answer."]
+    assert chunk_response("") == []
+
+
+def test_chunks_respect_the_size_and_keep_every_word():
+    text = synthetic_answer(5000)
+    chunks = chunk_response(text, chunk_size=120)
+
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_cut_prefers_a_line_break_then_a_sentence_end():
+    paragraph = "First paragraph words here.\n\nSecond paragraph goes on and on"
+    assert chunk_response(paragraph, chunk_size=40) == ["First paragraph words here.", "Second paragraph goes on and on"]
+
+    sentences = "One sentence is here. Another one follows it closely"
+    assert chunk_response(sentences, chunk_size=40) == ["One sentence is here.", "Another one follows it closely"]
+
+    # A cut point that would leave the chunk less than half full is ignored
+    assert chunk_response("Hi. " + "word " * 10, chunk_size=20) == ["Hi. word word word", "word word word word", "word word word"]
+
+
+def test_word_longer_than_a_chunk_stands_alone():
+    assert chunk_response("a " + "x" * 30 + " b", chunk_size=10) == ["a", "x" * 30, "b"]
+
+
+def test_streamed_pieces_and_bytes_give_the_same_chunks(monkeypatch):
+    monkeypatch.setattr(response_chunks, "BLOCK_SIZE", 7)
+    text = "नमस्ते, यह एक लंबा उत्तर है। " * 20
+    expected = chunk_response(text, chunk_size=50)
+
+    pieces = [text[i:i + 13] for i in range(0, len(text), 13)]
+    assert chunk_response(iter(pieces), chunk_size=50) == expected
+    assert chunk_response(text.encode("utf-8"), chunk_size=50) == expected
+
+
+def test_encoded_size_limit():
+    text = "यह एक लंबा उत्तर है। " * 20
+    chunks = chunk_response(text, chunk_size=100, encoding="utf-8")
+    assert all(len(chunk.encode("utf-8")) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+@pytest.mark.parametrize("size", [1000, 20000])
+def test_plain_text_is_chunked_like_the_previous_chunker(size):
+    # Without line breaks or sentence ends both chunkers cut before the word that does not fit
+    text = " ".join(synthetic_answer(size).replace(".", "").split())
+    assert chunk_response(text) == response_chunks._chunk_response_quadratic(text)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from risk_metrics import beta, compute_risk_metrics, drawdowns, rolling_risk_metrics
+
+
+def random_history(length=400, seed=0):
+    rng = np.random.default_rng(seed)
+    days = 18000 + np.cumsum(rng.integers(1, 4, length))
+    navs = 10 * np.cumprod(1 + rng.normal(0.0004, 0.01, length))
+    return days, navs
+
+
+def test_drawdowns_measure_the_fall_and_time_since_the_peak():
+    days = np.array([0, 1, 2, 5, 6])
+    navs = np.array([10.0, 12.0, 9.0, 11.0, 13.0])
+    drawdown, underwater = drawdowns(days, navs)
+
+    assert drawdown == pytest.approx([0, 0, -0.25, -1 / 12, 0])
+    assert underwater.tolist() == [0, 0, 1, 4, 0]
+
+
+def test_max_drawdown_and_its_dates():
+    days = np.array([0, 1, 2, 5, 6])
+    metrics = compute_risk_metrics(days, np.array([10.0, 12.0, 9.0, 11.0, 13.0]))
+
+    assert metrics["max_drawdown"] == pytest.approx(-25.0)
+    assert metrics["max_drawdown_peak_date"] == "02-01-1970"
+    assert metrics["max_drawdown_trough_date"] == "03-01-1970"
+    assert metrics["max_drawdown_duration_days"] == 4
+    assert metrics["current_drawdown"] == 0
+
+
+def test_short_history_gives_no_metrics():
+    metrics = compute_risk_metrics([0, 1], [10.0, 11.0])
+    assert set(metrics.values()) == {None}
+
+
+def test_beta_of_a_leveraged_copy_is_its_leverage():
+    days, navs = random_history()
+    returns = np.diff(navs) / navs[:-1]
+    leveraged = 10 * np.concatenate([[1.0], np.cumprod(1 + 2 * returns)])
+
+    assert beta(days, leveraged, days, navs) == pytest.approx(2.0)
+    assert beta(days[:2], navs[:2], days, navs) is None
+
+
+def test_rolling_metrics_match_the_full_metrics_of_each_window():
+    days, navs = random_history()
+    window = 100
+    rolling = rolling_risk_metrics(days, navs, window=window)
+
+    assert len(rolling["days"]) == len(navs) - window
+    for end in (window, 250, len(navs) - 1):
+        full = compute_risk_metrics(days[end - window:end + 1], navs[end - window:end + 1])
+        i = end - window
+        assert rolling["days"][i] == days[end]
+        assert rolling["volatility"][i] == pytest.approx(full["annualized_volatility"])
+        assert rolling["sharpe_ratio"][i] == pytest.approx(full["sharpe_ratio"])
+        assert rolling["sortino_ratio"][i] == pytest.approx(full["sortino_ratio"])
+        assert rolling["max_drawdown"][i] == pytest.approx(full["max_drawdown"])
+        assert rolling["max_drawdown_duration_days"][i] == full["max_drawdown_duration_days"]
+
+
+def test_rolling_metrics_need_a_full_window():
+    days, navs = random_history(length=50)
+    assert rolling_risk_metrics(days, navs, window=60) == {}
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from rolling_returns import ROLLING_PERIODS, RollingReturns, rolling_cagr, trailing_returns
+
+
+def history(years=4, rate=0.10):
+    """Daily NAVs growing at exactly `rate` a year."""
+    days = np.arange(18000, 18000 + int(years * 365.25) + 1)
+    navs = 10 * (1 + rate) ** ((days - days[0]) / 365.25)
+    return days, navs
+
+
+def test_rolling_cagr_of_steady_growth_is_the_growth_rate():
+    days, navs = history()
+    ends, cagr = rolling_cagr(days, navs, 1)
+
+    # The first NAV with a full year of history before it
+    assert ends[0] == days[0] + 365
+    assert cagr == pytest.approx(np.full(len(cagr), 10.0))
+
+
+def test_windows_longer_than_the_history_are_empty():
+    days, navs = history(years=2)
+    ends, cagr = rolling_cagr(days, navs, 3)
+    assert len(ends) == len(cagr) == 0
+
+
+def test_trailing_returns():
+    days, navs = history(years=2)
+    returns = trailing_returns(days, navs)
+
+    assert returns["1M"] == pytest.approx((1.1 ** (30 / 365.25) - 1) * 100)
+    assert returns["1Y"] == pytest.approx(10.0)
+    assert returns["3Y"] is None and returns["5Y"] is None
+
+
+def test_incremental_update_matches_a_full_rebuild():
+    days, navs = history(years=6)
+    rng = np.random.default_rng(0)
+    navs = navs * np.cumprod(1 + rng.normal(0, 0.01, len(navs)))
+
+    incremental = RollingReturns().update(days[:1500], navs[:1500]).update(days, navs)
+    full = RollingReturns().update(days, navs)
+
+    for name in ROLLING_PERIODS:
+        np.testing.assert_array_equal(incremental.series[name][0], full.series[name][0])
+        np.testing.assert_allclose(incremental.series[name][1], full.series[name][1])
+        assert incremental.stats[name] == pytest.approx(full.stats[name])
+
+
+def test_shorter_history_starts_over():
+    days, navs = history(years=3)
+    rolling = RollingReturns().update(days, navs)
+
+    shorter = rolling.update(days[:500], navs[:500])
+    assert len(shorter.series["1Y"][0]) == 500 - 365
+    assert shorter.stats["1Y"]["count"] == 500 - 365
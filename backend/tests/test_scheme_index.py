@@ -0,0 +1,66 @@
+from scheme_index import SchemeIndex, ngrams
+
+SCHEMES = [
+    {"schemeCode": 100, "schemeName": "SBI Bluechip Fund"},
+    {"schemeCode": 101, "schemeName": "Axis Midcap Fund"},
+    {"schemeCode": 102, "schemeName": "Axis Bluechip Fund"},
+    {"schemeCode": 103, "schemeName": "HDFC Flexi Cap Fund"},
+    {"schemeCode": 104, "schemeName": "axis bluechip fund"},
+    {"schemeCode": 105},
+]
+
+
+def index():
+    return SchemeIndex(SCHEMES)
+
+
+def test_ngrams():
+    assert ngrams("fund") == {"fun", "und"}
+    assert ngrams("ab") == set()
+
+
+def test_schemes_without_a_name_are_skipped():
+    assert len(index()) == 5
+
+
+def test_lookup_prefers_exact_case_then_folds():
+    scheme_index = index()
+    assert scheme_index.code_for("Axis Bluechip Fund") == 102
+    assert scheme_index.code_for("axis bluechip fund") == 104
+    # The last duplicate wins, whether the name matches exactly or only when folded
+    assert scheme_index.code_for("AXIS BLUECHIP FUND") == 104
+    relisted = SchemeIndex(SCHEMES + [{"schemeCode": 200, "schemeName": "SBI Bluechip Fund"}])
+    assert relisted.code_for("SBI Bluechip Fund") == relisted.code_for("sbi bluechip fund") == 200
+    assert scheme_index.code_for("Axis Small Cap Fund") is None
+
+
+def test_prefix_search_is_alphabetical_and_case_insensitive():
+    assert index().prefix_search("AXIS") == [
+        "Axis Bluechip Fund", "axis bluechip fund", "Axis Midcap Fund"
+    ]
+    assert index().prefix_search("axis", limit=1) == ["Axis Bluechip Fund"]
+
+
+def test_substring_search_keeps_catalog_order():
+    scheme_index = index()
+    assert scheme_index.substring_search("bluechip") == ["SBI Bluechip Fund", "Axis Bluechip Fund", "axis bluechip fund"]
+    # Queries shorter than a trigram are scanned directly
+    assert scheme_index.substring_search("ex") == ["HDFC Flexi Cap Fund"]
+    assert scheme_index.substring_search("debt") == []
+    assert scheme_index.first_match_code("midcap") == 101
+
+
+def test_pages_cover_every_match_once():
+    scheme_index = index()
+    names, cursor = scheme_index.page("fund", limit=2, match="contains")
+    pages = [names]
+    while cursor is not None:
+        names, cursor = scheme_index.page("fund", limit=2, cursor=cursor, match="contains")
+        pages.append(names)
+
+    assert pages == [
+        ["SBI Bluechip Fund", "Axis Midcap Fund"],
+        ["Axis Bluechip Fund", "HDFC Flexi Cap Fund"],
+        ["axis bluechip fund"],
+    ]
+    assert scheme_index.page("axis", limit=3) == (["Axis Bluechip Fund", "axis bluechip fund", "Axis Midcap Fund"], None)
@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+import pytest
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore, create_session_store, new_session
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore(maxsize=100, ttl=60)
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), maxsize=100, ttl=60)
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_session_is_saved_on_exit_and_loaded_as_a_copy(store):
+    with store.session("alice") as session:
+        assert session == new_session()
+        session["calculation_mode"] = True
+
+    loaded = store.load("alice")
+    assert loaded["calculation_mode"] is True
+    loaded["calculation_mode"] = False
+    assert store.load("alice")["calculation_mode"] is True
+    assert store.load("bob") is None
+
+
+def test_block_that_raises_saves_nothing(store):
+    with pytest.raises(RuntimeError):
+        with store.session("alice") as session:
+            session["recommendation_mode"] = True
+            raise RuntimeError
+    assert store.load("alice") is None
+
+
+def test_concurrent_requests_of_one_user_keep_every_update(store):
+    def request():
+        with store.session("alice") as session:
+            count = session["recommendation_state"].get("count", 0)
+            time.sleep(0.001)
+            session["recommendation_state"]["count"] = count + 1
+
+    threads = [threading.Thread(target=request) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.load("alice")["recommendation_state"]["count"] == 20
+
+
+def test_detached_session_does_not_hold_the_lock(store):
+    with store.detached_session("alice") as session:
+        session["calculation_mode"] = True
+        # Another thread can take the same lock while the block runs
+        def take_lock():
+            with store.user_lock("alice"):
+                pass
+        other = threading.Thread(target=take_lock)
+        other.start()
+        other.join(timeout=1)
+        assert not other.is_alive()
+    assert store.load("alice")["calculation_mode"] is True
+
+
+def test_detached_session_keeps_a_newer_concurrent_update(store):
+    store.save("alice", new_session())
+    with store.detached_session("alice") as session:
+        session["calculation_mode"] = True
+        with store.session("alice") as other:
+            other["recommendation_mode"] = True
+
+    loaded = store.load("alice")
+    assert loaded["recommendation_mode"] is True and loaded["calculation_mode"] is False
+    assert store.stats()["conflicts"] == 1
+
+
+def test_delete(store):
+    store.save("alice", new_session())
+    store.delete("alice")
+    assert store.load("alice") is None
+
+
+def test_memory_store_is_bounded_and_expires():
+    store = MemorySessionStore(maxsize=2, ttl=0.05)
+    for user in ("a", "b", "c"):
+        store.save(user, new_session())
+    assert store.load("a") is None
+    assert store.load("c") is not None
+    time.sleep(0.1)
+    assert store.load("c") is None
+
+
+def test_sqlite_store_purges_expired_and_surplus_rows(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), maxsize=5, ttl=60)
+    for i in range(100):
+        store.save(str(i), new_session())
+    assert store.stats()["size"] == 5
+    assert store.load("99") is not None and store.load("0") is None
+
+
+def test_sqlite_store_keeps_the_newer_write_of_another_worker(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    first.save("alice", new_session())
+
+    with first.session("alice") as session:
+        session["calculation_mode"] = True
+        # Another worker saves the same user while this request is running
+        with second.session("alice") as other:
+            other["recommendation_mode"] = True
+
+    loaded = first.load("alice")
+    assert loaded["recommendation_mode"] is True and loaded["calculation_mode"] is False
+    assert first.stats()["conflicts"] == 1
+
+
+def test_sqlite_store_adds_the_version_column_to_an_old_table(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE sessions (user_id TEXT PRIMARY KEY, data TEXT, updated_at REAL)")
+    db.commit()
+    db.close()
+
+    store = SQLiteSessionStore(path)
+    with store.session("alice") as session:
+        session["calculation_mode"] = True
+    assert store.load("alice")["calculation_mode"] is True
+
+
+def test_create_session_store(tmp_path):
+    assert isinstance(create_session_store("memory"), MemorySessionStore)
+    assert isinstance(create_session_store(f"sqlite:///{tmp_path / 's.sqlite3'}"), SQLiteSessionStore)
+    with pytest.raises(ValueError):
+        create_session_store("redis://localhost")
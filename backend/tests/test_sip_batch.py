@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from calculations import calculate_sip, calculate_sip_batch
+
+ROWS = [
+    (5000, 12, 10, 0),
+    (2500, 8.5, 7.5, 100000),
+    (100000, 15.25, 30, 25000),
+    (999, 0.1, 1, 0),
+    (1500, 0, 20, 50000),
+]
+
+
+def test_batch_matches_calculate_sip_to_the_paisa():
+    batch = calculate_sip_batch(*np.array(ROWS, dtype=float).T)
+    for i, row in enumerate(ROWS):
+        expected = calculate_sip(*row)
+        for field in ("total_investment", "total_returns", "total_future_value"):
+            assert batch[field][i] == expected[field]
+
+
+def test_scalars_are_broadcast():
+    batch = calculate_sip_batch([1000, 2000], 12, 10)
+    assert batch["total_future_value"].tolist() == [
+        calculate_sip(1000, 12, 10)["total_future_value"], calculate_sip(2000, 12, 10)["total_future_value"]
+    ]
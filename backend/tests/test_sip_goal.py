@@ -0,0 +1,55 @@
+import pytest
+from calculations import calculate_sip, solve_sip_goal
+
+
+@pytest.mark.parametrize("lump_sum", [0, 100000])
+def test_solved_monthly_investment_reaches_the_target(lump_sum):
+    result = solve_sip_goal(1_000_000, interest_rate=12, time_period=10, lump_sum=lump_sum)
+    assert result["solved_for"] == "monthly_investment"
+    assert result["total_future_value"] >= 1_000_000
+    # One paisa less would fall short
+    short = calculate_sip(result["monthly_investment"] - 0.01, 12, 10, lump_sum)
+    assert short["total_future_value"] < 1_000_000
+
+
+def test_solved_tenure_is_the_first_month_that_reaches_the_target():
+    result = solve_sip_goal(1_000_000, monthly_investment=5000, interest_rate=12)
+    months = round(result["time_period"] * 12)
+    assert result["total_future_value"] >= 1_000_000
+    assert calculate_sip(5000, 12, (months - 1) / 12)["total_future_value"] < 1_000_000
+
+
+def test_solved_rate_reproduces_the_target():
+    expected = calculate_sip(5000, 11.5, 15)["total_future_value"]
+    result = solve_sip_goal(expected, monthly_investment=5000, time_period=15)
+    assert result["interest_rate"] == pytest.approx(11.5, abs=1e-4)
+
+
+def test_fractional_tenure_with_a_lump_sum_hits_the_target():
+    rate = solve_sip_goal(1_000_000, monthly_investment=3000, time_period=10.3, lump_sum=100000)
+    assert rate["total_future_value"] == pytest.approx(1_000_000, abs=0.01)
+
+    amount = solve_sip_goal(1_000_000, interest_rate=12, time_period=10.3, lump_sum=100000)
+    assert amount["total_future_value"] >= 1_000_000
+    assert calculate_sip(amount["monthly_investment"] - 0.01, 12, 10.3, 100000)["total_future_value"] < 1_000_000
+
+
+def test_zero_rate_goals_are_plain_sums():
+    amount = solve_sip_goal(1_200_000, interest_rate=0, time_period=10)
+    assert amount["monthly_investment"] == 10000
+    assert amount["total_future_value"] == 1_200_000
+
+    tenure = solve_sip_goal(1_200_000, monthly_investment=10000, interest_rate=0)
+    assert tenure["time_period"] == 10
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"target_amount": 1_000_000, "interest_rate": 12},
+    {"target_amount": 1_000_000, "monthly_investment": 5000, "interest_rate": 12, "time_period": 10},
+    {"target_amount": None, "interest_rate": 12, "time_period": 10},
+    {"target_amount": -5, "interest_rate": 12, "time_period": 10},
+    {"target_amount": 1e12, "monthly_investment": 100, "interest_rate": 1},
+    {"target_amount": 1000, "monthly_investment": 5000, "time_period": 10},
+])
+def test_invalid_goals_return_an_error(kwargs):
+    assert "error" in solve_sip_goal(**kwargs)
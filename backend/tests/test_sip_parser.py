@@ -0,0 +1,66 @@
+import pytest
+from sip_parser import is_complete, normalize_digits, parse_sip_parameters, parse_sip_query, parse_sip_value
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5000rs per month at 12% for 10 years", {"monthly_investment": 5000, "interest_rate": 12, "time_period": 10}),
+    ("SIP of ₹5k at 12% for 10 years", {"monthly_investment": 5000, "interest_rate": 12, "time_period": 10}),
+    ("₹10,000 per month, 12.5% return, 18 months", {"monthly_investment": 10000, "interest_rate": 12.5, "time_period": 1.5}),
+    ("5 lakh per month 12% 10yrs", {"monthly_investment": 500000, "interest_rate": 12, "time_period": 10}),
+    ("2 lakh lump sum and 5000 per month, 12% for 10 years",
+     {"monthly_investment": 5000, "lump_sum": 200000, "interest_rate": 12, "time_period": 10}),
+    ("initial 50000 and 5000 monthly at 12% for 10 yrs",
+     {"monthly_investment": 5000, "lump_sum": 50000, "interest_rate": 12, "time_period": 10}),
+    ("monthly 5000 at 12% for 15 years with 10% annual step-up and 6% inflation",
+     {"monthly_investment": 5000, "interest_rate": 12, "time_period": 15, "step_up": 10, "inflation": 6}),
+    ("inflation at 6%, sip of 3000 at 10% for 20 years",
+     {"monthly_investment": 3000, "interest_rate": 10, "time_period": 20, "inflation": 6}),
+    ("मैं हर महीने ५००० रुपये 12% पर 10 साल", {"monthly_investment": 5000, "interest_rate": 12, "time_period": 10}),
+])
+def test_marked_queries_parse_in_full(text, expected):
+    params, resolved = parse_sip_query(text)
+    assert resolved and is_complete(params)
+    for field, value in expected.items():
+        assert params[field] == pytest.approx(value)
+
+
+@pytest.mark.parametrize("text", [
+    "in 2030 I want 12% for 10 years with 5000",
+    "I am 30 years old and want 1 crore, 12%",
+    "invest 5000 at 12% for 10 years",
+    "12% or 15% for 10 years, 5000 per month",
+])
+def test_unmarked_or_conflicting_numbers_are_not_trusted(text):
+    params, resolved = parse_sip_query(text)
+    assert not (resolved and is_complete(params))
+
+
+def test_age_is_not_a_duration():
+    params = parse_sip_parameters("I am 30 years old, SIP of 5000 at 12%")
+    assert params["time_period"] is None
+
+
+def test_defaults_for_optional_fields():
+    params = parse_sip_parameters("12%")
+    assert params["lump_sum"] == params["step_up"] == params["inflation"] == 0
+    assert params["monthly_investment"] is None
+
+
+@pytest.mark.parametrize("text, field, expected", [
+    ("10yrs", "time_period", 10),
+    ("18 months", "time_period", 1.5),
+    ("5000rs", "monthly_investment", 5000),
+    ("₹5k", "monthly_investment", 5000),
+    ("1,00,000", "monthly_investment", 100000),
+    ("12 %", "interest_rate", 12),
+    ("12%", "time_period", None),
+    ("10 years", "monthly_investment", None),
+    ("5000 or 6000", "monthly_investment", None),
+])
+def test_parse_sip_value(text, field, expected):
+    value = parse_sip_value(text, field)
+    assert value == (pytest.approx(expected) if expected is not None else None)
+
+
+def test_normalize_digits():
+    assert normalize_digits("५००० ૧૨") == "5000 12"
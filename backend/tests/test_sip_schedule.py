@@ -0,0 +1,52 @@
+import pytest
+from calculations import calculate_sip, sip_schedule
+
+
+@pytest.mark.parametrize("lump_sum", [0, 50000])
+def test_plain_schedule_matches_calculate_sip(lump_sum):
+    schedule = sip_schedule(5000, 12, 10, lump_sum)
+    expected = calculate_sip(5000, 12, 10, lump_sum)
+    for field in ("total_investment", "total_future_value", "total_returns"):
+        assert schedule[field] == pytest.approx(expected[field], abs=0.05)
+
+
+def test_step_up_raises_the_instalment_every_year():
+    result = sip_schedule(1000, 12, 3, step_up=10)
+    assert result["final_monthly_investment"] == pytest.approx(1210)
+    assert result["total_investment"] == pytest.approx(12 * (1000 + 1100 + 1210))
+
+
+def test_inflation_deflates_the_final_value():
+    result = sip_schedule(5000, 12, 10, inflation=6)
+    assert result["real_future_value"] == pytest.approx(result["total_future_value"] / 1.06 ** 10, rel=1e-6)
+
+
+def test_pauses_and_withdrawals():
+    result = sip_schedule(1000, 0, 1, pauses=[[3, 4]], withdrawals=[[12, 500]])
+    assert result["paused_months"] == 2
+    assert result["total_investment"] == pytest.approx(10000)
+    assert result["total_withdrawn"] == pytest.approx(500)
+    assert result["total_future_value"] == pytest.approx(9500)
+
+
+def test_schedule_points_end_on_the_last_month():
+    result = sip_schedule(5000, 12, 10, schedule_points=12)
+    months = result["schedule"]["month"]
+    assert len(months) <= 12 and months[-1] == 120
+    assert result["schedule"]["value"][-1] == pytest.approx(result["total_future_value"])
+
+
+def test_errors():
+    assert "error" in sip_schedule(None, 12, 10)
+    assert "error" in sip_schedule(1000, 0, 1, withdrawals=[[2, 1e9]])
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"time_period": 100.5},
+    {"time_period": 1e6},
+    {"time_period": 10, "interest_rate": 1e6},
+    {"time_period": 10, "monthly_investment": float("nan")},
+])
+def test_oversized_or_non_finite_projections_return_an_error(kwargs):
+    args = {"monthly_investment": 5000, "interest_rate": 12, **kwargs}
+    assert "error" in sip_schedule(**args)
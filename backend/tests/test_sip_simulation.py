@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from calculations import calculate_sip
+from sip_simulation import monthly_returns, simulate_sip
+
+
+def test_monthly_returns_use_month_end_navs():
+    days = np.array(["2024-01-02", "2024-01-31", "2024-02-15", "2024-02-29", "2024-03-28"], dtype="datetime64[D]")
+    navs = [10.0, 11.0, 11.5, 12.1, 13.31]
+
+    assert monthly_returns(days, navs) == pytest.approx([0.1, 0.1])
+
+
+def test_constant_return_matches_calculate_sip_without_lump_sum():
+    result = simulate_sip([0.12 / 12], 5000, 10, paths=10, seed=0)
+    expected = calculate_sip(5000, 12, 10)
+
+    assert result["mean_future_value"] == pytest.approx(expected["total_future_value"], abs=0.05)
+    assert result["probability_of_loss"] == 0.0
+
+
+def test_constant_return_compounds_lump_sum_monthly():
+    rate, years, lump_sum = 0.12, 10, 100000
+    result = simulate_sip([rate / 12], 5000, years, lump_sum=lump_sum, paths=10, seed=0)
+    instalments = calculate_sip(5000, rate * 100, years)["total_future_value"]
+
+    assert result["mean_future_value"] == pytest.approx(instalments + lump_sum * (1 + rate / 12) ** (years * 12), abs=0.05)
+    # calculate_sip compounds the lump sum annually, so it ends lower
+    assert result["mean_future_value"] > calculate_sip(5000, rate * 100, years, lump_sum)["total_future_value"]
+
+
+def test_seed_makes_runs_reproducible():
+    returns = np.random.default_rng(1).normal(0.01, 0.05, 120)
+
+    assert simulate_sip(returns, 1000, 5, seed=7) == simulate_sip(returns, 1000, 5, seed=7)
+    assert simulate_sip(returns, 1000, 5, seed=7)["total_investment"] == 60000
+
+
+@pytest.mark.parametrize("time_period", [0, 100.5, 1e6])
+def test_tenure_outside_the_limits_is_rejected(time_period):
+    with pytest.raises(ValueError):
+        simulate_sip([0.01], 1000, time_period, paths=10)
@@ -0,0 +1,26 @@
+from translation_batch import RoundTripStats, pack_segments, split_segments
+
+
+def test_split_undoes_pack():
+    texts = ["First line", "Second\nsegment", ""]
+    assert split_segments(pack_segments(texts), 3) == texts
+
+
+def test_split_tolerates_a_preamble_and_spaced_markers():
+    reply = "Here are the translations:\n<<< 0 >>>\nपहला\n<<<1>>>\nदूसरा\n"
+    assert split_segments(reply, 2) == ["पहला", "दूसरा"]
+
+
+def test_split_rejects_missing_duplicate_or_extra_markers():
+    assert split_segments("<<<0>>>\na", 2) is None
+    assert split_segments("<<<0>>>\na\n<<<0>>>\nb", 2) is None
+    assert split_segments("<<<0>>>\na\n<<<1>>>\nb\n<<<2>>>\nc", 2) is None
+
+
+def test_round_trip_stats():
+    stats = RoundTripStats()
+    stats.record(5, 1)
+    stats.record(3, 3)
+    assert stats.stats() == {
+        "requests": 2, "segments": 8, "model_calls": 4, "round_trips_saved": 4, "saved_per_request": 2.0
+    }
@@ -0,0 +1,87 @@
+import sqlite3
+
+import translation_cache as translation_cache_module
+from translation_cache import TranslationCache
+
+
+def fake_translate(text, source_lang, target_lang):
+    return f"{target_lang}:{text}"
+
+
+def disk_rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+def test_translate_many_makes_one_batch_call_for_missing_texts(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("hello", "en", "hi", "namaste")
+    batches = []
+
+    def translate_batch(texts, source_lang, target_lang):
+        batches.append(texts)
+        return [fake_translate(text, source_lang, target_lang) for text in texts]
+
+    assert cache.translate_many(["hello", "bye", "bye"], "en", "hi", translate_batch) == ["namaste", "hi:bye", "hi:bye"]
+    assert batches == [["bye"]]
+
+
+def test_translations_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    TranslationCache(path).translate("hello", "en", "hi", fake_translate)
+
+    cache = TranslationCache(path)
+    assert cache.get("hello", "en", "hi") == "hi:hello"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_user_text_expires_but_pinned_text_does_not(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path, ttl=60)
+    cache.set("user question", "hi", "en", "question")
+    cache.set("static prompt", "en", "hi", "prompt", pinned=True)
+
+    # Another process opening the database an hour later
+    later = TranslationCache(path, ttl=60)
+    with sqlite3.connect(path) as db:
+        db.execute("UPDATE translations SET created_at = created_at - 3600")
+
+    assert later.get("user question", "hi", "en") is None
+    assert later.get("static prompt", "en", "hi") == "prompt"
+
+
+def test_disk_tier_is_purged_to_max_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_cache_module, "TRANSLATION_CACHE_PURGE_EVERY", 10)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path, max_rows=5)
+    cache.precompute(["static"], [("en", "hi")], fake_translate)
+    for i in range(19):
+        cache.set(f"text {i}", "en", "hi", f"translation {i}")
+
+    # The 20th write purged all but the 5 newest unpinned rows, keeping the pinned one
+    assert disk_rows(path) == 6
+    assert cache.get("static", "en", "hi") == "hi:static"
+    assert TranslationCache(path).get("text 18", "en", "hi") == "translation 18"
+    assert TranslationCache(path).get("text 0", "en", "hi") is None
+
+
+def test_old_table_is_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE translations (key TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT, translation TEXT)")
+
+    cache = TranslationCache(path)
+    cache.set("hello", "en", "hi", "namaste")
+    assert TranslationCache(path).get("hello", "en", "hi") == "namaste"
+
+
+def test_precompute_pins_texts_that_were_already_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_cache_module, "TRANSLATION_CACHE_PURGE_EVERY", 1)
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path, max_rows=2)
+    cache.set("static", "en", "hi", "cached earlier")
+
+    assert cache.precompute(["static"], [("en", "hi")], fake_translate) == 0
+    for i in range(5):
+        cache.set(f"text {i}", "en", "hi", f"translation {i}")
+    assert TranslationCache(path).get("static", "en", "hi") == "cached earlier"
@@ -0,0 +1,65 @@
+import re
+import threading
+
+# Each segment is introduced by its own numbered marker line, e.g. <<<0>>>
+_MARKER = re.compile(r"<<<\s*(\d+)\s*>>>")
+
+
+def pack_segments(texts):
+    """Join texts into one string, each preceded by a numbered <<<i>>> marker line."""
+    return "\n".join(f"<<<{i}>>>\n{text}" for i, text in enumerate(texts))
+
+
+def split_segments(reply, count):
+    """
+    Split a model reply produced from pack_segments() back into `count` segments.
+
+    Text before the first marker (e.g. a preamble) is ignored and markers may
+    carry stray spaces. Returns None unless every marker from 0 to count - 1
+    appears exactly once, so a mangled reply is never misaligned.
+    """
+    parts = _MARKER.split(reply)
+    segments = {}
+    for index, text in zip(parts[1::2], parts[2::2]):
+        index = int(index)
+        if index in segments or index >= count:
+            return None
+        segments[index] = text.strip()
+    if len(segments) != count:
+        return None
+    return [segments[i] for i in range(count)]
+
+
+class RoundTripStats:
+    """
+    Thread-safe totals of translated segments versus model calls actually made.
+
+    Without batching and caching every segment would cost one round trip, so
+    segments - model_calls is the number of round trips saved.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.segments = 0
+        self.model_calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, segments, model_calls):
+        """Add one request's counts."""
+        with self._lock:
+            self.requests += 1
+            self.segments += segments
+            self.model_calls += model_calls
+
+    def stats(self):
+        saved = self.segments - self.model_calls
+        return {
+            "requests": self.requests,
+            "segments": self.segments,
+            "model_calls": self.model_calls,
+            "round_trips_saved": saved,
+            "saved_per_request": saved / self.requests if self.requests else 0.0
+        }
+
+
+translation_round_trips = RoundTripStats()
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from cache_utils import LRUCache
+
+# On-disk translation store; survives restarts and is shared by every worker process
+TRANSLATION_CACHE_DB = os.environ.get(
+    "TRANSLATION_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.sqlite3")
+)
+
+# Maximum number of translations kept in memory in front of the SQLite store
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", 2048))
+
+# Seconds a translation of user text is kept, in memory and on disk
+TRANSLATION_CACHE_TTL = float(os.environ.get("TRANSLATION_CACHE_TTL", 7 * 24 * 3600))
+
+# Most translations of user text kept on disk; the oldest are purged first
+TRANSLATION_CACHE_MAX_ROWS = int(os.environ.get("TRANSLATION_CACHE_MAX_ROWS", 50000))
+
+# Expired and surplus rows are purged once every this many writes
+TRANSLATION_CACHE_PURGE_EVERY = 100
+
+
+def translation_key(text, source_lang, target_lang):
+    """Stable cache key for one translation: a SHA-256 of (source_lang, target_lang, text)."""
+    return hashlib.sha256(f"{source_lang}\0{target_lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache: an in-memory LRU in front of a SQLite table.
+
+    Only successful translations are stored, so a failed model call is retried
+    next time. If the database cannot be opened (e.g. a read-only disk), the
+    cache keeps working in memory only.
+
+    Translations of user text may contain personal data, so they expire after
+    `ttl` seconds and at most `max_rows` of them stay on disk. Pinned rows
+    (the static UI texts from precompute) are exempt from both.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_DB, maxsize=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL,
+                 max_rows=TRANSLATION_CACHE_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk_hits = 0
+        self.translations = 0
+        self.writes = 0
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        """Open the database on first use; returns None if it is unavailable."""
+        if self._db is None:
+            try:
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS translations ("
+                           "key TEXT PRIMARY KEY, source_lang TEXT, target_lang TEXT, translation TEXT, "
+                           "created_at REAL NOT NULL DEFAULT 0, pinned INTEGER NOT NULL DEFAULT 0)")
+                # Rows from before expiry existed count as expired; precompute re-pins the static texts
+                columns = [row[1] for row in db.execute("PRAGMA table_info(translations)")]
+                if "created_at" not in columns:
+                    db.execute("ALTER TABLE translations ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+                if "pinned" not in columns:
+                    db.execute("ALTER TABLE translations ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0")
+                db.execute("CREATE INDEX IF NOT EXISTS translations_created_at ON translations (created_at)")
+                db.commit()
+                self._db = db
+            except sqlite3.Error as e:
+                print(f"Translation cache database unavailable, using memory only: {e}")
+                self._db = False
+        return self._db or None
+
+    def get(self, text, source_lang, target_lang):
+        """Return the cached translation, or None."""
+        key = translation_key(text, source_lang, target_lang)
+        translation = self.memory.get(key)
+        if translation is not None:
+            return translation
+
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT translation FROM translations WHERE key = ? AND (pinned OR created_at > ?)",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self.disk_hits += 1
+        self.memory.set(key, row[0])
+        return row[0]
+
+    def set(self, text, source_lang, target_lang, translation, pinned=False):
+        """Store a translation; a pinned one never expires and does not count towards max_rows."""
+        key = translation_key(text, source_lang, target_lang)
+        self.memory.set(key, translation)
+        with self._lock:
+            db = self._connection()
+            if db is not None:
+                db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, source_lang, target_lang, translation, time.time(), int(pinned)))
+                self.writes += 1
+                if self.writes % TRANSLATION_CACHE_PURGE_EVERY == 0:
+                    self._purge(db)
+                db.commit()
+
+    def _purge(self, db):
+        """Delete expired unpinned rows and all but the `max_rows` newest unpinned ones."""
+        db.execute("DELETE FROM translations WHERE NOT pinned AND created_at <= ?", (time.time() - self.ttl,))
+        db.execute(
+            "DELETE FROM translations WHERE key IN (SELECT key FROM translations WHERE NOT pinned "
+            "ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        )
+
+    def translate(self, text, source_lang, target_lang, translate, pinned=False):
+        """
+        Return the translation of `text`, calling translate(text, source_lang, target_lang)
+        and caching its result on a miss. Exceptions from translate() propagate.
+        """
+        translation = self.get(text, source_lang, target_lang)
+        if translation is None:
+            translation = translate(text, source_lang, target_lang)
+            self.translations += 1
+            self.set(text, source_lang, target_lang, translation, pinned)
+        return translation
+
+    def translate_many(self, texts, source_lang, target_lang, translate_batch):
+        """
+        Return translations of `texts` in order. The distinct texts that are not
+        cached are translated with a single translate_batch(texts, source_lang,
+        target_lang) call. Exceptions from translate_batch() propagate.
+        """
+        results = [self.get(text, source_lang, target_lang) for text in texts]
+        missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+        if missing:
+            translated = dict(zip(missing, translate_batch(missing, source_lang, target_lang)))
+            self.translations += len(missing)
+            for text in missing:
+                self.set(text, source_lang, target_lang, translated[text])
+            results = [translated[text] if result is None else result for text, result in zip(texts, results)]
+        return results
+
+    def precompute(self, texts, language_pairs, translate):
+        """
+        Translate every text for every (source_lang, target_lang) pair that is
+        not cached yet, and pin every one of them on disk, including those
+        already cached unpinned. Failures are logged and skipped. Returns the
+        number of new translations.
+        """
+        added = 0
+        for source_lang, target_lang in language_pairs:
+            for text in texts:
+                cached = self.get(text, source_lang, target_lang)
+                if cached is not None:
+                    self.set(text, source_lang, target_lang, cached, pinned=True)
+                    continue
+                try:
+                    self.translate(text, source_lang, target_lang, translate, pinned=True)
+                    added += 1
+                except Exception as e:
+                    print(f"Error precomputing translation to {target_lang}: {e}")
+        return added
+
+    def stats(self):
+        """Return memory-tier counters, disk hits, model translations made and the disk limits."""
+        return {
+            "memory": self.memory.stats(),
+            "ttl": self.ttl,
+            "max_rows": self.max_rows,
+            "disk_hits": self.disk_hits,
+            "translations": self.translations
+        }
+
+
+translation_cache = TranslationCache()
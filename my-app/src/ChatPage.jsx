@@ -130,6 +130,16 @@ const placeholderText = {
 // Constant for drawer width
 const drawerWidth = 250;
 
+// Stable id for this browser, so the backend can keep each user's conversation state apart
+const getUserId = () => {
+  let userId = localStorage.getItem('chatUserId');
+  if (!userId) {
+    userId = crypto.randomUUID();
+    localStorage.setItem('chatUserId', userId);
+  }
+  return userId;
+};
+
 // Styled components
 const ChatContainer = styled(Box)(({ theme }) => ({
   flexGrow: 1,
@@ -212,7 +222,7 @@ const Chatbot = () => {
   useEffect(() => {
     const lastWord = message.split(' ').pop();
     if (lastWord.startsWith('@')) {
-      fetchFunds();
+      fetchFunds(message.split('@').pop());
     } else {
       setShowSuggestions(false);
     }
@@ -222,10 +232,13 @@ const Chatbot = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
 
-  const fetchFunds = async () => {
+  // Fetch only the first page of schemes matching what was typed after @
+  const fetchFunds = async (searchTerm = '') => {
     try {
-      const res = await axios.get('http://127.0.0.1:5001/schemes');
-      setFunds(res.data);
+      const res = await axios.get('http://127.0.0.1:5001/v2/schemes', {
+        params: { q: searchTerm, limit: 10, match: 'contains' }
+      });
+      setFunds(res.data.schemes);
       setShowSuggestions(true);
     } catch (error) {
       console.error('Error fetching funds:', error);
@@ -312,10 +325,12 @@ const Chatbot = () => {
       } else {
         // If we need to fetch funds first
         try {
-          const res = await axios.get('http://127.0.0.1:5001/schemes');
-          setFunds(res.data);
+          const res = await axios.get('http://127.0.0.1:5001/v2/schemes', {
+            params: { q: fundName, limit: 10, match: 'contains' }
+          });
+          setFunds(res.data.schemes);
           
-          if (res.data.includes(fundName)) {
+          if (res.data.schemes.includes(fundName)) {
             await selectFund(fundName);
           } else {
             setChatHistory((prev) => [
@@ -334,15 +349,49 @@ const Chatbot = () => {
         }
       }
     } else {
-      // Regular message processing (non-fund related)
+      // Regular message processing (non-fund related), streamed as Server-Sent Events
       try {
-        const res = await axios.post('http://127.0.0.1:5001/chat', { 
-          query: message, 
-          language: language // Send the selected language to the backend
+        const res = await fetch('http://127.0.0.1:5001/chat/stream', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            user_id: getUserId(),
+            query: message,
+            language: language // Send the selected language to the backend
+          })
         });
-        
-        // Add response to chat history
-        setChatHistory((prev) => [...prev, { message: res.data.response, isUser: false }]);
+        if (!res.ok || !res.body) {
+          throw new Error(`Chat stream failed with status ${res.status}`);
+        }
+
+        // Add an empty response to chat history and grow it as tokens arrive
+        setChatHistory((prev) => [...prev, { message: '', isUser: false }]);
+        const appendToResponse = (text) => setChatHistory((prev) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, message: last.message + text }];
+        });
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          // Events are separated by a blank line; keep any incomplete one for the next read
+          const events = buffer.split('\n\n');
+          buffer = events.pop();
+          for (const event of events) {
+            const dataLine = event.split('\n').find((line) => line.startsWith('data: '));
+            if (!dataLine) continue;
+            const payload = JSON.parse(dataLine.slice(6));
+            if (payload.token || payload.error) {
+              appendToResponse(payload.token || payload.error);
+              setLoading(false);
+            }
+          }
+        }
         setLoading(false);
       } catch (error) {
         console.error('Error:', error);
@@ -374,13 +423,10 @@ const Chatbot = () => {
     setMessage(e.target.value);
     
     // Check if the last word starts with @ to show fund suggestions
+    // (matching funds are fetched by the effect watching `message`)
     const lastWord = e.target.value.split(' ').pop();
     if (lastWord.startsWith('@')) {
-      if (funds.length === 0) {
-        fetchFunds(); // Fetch funds if we haven't already
-      } else {
-        setShowSuggestions(true);
-      }
+      setShowSuggestions(funds.length > 0);
     } else {
       setShowSuggestions(false);
     }